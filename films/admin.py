@@ -1,11 +1,15 @@
 from django.contrib import admin
 
-from .models import Comment, Film
+from rest_framework.exceptions import ValidationError
+
+from .cache import invalidate_film_comments
+from .models import Comment, Film, PendingComment, SyncState
+from .search import search_comments
 
 
 @admin.register(Film)
 class FilmAdmin(admin.ModelAdmin):
-    list_display = ("id", "title", "release_date")
+    list_display = ("id", "title", "release_date", "comment_count")
     search_fields = ("title",)
 
 
@@ -14,3 +18,32 @@ class CommentAdmin(admin.ModelAdmin):
     list_display = ("id", "film", "created_at")
     search_fields = ("text",)
     list_filter = ("film",)
+
+    def get_search_results(self, request, queryset, search_term):
+        # Use the full-text index instead of LIKE '%term%' over every comment
+        try:
+            return search_comments(queryset, search_term), False
+        except ValidationError:  # no words in the term
+            return super().get_search_results(request, queryset, search_term)
+
+    # Comment has no delete signal receivers (see films.signals), so deletes
+    # invalidate cached film responses here
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        invalidate_film_comments(obj.film_id)
+
+    def delete_queryset(self, request, queryset):
+        film_ids = set(queryset.values_list("film_id", flat=True))
+        super().delete_queryset(request, queryset)
+        for film_id in film_ids:
+            invalidate_film_comments(film_id)
+
+
+@admin.register(SyncState)
+class SyncStateAdmin(admin.ModelAdmin):
+    list_display = ("resource", "last_synced_at", "film_count", "duration_ms")
+
+
+@admin.register(PendingComment)
+class PendingCommentAdmin(admin.ModelAdmin):
+    list_display = ("id", "film", "queued_at")
@@ -0,0 +1,200 @@
+"""
+Native async (ASGI) versions of the film and comment read/write endpoints.
+
+Same payloads, caching, conditional GET and replica routing as the DRF
+viewsets in films.views, but written as ``async def`` views on Django's
+async ORM and the async SWAPI client, so under an ASGI server one worker
+keeps many slow-upstream or slow-DB requests in flight instead of
+dedicating a thread to each. Writes still run in a worker thread
+(``sync_to_async``): the async ORM has no transactions.
+"""
+from __future__ import annotations
+import json
+import logging
+from contextlib import AbstractContextManager
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_http_methods
+from rest_framework.exceptions import APIException, Throttled
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.request import Request
+from movies_api.db.router import pin_to_primary, read_from_replica, replicas
+from .cache import acached_json, film_detail_key, film_list_key
+from .conditional import aconditional_response, comments_validator, film_validator, films_validator
+from .filters import filter_films
+from .models import Comment, Film
+from .pagination import CommentCursorPagination
+from .scheduler import aensure_films_fresh
+from .serializers import COMMENT_ROW_FIELDS, FILM_ROW_FIELDS, comment_rows, film_rows
+from .throttling import CommentRateThrottle, get_client_ip
+from .search import SEARCH_PARAM
+from .views import PRIMARY_COOKIE, comment_search_data, create_film_comment
+
+logger = logging.getLogger(__name__)
+
+
+def _reads(request) -> AbstractContextManager:
+    # Same read-your-writes rule as ReplicaReadsMixin
+    if PRIMARY_COOKIE in request.COOKIES:
+        return pin_to_primary()
+    return read_from_replica()
+
+
+def _error(exc: APIException) -> JsonResponse:
+    detail = exc.detail if isinstance(exc.detail, (dict, list)) else {"detail": exc.detail}
+    response = JsonResponse(detail, status=exc.status_code, safe=False)
+    if getattr(exc, "wait", None):
+        response["Retry-After"] = "%d" % exc.wait
+    return response
+
+
+@require_GET
+async def film_list(request):
+    """GET /api/async/films/ -- same payload as GET /api/films/."""
+    try:
+        qs = filter_films(Film.objects.values(*FILM_ROW_FIELDS), request.GET)
+    except APIException as exc:
+        return _error(exc)
+    with _reads(request):
+        try:
+            await aensure_films_fresh()
+        except Exception:
+            logger.exception("SWAPI sync failed")
+        validator = await sync_to_async(films_validator)()
+        key = await sync_to_async(film_list_key)(request)
+        return await aconditional_response(
+            request, validator, lambda: acached_json(key, lambda: _film_list_data(request, qs))
+        )
+
+
+async def _film_list_data(request, qs):
+    paginator = LimitOffsetPagination()
+    drf_request = Request(request)
+    paginator.limit = paginator.get_limit(drf_request)
+    if paginator.limit is None:
+        return film_rows([row async for row in qs])
+
+    paginator.request = drf_request
+    paginator.offset = paginator.get_offset(drf_request)
+    paginator.count = await qs.acount()
+    rows = [row async for row in qs[paginator.offset : paginator.offset + paginator.limit]]
+    return paginator.get_paginated_response(film_rows(rows)).data
+
+
+@require_GET
+async def film_detail(request, pk: int):
+    """GET /api/async/films/{id}/ -- same payload as GET /api/films/{id}/."""
+    with _reads(request):
+        validator = await sync_to_async(film_validator)(pk)
+        if validator is None:
+            return JsonResponse({"detail": "No Film matches the given query."}, status=404)
+        key = await sync_to_async(film_detail_key)(request, pk)
+        return await aconditional_response(
+            request, validator, lambda: acached_json(key, lambda: _film_detail_data(request, pk))
+        )
+
+
+async def _film_detail_data(request, pk: int):
+    try:
+        film = await Film.objects.values(*FILM_ROW_FIELDS).aget(pk=pk)
+    except Film.DoesNotExist:
+        raise Http404("No Film matches the given query.")
+    latest = (
+        Comment.objects.filter(film_id=pk)
+        .order_by("-created_at", "-id")
+        .values(*COMMENT_ROW_FIELDS)[: settings.FILM_DETAIL_COMMENT_PREVIEW]
+    )
+    return {
+        **film_rows([film])[0],
+        "comments": comment_rows([row async for row in latest]),
+        "comments_url": request.build_absolute_uri(
+            reverse("async-film-comments", kwargs={"pk": pk})
+        ),
+    }
+
+
+@csrf_exempt
+@require_http_methods(["GET", "HEAD", "POST"])
+async def film_comments(request, pk: int):
+    """
+    GET  /api/async/films/{id}/comments/
+    POST /api/async/films/{id}/comments/
+    """
+    if request.method == "POST":
+        return await _post_comment(request, pk)
+
+    with _reads(request):
+        film = await (
+            Film.objects.filter(pk=pk)
+            .values("comment_count", "comments_changed_at")
+            .afirst()
+        )
+        if film is None:
+            return JsonResponse({"detail": "Film not found."}, status=404)
+        validator = comments_validator(film["comment_count"], film["comments_changed_at"])
+        return await aconditional_response(
+            request, validator, lambda: _comments_page(request, Comment.objects.filter(film_id=pk))
+        )
+
+
+async def _post_comment(request, pk: int) -> JsonResponse:
+    # A lease claim does blocking cache I/O, so keep it off the event loop
+    throttle = CommentRateThrottle()
+    if not await sync_to_async(throttle.allow_request)(request, None):
+        return _error(Throttled(throttle.wait()))
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"detail": "JSON parse error."}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({"non_field_errors": ["Expected a JSON object."]}, status=400)
+    if not await Film.objects.filter(pk=pk).aexists():
+        return JsonResponse({"detail": "Film not found."}, status=404)
+
+    try:
+        payload, code = await sync_to_async(create_film_comment)(
+            pk, data, get_client_ip(request)
+        )
+    except APIException as exc:
+        return _error(exc)
+    response = JsonResponse(payload, status=code)
+    if replicas():
+        response.set_cookie(
+            PRIMARY_COOKIE,
+            "1",
+            max_age=settings.DB_REPLICA_STICKY_SECONDS,
+            httponly=True,
+            samesite="Lax",
+        )
+    return response
+
+
+@require_GET
+async def comment_list(request):
+    """GET /api/async/comments/ -- same payload as GET /api/comments/."""
+    with _reads(request):
+        validator = await sync_to_async(films_validator)()
+        return await aconditional_response(
+            request, validator, lambda: _comments_page(request, Comment.objects.all())
+        )
+
+
+async def _comments_page(request, qs) -> JsonResponse:
+    if SEARCH_PARAM in request.GET:
+        try:
+            data = await sync_to_async(comment_search_data)(qs, Request(request))
+        except APIException as exc:
+            return _error(exc)
+        return JsonResponse(data)
+
+    paginator = CommentCursorPagination()
+    try:
+        page = await paginator.apaginate_queryset(
+            qs.values(*COMMENT_ROW_FIELDS), Request(request)
+        )
+    except APIException as exc:
+        return _error(exc)
+    return JsonResponse(paginator.get_paginated_response(comment_rows(page)).data)
@@ -0,0 +1,155 @@
+from __future__ import annotations
+import hashlib
+import threading
+import time
+from urllib.parse import urlencode
+from typing import Any, Awaitable, Callable, Optional
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import JsonResponse
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from movies_api.db.router import pin_to_primary
+from .filters import FILM_FILTER_PARAMS
+from .metrics import CACHE_REQUESTS
+
+# Version keys. A cached response embeds the versions it was built from, so
+# bumping a version makes every response that depends on it unreachable.
+SYNC_VERSION_KEY = "films:v:sync"  # any film row changed (SWAPI sync)
+LIST_VERSION_KEY = "films:v:list"  # any comment changed (list comment_count)
+
+_stats_lock = threading.Lock()
+_stats: dict[str, int] = {"hits": 0, "misses": 0}
+
+
+def _film_version_key(film_id: int) -> str:
+    return f"films:v:film:{film_id}"
+
+
+def get_cache():
+    """The cache backend configured for film responses (``FILMS_CACHE_ALIAS``)."""
+    return caches[settings.FILMS_CACHE_ALIAS]
+
+
+def _version(key: str) -> int:
+    backend = get_cache()
+    version = backend.get(key)
+    if version is None:
+        # Seed with the clock so a version evicted from the cache never
+        # comes back with a number older entries were stored under.
+        backend.add(key, time.time_ns(), None)
+        version = backend.get(key, 0)
+    return version
+
+
+def _bump(key: str) -> None:
+    backend = get_cache()
+    try:
+        backend.incr(key)
+    except ValueError:
+        backend.set(key, time.time_ns(), None)
+
+
+def film_list_key(request) -> str:
+    """
+    Cache key for a film list page. Only the parameters the list reads go
+    into it (limit/offset as the paginator parses them), so made-up query
+    parameters can neither add entries nor force a miss. (A cached page's
+    links may carry the extra parameters of the request that built it;
+    they are ignored the same way.)
+    """
+    query = request if isinstance(request, Request) else Request(request)
+    paginator = LimitOffsetPagination()
+    params = [("limit", paginator.get_limit(query)), ("offset", paginator.get_offset(query))]
+    params += [(name, query.query_params.get(name)) for name in FILM_FILTER_PARAMS]
+    versions = f"{_version(SYNC_VERSION_KEY)}.{_version(LIST_VERSION_KEY)}"
+    return _key("list", versions, request, params)
+
+
+def film_detail_key(request, film_id: int) -> str:
+    versions = f"{_version(SYNC_VERSION_KEY)}.{_version(_film_version_key(film_id))}"
+    return _key(f"film:{film_id}", versions, request)
+
+
+def _key(namespace: str, versions: str, request, params=()) -> str:
+    # Scheme, host and path too: links in the payload depend on them
+    query = urlencode([(name, value) for name, value in params if value is not None])
+    url = hashlib.md5(f"{request.build_absolute_uri(request.path)}?{query}".encode()).hexdigest()
+    return f"films:resp:{namespace}:{versions}:{url}"
+
+
+def cached_response(key: str, build: Callable[[], Any]) -> Response:
+    """
+    Serve ``key`` from the cache, or call ``build()`` for the response data
+    and cache it. Adds an ``X-Cache: HIT|MISS`` header.
+
+    Misses are built from the primary: ``key`` carries the versions as of
+    the latest write, and a lagging replica could still be showing the data
+    from before it, which would then be cached as current for everyone.
+    """
+    backend = get_cache()
+    data = backend.get(key)
+    hit = data is not None
+    if not hit:
+        with pin_to_primary():
+            data = build()
+        backend.set(key, data, settings.FILMS_CACHE_TIMEOUT)
+    _record(hit)
+    response = Response(data)
+    response["X-Cache"] = "HIT" if hit else "MISS"
+    return response
+
+
+async def acached_json(key: str, build: Callable[[], Awaitable[Any]]) -> JsonResponse:
+    """``cached_response`` for async views: awaits ``build()`` on a miss."""
+    backend = get_cache()
+    data = await backend.aget(key)
+    hit = data is not None
+    if not hit:
+        with pin_to_primary():
+            data = await build()
+        await backend.aset(key, data, settings.FILMS_CACHE_TIMEOUT)
+    _record(hit)
+    response = JsonResponse(data, safe=False)
+    response["X-Cache"] = "HIT" if hit else "MISS"
+    return response
+
+
+def _record(hit: bool) -> None:
+    with _stats_lock:
+        _stats["hits" if hit else "misses"] += 1
+    CACHE_REQUESTS.inc(result="hit" if hit else "miss")
+
+
+def cache_stats() -> dict[str, Any]:
+    """Hit/miss counters for this process."""
+    with _stats_lock:
+        hits, misses = _stats["hits"], _stats["misses"]
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / total, 4) if total else None,
+    }
+
+
+def reset_cache_stats() -> None:
+    with _stats_lock:
+        _stats.update(hits=0, misses=0)
+
+
+def invalidate_films() -> None:
+    """Drop every cached film response (film rows changed)."""
+    transaction.on_commit(lambda: _bump(SYNC_VERSION_KEY))
+
+
+def invalidate_film_comments(film_id: Optional[int]) -> None:
+    """Drop cached responses that include ``film_id``'s comments or count."""
+    def bump():
+        _bump(LIST_VERSION_KEY)
+        if film_id is not None:
+            _bump(_film_version_key(film_id))
+
+    transaction.on_commit(bump)
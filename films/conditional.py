@@ -0,0 +1,122 @@
+from __future__ import annotations
+import hashlib
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+from django.db.models import Max, Subquery, Sum
+from django.http import HttpResponseBase
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from .models import Film, SyncState
+from .services import FILMS_RESOURCE
+
+# A validator is (seed, last_modified): the seed is hashed with the request's
+# path/query and renderer into the ETag, so pagination params and formats
+# each get their own.
+Validator = tuple[str, Optional[datetime]]
+
+
+def _latest(*stamps: Optional[datetime]) -> Optional[datetime]:
+    present = [s for s in stamps if s is not None]
+    return max(present) if present else None
+
+
+def films_validator() -> Validator:
+    """
+    Validator for collection endpoints (film list, comment list): changes
+    whenever a sync changes film rows or any film's comments change.
+    """
+    films = Film.objects.aggregate(
+        comments=Sum("comment_count"), changed=Max("comments_changed_at")
+    )
+    sync = (
+        SyncState.objects.filter(resource=FILMS_RESOURCE)
+        .values("content_hash", "changed_at")
+        .first()
+    ) or {"content_hash": "", "changed_at": None}
+    seed = (
+        f"{sync['content_hash']}:{sync['changed_at']}:"
+        f"{films['comments']}:{films['changed']}"
+    )
+    return seed, _latest(sync["changed_at"], films["changed"])
+
+
+def film_validator(film_id) -> Optional[Validator]:
+    """
+    Validator for one film and its comments, from a single indexed row
+    lookup. None if the film doesn't exist or ``film_id`` isn't a valid
+    pk (let the view answer 404).
+    """
+    try:
+        films = Film.objects.filter(pk=film_id)
+    except (TypeError, ValueError):
+        return None
+    row = (
+        films.annotate(
+            synced=Subquery(
+                SyncState.objects.filter(resource=FILMS_RESOURCE).values("changed_at")[:1]
+            )
+        )
+        .values_list("comment_count", "comments_changed_at", "synced")
+        .first()
+    )
+    if row is None:
+        return None
+    return comments_validator(*row[:2], synced=row[2])
+
+
+def comments_validator(
+    comment_count: int,
+    comments_changed_at: Optional[datetime],
+    synced: Optional[datetime] = None,
+) -> Validator:
+    seed = f"{comment_count}:{comments_changed_at}:{synced}"
+    return seed, _latest(comments_changed_at, synced)
+
+
+def conditional_response(
+    request, validator: Optional[Validator], build: Callable[[], HttpResponseBase]
+) -> HttpResponseBase:
+    """
+    Answer 304 Not Modified when the client's If-None-Match (or, failing
+    that, If-Modified-Since) matches ``validator``; otherwise return
+    ``build()``. Either way the response carries ETag/Last-Modified and
+    ``Cache-Control: no-cache`` so clients revalidate on every poll.
+    """
+    if validator is None:
+        return build()
+    etag, timestamp = _validators(request, validator)
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = build()
+    return _stamp(response, etag, timestamp)
+
+
+async def aconditional_response(
+    request, validator: Optional[Validator], build: Callable[[], Awaitable[HttpResponseBase]]
+) -> HttpResponseBase:
+    """``conditional_response`` with an async ``build``."""
+    if validator is None:
+        return await build()
+    etag, timestamp = _validators(request, validator)
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = await build()
+    return _stamp(response, etag, timestamp)
+
+
+def _validators(request, validator: Validator) -> tuple[str, Optional[int]]:
+    seed, last_modified = validator
+    renderer = getattr(request, "accepted_renderer", None)
+    token = f"{seed}|{getattr(renderer, 'format', '')}|{request.get_full_path()}"
+    etag = quote_etag(hashlib.md5(token.encode()).hexdigest())
+    return etag, int(last_modified.timestamp()) if last_modified else None
+
+
+def _stamp(response: HttpResponseBase, etag: str, timestamp: Optional[int]) -> HttpResponseBase:
+    if response.status_code in (200, 304):
+        response["ETag"] = etag
+        if timestamp is not None:
+            response["Last-Modified"] = http_date(timestamp)
+        patch_cache_control(response, no_cache=True)
+        patch_vary_headers(response, ("Accept",))
+    return response
@@ -0,0 +1,59 @@
+from __future__ import annotations
+import csv
+import json
+from typing import Any, Iterator
+from django.conf import settings
+from django.db.models import QuerySet
+from rest_framework import serializers
+
+# Same columns and value formats as CommentSerializer
+EXPORT_FIELDS = ("id", "film", "text", "created_at")
+_COLUMNS = ("id", "film_id", "text", "created_at")
+_datetime_field = serializers.DateTimeField()
+
+
+def iter_comment_rows(qs: QuerySet, chunk_size: int | None = None) -> Iterator[tuple]:
+    """
+    Yield ``(id, film_id, text, created_at)`` tuples for ``qs`` in id order.
+
+    Rows are read in keyset batches (``id > last_id LIMIT chunk_size``) of
+    plain tuples rather than model instances, so memory stays flat however
+    large the table is -- including on MySQL, where the driver would
+    otherwise buffer an entire result set client-side.
+    """
+    chunk_size = chunk_size or settings.COMMENT_EXPORT_CHUNK_SIZE
+    rows = qs.order_by("id").values_list(*_COLUMNS)
+    last_id = 0
+    while True:
+        chunk = list(rows.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            return
+        for row in chunk:
+            yield row[:3] + (_datetime_field.to_representation(row[3]),)
+        last_id = chunk[-1][0]
+
+
+def ndjson_lines(qs: QuerySet) -> Iterator[str]:
+    """One JSON object per line, shaped like CommentSerializer output."""
+    for row in iter_comment_rows(qs):
+        yield json.dumps(dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False) + "\n"
+
+
+class _Echo:
+    """File-like object whose write() just returns the value (for csv.writer)."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def csv_lines(qs: QuerySet) -> Iterator[Any]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in iter_comment_rows(qs):
+        yield writer.writerow(row)
+
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", ndjson_lines),
+    "csv": ("text/csv", csv_lines),
+}
@@ -0,0 +1,77 @@
+from __future__ import annotations
+import string
+import sys
+from django.db import connections
+from django.db.models import QuerySet
+from django.db.models.functions import Lower
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+# ?ordering= values -> ORDER BY; each is served in index order by the
+# (release_date, id) / (comment_count, id) indexes on Film
+FILM_ORDERINGS = {
+    "release_date": ("release_date", "id"),
+    "-release_date": ("-release_date", "-id"),
+    "comment_count": ("comment_count", "id"),
+    "-comment_count": ("-comment_count", "-id"),
+}
+DEFAULT_ORDERING = "release_date"
+
+# Every query parameter filter_films() reads (part of the list's cache key)
+FILM_FILTER_PARAMS = ("title", "released_from", "released_to", "ordering")
+
+
+def filter_films(qs: QuerySet, params) -> QuerySet:
+    """
+    ``qs`` narrowed and ordered by the film list's query parameters:
+
+    - ``title``: case-insensitive title prefix (ASCII letters only on SQLite)
+    - ``released_from`` / ``released_to``: inclusive ISO release dates
+    - ``ordering``: one of ``FILM_ORDERINGS`` (default ``release_date``)
+
+    Every filter compiles to an index range rather than a scan. Raises
+    ``ValidationError`` for malformed values. Shared by the sync and async
+    views.
+    """
+    title = params.get("title")
+    if title:
+        qs = _title_prefix(qs, title)
+
+    for param, lookup in (("released_from", "release_date__gte"), ("released_to", "release_date__lte")):
+        raw = params.get(param)
+        if raw is None:
+            continue
+        try:
+            value = parse_date(raw)
+        except ValueError:
+            value = None
+        if value is None:
+            raise ValidationError({param: ["Must be an ISO 8601 date."]})
+        qs = qs.filter(**{lookup: value})
+
+    ordering = params.get("ordering", DEFAULT_ORDERING)
+    if ordering not in FILM_ORDERINGS:
+        raise ValidationError({"ordering": [f"Choose one of {sorted(FILM_ORDERINGS)}."]})
+    return qs.order_by(*FILM_ORDERINGS[ordering])
+
+
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def _title_prefix(qs: QuerySet, prefix: str) -> QuerySet:
+    if connections[qs.db].vendor == "mysql":
+        # Case-insensitive collation: LIKE 'prefix%' is a range on the title index
+        return qs.filter(title__istartswith=prefix)
+
+    # Elsewhere LIKE/ILIKE can't use a plain index, so seek on the lower(title)
+    # index instead: lower(title) in [prefix, prefix with its last char bumped).
+    # The prefix must be folded exactly like LOWER() folds the column, and
+    # SQLite's LOWER() only folds ASCII (so there, "É" and "é" differ)
+    if connections[qs.db].vendor == "sqlite":
+        low = prefix.translate(_ASCII_LOWER)
+    else:
+        low = prefix.lower()
+    qs = qs.alias(title_lower=Lower("title")).filter(title_lower__gte=low)
+    if ord(low[-1]) < sys.maxunicode:
+        return qs.filter(title_lower__lt=low[:-1] + chr(ord(low[-1]) + 1))
+    return qs.filter(title_lower__startswith=low)
@@ -0,0 +1,168 @@
+from __future__ import annotations
+import threading
+from collections import Counter
+from typing import Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from .cache import invalidate_film_comments
+from .metrics import COMMENTS_CREATED
+from .models import Comment, Film, PendingComment
+from .scheduler import PeriodicWorker
+
+SYNC, BUFFERED = "sync", "buffered"
+
+# Approximate number of staged comments, kept in the cache so enqueueing
+# needs no COUNT(*); recounted from the table when the key expires, which
+# also corrects any drift (crashed requests, rows deleted by hand)
+QUEUE_DEPTH_KEY = "ingest:queue-depth"
+QUEUE_DEPTH_TTL = 60
+
+_drainer: Optional[PeriodicWorker] = None
+_drainer_lock = threading.Lock()
+
+
+class QueueFull(APIException):
+    """The staging queue is at ``COMMENT_QUEUE_MAX_SIZE``; retry later."""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Comment queue is full, try again shortly."
+    default_code = "queue_full"
+
+    def __init__(self, wait: Optional[int] = None):
+        super().__init__()
+        # DRF's exception handler turns ``wait`` into a Retry-After header
+        self.wait = wait
+
+
+class _RaceLost(Exception):
+    """Another drainer took part of the batch; roll back and retry."""
+
+
+def buffered_ingest() -> bool:
+    return settings.COMMENT_INGEST_MODE == BUFFERED
+
+
+def enqueue_comment(film_id: int, text: str, ip_address: Optional[str]) -> PendingComment:
+    """
+    Stage a validated comment for the background drainer.
+
+    The staging row is the durable queue: once this returns, the comment
+    survives a process restart and will be drained exactly once. Raises
+    ``QueueFull`` when ``COMMENT_QUEUE_MAX_SIZE`` rows are already waiting
+    (going by the cached ``queue_depth()``).
+    """
+    depth = queue_depth()
+    if depth >= settings.COMMENT_QUEUE_MAX_SIZE:
+        raise QueueFull(wait=max(1, round(settings.COMMENT_QUEUE_FLUSH_INTERVAL)))
+    pending = PendingComment.objects.create(
+        film_id=film_id, text=text, ip_address=ip_address
+    )
+    _shift_queue_depth(+1)
+    if depth + 1 >= settings.COMMENT_QUEUE_FLUSH_SIZE:
+        wake_comment_drainer()
+    return pending
+
+
+def queue_depth() -> int:
+    """Staged comments, from the cached counter (one COUNT per TTL)."""
+    depth = cache.get(QUEUE_DEPTH_KEY)
+    if depth is None:
+        depth = PendingComment.objects.count()
+        cache.add(QUEUE_DEPTH_KEY, depth, QUEUE_DEPTH_TTL)
+    return max(depth, 0)
+
+
+def _shift_queue_depth(delta: int) -> None:
+    try:
+        if delta > 0:
+            cache.incr(QUEUE_DEPTH_KEY, delta)
+        else:
+            cache.decr(QUEUE_DEPTH_KEY, -delta)
+    except ValueError:  # expired: the next queue_depth() recounts
+        pass
+
+
+def drain_comment_queue(batch_size: Optional[int] = None) -> int:
+    """
+    Move staged comments into ``Comment``, one batch per transaction, until
+    the queue is empty. Returns how many comments were created.
+
+    Each batch is claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` (where
+    the backend supports it), inserted with one ``bulk_create`` and deleted
+    from the queue in the same transaction, so a row is either still queued
+    or drained -- never both, never twice. If another drainer got to part
+    of the batch first the transaction is rolled back and retried.
+    """
+    batch_size = batch_size or settings.COMMENT_QUEUE_FLUSH_SIZE
+    drained = 0
+    while True:
+        try:
+            n = _drain_batch(batch_size)
+        except _RaceLost:
+            continue
+        if not n:
+            return drained
+        drained += n
+
+
+def _drain_batch(batch_size: int) -> int:
+    with transaction.atomic():
+        batch = list(
+            PendingComment.objects.select_for_update(skip_locked=True)
+            .order_by("id")[:batch_size]
+        )
+        if not batch:
+            return 0
+        deleted, _ = PendingComment.objects.filter(
+            id__in=[p.id for p in batch]
+        ).delete()
+        if deleted != len(batch):
+            raise _RaceLost()
+        # Keep the time the comment was posted, not when it was drained
+        Comment.objects.bulk_create([
+            Comment(film_id=p.film_id, text=p.text, ip_address=p.ip_address, created_at=p.queued_at)
+            for p in batch
+        ])
+        # bulk_create skips signals, so maintain counts/caches here
+        for film_id, n in Counter(p.film_id for p in batch).items():
+            Film.objects.adjust_comment_count(film_id, n)
+            invalidate_film_comments(film_id)
+    _shift_queue_depth(-len(batch))
+    COMMENTS_CREATED.inc(len(batch), source="drain")
+    return len(batch)
+
+
+def start_comment_drainer() -> Optional[PeriodicWorker]:
+    """
+    Start the in-process queue drainer (idempotent) when
+    ``COMMENT_INGEST_MODE`` is ``"buffered"``. It flushes every
+    ``COMMENT_QUEUE_FLUSH_INTERVAL`` seconds, or as soon as
+    ``COMMENT_QUEUE_FLUSH_SIZE`` comments are waiting.
+    """
+    global _drainer
+    if not buffered_ingest():
+        return None
+    with _drainer_lock:
+        if _drainer is None:
+            _drainer = PeriodicWorker(
+                "comment-drain",
+                drain_comment_queue,
+                settings.COMMENT_QUEUE_FLUSH_INTERVAL,
+            )
+        _drainer.start()
+    return _drainer
+
+
+def wake_comment_drainer() -> None:
+    if _drainer is not None:
+        _drainer.wake()
+
+
+def stop_comment_drainer(timeout: Optional[float] = None) -> None:
+    global _drainer
+    with _drainer_lock:
+        if _drainer is not None:
+            _drainer.stop(timeout)
+            _drainer = None
@@ -0,0 +1,227 @@
+"""
+Per-request timing and query-count instrumentation.
+
+``InstrumentationMiddleware`` (enabled with ``REQUEST_INSTRUMENTATION``)
+collects, for a sample (``REQUEST_INSTRUMENTATION_SAMPLE_RATE``) of
+requests: wall time, DB query count/time, SWAPI call count/time and
+serialization time. The numbers go out as a ``Server-Timing`` header and a
+JSON log line on the ``films.instrumentation`` logger. Streaming responses
+get no header; their log line is written once the body has been sent.
+
+Code elsewhere reports into the current request with ``timed(<kind>)``. It
+is a no-op (one context-variable lookup) when the request isn't sampled or
+instrumentation is off.
+"""
+from __future__ import annotations
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+from typing import Optional
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DB, SWAPI, SERIALIZE = "db", "swapi", "serialize"
+KINDS = (DB, SWAPI, SERIALIZE)
+
+_current: ContextVar[Optional["RequestMetrics"]] = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """Counters for one request; safe to update from helper threads."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.counts = dict.fromkeys(KINDS, 0)
+        self.seconds = dict.fromkeys(KINDS, 0.0)
+        self._lock = threading.Lock()
+
+    def add(self, kind: str, seconds: float) -> None:
+        with self._lock:
+            self.counts[kind] += 1
+            self.seconds[kind] += seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        parts = [f"total;dur={self.elapsed() * 1000:.1f}"]
+        for kind in KINDS:
+            part = f"{kind};dur={self.seconds[kind] * 1000:.1f}"
+            if kind != SERIALIZE:
+                part += f';desc="{self.counts[kind]} {"queries" if kind == DB else "calls"}"'
+            parts.append(part)
+        return ", ".join(parts)
+
+    def as_dict(self) -> dict:
+        return {
+            "duration_ms": round(self.elapsed() * 1000, 2),
+            "db_queries": self.counts[DB],
+            "db_ms": round(self.seconds[DB] * 1000, 2),
+            "swapi_calls": self.counts[SWAPI],
+            "swapi_ms": round(self.seconds[SWAPI] * 1000, 2),
+            "serialize_ms": round(self.seconds[SERIALIZE] * 1000, 2),
+        }
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    return _current.get()
+
+
+class timed(ContextDecorator):
+    """
+    Add the duration of a block (or decorated call) to the current
+    request's ``kind`` counters. Nested blocks of the same kind each count.
+    """
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._stack: list[tuple[RequestMetrics, float]] = []
+
+    def __enter__(self):
+        metrics = _current.get()
+        if metrics is not None:
+            self._stack.append((metrics, time.perf_counter()))
+        else:
+            self._stack.append((None, 0.0))
+        return self
+
+    def __exit__(self, *exc):
+        metrics, started = self._stack.pop()
+        if metrics is not None:
+            metrics.add(self.kind, time.perf_counter() - started)
+        return False
+
+    def _recreate_cm(self):
+        # A fresh instance per decorated call, so concurrent calls don't share _stack
+        return type(self)(self.kind)
+
+
+def _db_wrapper(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add(DB, time.perf_counter() - started)
+
+
+def _install_db_wrappers() -> None:
+    """
+    Hook ``_db_wrapper`` into this thread's connection objects (once each;
+    the wrapper list survives reconnects). Connections are per thread, so
+    this must run on the thread that will run the queries.
+    """
+    for conn in connections.all():
+        if _db_wrapper not in conn.execute_wrappers:
+            conn.execute_wrappers.append(_db_wrapper)
+
+
+class InstrumentationMiddleware:
+    """
+    Put it first in ``MIDDLEWARE`` so ``total`` covers the whole stack.
+    Removed at startup (``MiddlewareNotUsed``) unless
+    ``REQUEST_INSTRUMENTATION`` is on.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_INSTRUMENTATION:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.sample_rate = settings.REQUEST_INSTRUMENTATION_SAMPLE_RATE
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _sampled(self) -> bool:
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+        _install_db_wrappers()
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._report(request, response, metrics)
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+        # ORM calls from async code run on the thread-sensitive executor
+        await sync_to_async(_install_db_wrappers)()
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._report(request, response, metrics)
+
+    def _report(self, request, response, metrics: RequestMetrics):
+        if response.streaming:
+            # The body (and its queries) is produced after we return, and the
+            # headers go out first: no Server-Timing, and the log line waits
+            # until the last chunk has been sent
+            measure = self._ameasure_stream if response.is_async else self._measure_stream
+            response.streaming_content = measure(request, response, metrics, response.streaming_content)
+            return response
+        response["Server-Timing"] = metrics.server_timing()
+        self._log(request, response, metrics)
+        return response
+
+    def _measure_stream(self, request, response, metrics: RequestMetrics, content):
+        chunks = iter(content)
+        try:
+            while True:
+                token = _current.set(metrics)
+                try:
+                    _install_db_wrappers()
+                    chunk = next(chunks)
+                except StopIteration:
+                    return
+                finally:
+                    _current.reset(token)
+                yield chunk
+        finally:
+            self._log(request, response, metrics)
+
+    async def _ameasure_stream(self, request, response, metrics: RequestMetrics, content):
+        chunks = aiter(content)
+        try:
+            while True:
+                token = _current.set(metrics)
+                try:
+                    chunk = await anext(chunks)
+                except StopAsyncIteration:
+                    return
+                finally:
+                    _current.reset(token)
+                yield chunk
+        finally:
+            self._log(request, response, metrics)
+
+    def _log(self, request, response, metrics: RequestMetrics) -> None:
+        logger.info(
+            json.dumps({
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                **metrics.as_dict(),
+            })
+        )
@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from films.ingest import drain_comment_queue
+
+
+class Command(BaseCommand):
+    help = "Flush comments staged by buffered ingestion into the comments table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running, draining every COMMENT_QUEUE_FLUSH_INTERVAL seconds.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Comments per transaction (defaults to COMMENT_QUEUE_FLUSH_SIZE).",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                drained = drain_comment_queue(options["batch_size"])
+            except Exception as exc:
+                if not options["loop"]:
+                    raise
+                self.stderr.write(f"Comment drain failed: {exc}")
+            else:
+                if drained or not options["loop"]:
+                    self.stdout.write(self.style.SUCCESS(f"Drained {drained} comments."))
+            if not options["loop"]:
+                return
+            time.sleep(settings.COMMENT_QUEUE_FLUSH_INTERVAL)
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from films.cache import invalidate_films
+from films.models import Film
+
+
+class Command(BaseCommand):
+    help = "Recompute Film.comment_count from the comments table and fix drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drifted films without writing.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drifted = list(
+                Film.objects.annotate(actual=Count("comments"))
+                .exclude(comment_count=F("actual"))
+            )
+            for film in drifted:
+                self.stdout.write(
+                    f"Film {film.pk}: stored {film.comment_count}, actual {film.actual}"
+                )
+                film.comment_count = film.actual
+                film.comments_changed_at = timezone.now()
+            if drifted and not options["dry_run"]:
+                Film.objects.bulk_update(
+                    drifted, ["comment_count", "comments_changed_at"]
+                )
+                invalidate_films()
+
+        verb = "Found" if options["dry_run"] else "Reconciled"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {len(drifted)} film(s)."))
@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from films.scheduler import run_sync
+
+
+class Command(BaseCommand):
+    help = "Sync films from SWAPI into the local database."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running, syncing every --interval seconds.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=None,
+            help="Seconds between syncs in --loop mode "
+            "(defaults to SWAPI_SYNC_INTERVAL).",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"] or settings.SWAPI_SYNC_INTERVAL
+        if options["loop"] and interval <= 0:
+            raise CommandError("--loop needs a positive --interval.")
+
+        while True:
+            try:
+                ran = run_sync()
+            except Exception as exc:
+                if not options["loop"]:
+                    raise CommandError(f"SWAPI sync failed: {exc}") from exc
+                self.stderr.write(f"SWAPI sync failed: {exc}")
+            else:
+                if ran:
+                    self.stdout.write(self.style.SUCCESS("SWAPI sync complete."))
+                else:
+                    self.stdout.write("SWAPI sync already running; skipped.")
+            if not options["loop"]:
+                return
+            time.sleep(interval)
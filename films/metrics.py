@@ -0,0 +1,393 @@
+"""
+Prometheus-style metrics, served in the text exposition format at /metrics.
+
+Counters and histograms are plain in-process sums behind one uncontended
+lock. With ``METRICS_MULTIPROC_DIR`` set, every process instead keeps its
+values in its own mmap'd file in that directory (``<pid>.db``; updates are
+in-place writes into the mapping, no syscalls) and a scrape, whichever
+worker serves it, sums the files of every worker. Wipe the directory when
+the server (re)starts: files of exited workers are kept so counters never
+go backwards.
+"""
+from __future__ import annotations
+import bisect
+import glob
+import hmac
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import defaultdict
+from typing import Iterable, Iterator, Optional
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Store keys are "family\tsuffix\tlabels\tle" (suffix/le empty for counters)
+Key = str
+
+
+# ----------------------------
+# Storage
+# ----------------------------
+
+class _LocalStore:
+    """Values for this process only."""
+
+    def __init__(self):
+        self._values: dict[Key, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, items: Iterable[tuple[Key, float]]) -> None:
+        with self._lock:
+            for key, amount in items:
+                self._values[key] += amount
+
+    def collect(self) -> dict[Key, float]:
+        with self._lock:
+            return dict(self._values)
+
+
+_HEADER = 8  # bytes used (uint32) + padding
+
+
+def _padded(length: int) -> int:
+    # Key bytes are padded so the value after "<len><key>" is 8-byte aligned
+    return length + (-(length + 4) % 8)
+
+
+def _entries(buf, used: int) -> Iterator[tuple[Key, float, int]]:
+    """(key, value, value offset) for every entry in a store file's bytes."""
+    pos = _HEADER
+    while pos < used:
+        (length,) = struct.unpack_from("<i", buf, pos)
+        key = bytes(buf[pos + 4 : pos + 4 + length]).decode()
+        value_pos = pos + 4 + _padded(length)
+        (value,) = struct.unpack_from("<d", buf, value_pos)
+        yield key, value, value_pos
+        pos = value_pos + 8
+
+
+class _FileStore:
+    """
+    This process's values in ``<dir>/<pid>.db``: a header holding the bytes
+    used, then ``<uint32 key length><key><double value>`` entries. Only the
+    owning process writes; new entries are fully written before the header
+    is bumped, so readers never see a partial one.
+    """
+    initial_size = 64 * 1024
+
+    def __init__(self, directory: str):
+        self.path = os.path.join(directory, f"{os.getpid()}.db")
+        self._file = open(self.path, "a+b")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < self.initial_size:
+            self._file.truncate(self.initial_size)
+            size = self.initial_size
+        self._capacity = size
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._used = struct.unpack_from("<i", self._map, 0)[0] or _HEADER
+        self._positions = {key: pos for key, _, pos in _entries(self._map, self._used)}
+        self._lock = threading.Lock()
+
+    def inc(self, items: Iterable[tuple[Key, float]]) -> None:
+        with self._lock:
+            for key, amount in items:
+                pos = self._positions.get(key)
+                if pos is None:
+                    pos = self._append(key)
+                (value,) = struct.unpack_from("<d", self._map, pos)
+                struct.pack_into("<d", self._map, pos, value + amount)
+
+    def _append(self, key: Key) -> int:
+        encoded = key.encode()
+        padded = _padded(len(encoded))
+        size = 4 + padded + 8
+        if self._used + size > self._capacity:
+            while self._used + size > self._capacity:
+                self._capacity *= 2
+            self._map.close()
+            self._file.truncate(self._capacity)
+            self._map = mmap.mmap(self._file.fileno(), self._capacity)
+        struct.pack_into(f"<i{padded}sd", self._map, self._used, len(encoded), encoded, 0.0)
+        pos = self._used + 4 + padded
+        self._used += size
+        struct.pack_into("<i", self._map, 0, self._used)
+        self._positions[key] = pos
+        return pos
+
+    def collect(self) -> dict[Key, float]:
+        """Sum of every process's file in the directory (this one included)."""
+        totals: dict[Key, float] = defaultdict(float)
+        for path in glob.glob(os.path.join(os.path.dirname(self.path), "*.db")):
+            with open(path, "rb") as fh:
+                data = fh.read()
+            if len(data) < _HEADER:
+                continue
+            for key, value, _ in _entries(data, struct.unpack_from("<i", data, 0)[0]):
+                totals[key] += value
+        return totals
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+
+_store = None
+_store_pid: Optional[int] = None
+_store_lock = threading.Lock()
+
+
+def _get_store():
+    """The store for this process (re-created after a fork, e.g. gunicorn --preload)."""
+    global _store, _store_pid
+    if _store_pid != os.getpid():
+        with _store_lock:
+            if _store_pid != os.getpid():
+                directory = settings.METRICS_MULTIPROC_DIR
+                _store = _FileStore(directory) if directory else _LocalStore()
+                _store_pid = os.getpid()
+    return _store
+
+
+def reset_metrics() -> None:
+    """Drop this process's values (tests); the next update re-creates the store."""
+    global _store, _store_pid
+    with _store_lock:
+        if isinstance(_store, _FileStore):
+            _store.close()
+            os.remove(_store.path)
+        _store, _store_pid = None, None
+
+
+# ----------------------------
+# Metric types
+# ----------------------------
+
+REGISTRY: dict[str, "_Metric"] = {}
+
+
+def _fmt(value: float) -> str:
+    # Exact output (":g" would print 1048576 as 1.04858e+06)
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._keys: dict[tuple, object] = {}
+        REGISTRY[name] = self
+
+    def _labels(self, values: tuple) -> str:
+        return ",".join(f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, values))
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        values = tuple(labels[n] for n in self.labelnames)
+        key = self._keys.get(values)
+        if key is None:
+            key = self._keys[values] = f"{self.name}\t\t{self._labels(values)}\t"
+        _get_store().inc(((key, amount),))
+
+    def samples(self, values: dict[Key, float]) -> Iterator[str]:
+        for key, value in sorted(values.items()):
+            _, _, labels, _ = key.split("\t")
+            yield f"{self.name}{{{labels}}} {_fmt(value)}" if labels else f"{self.name} {_fmt(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: tuple[float, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        values = tuple(labels[n] for n in self.labelnames)
+        keys = self._keys.get(values)
+        if keys is None:
+            base = self._labels(values)
+            keys = self._keys[values] = (
+                [f"{self.name}\tbucket\t{base}\t{_fmt(le)}" for le in self.buckets]
+                + [f"{self.name}\tbucket\t{base}\t+Inf"],
+                f"{self.name}\tsum\t{base}\t",
+                f"{self.name}\tcount\t{base}\t",
+            )
+        bucket_keys, sum_key, count_key = keys
+        # Buckets are stored per bucket and made cumulative on scrape
+        bucket = bucket_keys[bisect.bisect_left(self.buckets, value)]
+        _get_store().inc(((bucket, 1), (sum_key, value), (count_key, 1)))
+
+    def samples(self, values: dict[Key, float]) -> Iterator[str]:
+        by_labels: dict[str, dict[str, float]] = defaultdict(dict)
+        for key, value in values.items():
+            _, suffix, labels, le = key.split("\t")
+            by_labels[labels][le or suffix] = value
+        for labels, series in sorted(by_labels.items()):
+            prefix = f"{labels}," if labels else ""
+            cumulative = 0.0
+            for le in [_fmt(b) for b in self.buckets] + ["+Inf"]:
+                cumulative += series.get(le, 0.0)
+                yield f'{self.name}_bucket{{{prefix}le="{le}"}} {_fmt(cumulative)}'
+            braces = f"{{{labels}}}" if labels else ""
+            yield f"{self.name}_sum{braces} {_fmt(series.get('sum', 0.0))}"
+            yield f"{self.name}_count{braces} {_fmt(series.get('count', 0.0))}"
+
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+_SYNC_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by view.",
+    ("view", "method", "status"), _LATENCY_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Response body size by view (streamed bodies excluded).",
+    ("view",), _SIZE_BUCKETS,
+)
+SYNC_DURATION = Histogram(
+    "swapi_sync_duration_seconds", "fetch_and_sync_films duration by outcome.",
+    ("outcome",), _SYNC_BUCKETS,
+)
+SYNC_FILMS = Counter(
+    "swapi_sync_films_total", "Films processed by SWAPI syncs, by change.", ("change",)
+)
+CACHE_REQUESTS = Counter(
+    "films_cache_requests_total", "Film response cache lookups.", ("result",)
+)
+COMMENTS_CREATED = Counter(
+    "comments_created_total", "Comments inserted, by write path.", ("source",)
+)
+
+
+# ----------------------------
+# Recording helpers
+# ----------------------------
+
+def record_sync(seconds: float, result=None) -> None:
+    """Record one fetch_and_sync_films run (``result`` None = it failed)."""
+    if result is None:
+        outcome = "error"
+    elif result.not_modified:
+        outcome = "not_modified"
+    elif result.inserted or result.updated or result.deleted:
+        outcome = "changed"
+    else:
+        outcome = "unchanged"
+    SYNC_DURATION.observe(seconds, outcome=outcome)
+    for change in ("inserted", "updated", "deleted", "unchanged"):
+        if result is not None and getattr(result, change):
+            SYNC_FILMS.inc(getattr(result, change), change=change)
+
+
+# ----------------------------
+# Exposition
+# ----------------------------
+
+def render() -> str:
+    from .models import SyncState
+    from .services import FILMS_RESOURCE
+
+    values: dict[str, dict[Key, float]] = defaultdict(dict)
+    for key, value in _get_store().collect().items():
+        values[key.split("\t", 1)[0]][key] = value
+
+    lines: list[str] = []
+    for name, metric in REGISTRY.items():
+        lines += [f"# HELP {name} {metric.documentation}", f"# TYPE {name} {metric.kind}"]
+        lines += metric.samples(values.get(name, {}))
+
+    # Derived at scrape time from the (all-worker) counters / the DB
+    cache = values.get(CACHE_REQUESTS.name, {})
+    hits = sum(v for k, v in cache.items() if 'result="hit"' in k)
+    total = sum(cache.values())
+    lines += [
+        "# HELP films_cache_hit_ratio Film response cache hit ratio (all workers).",
+        "# TYPE films_cache_hit_ratio gauge",
+        f"films_cache_hit_ratio {_fmt(hits / total if total else 0)}",
+    ]
+    film_count = (
+        SyncState.objects.filter(resource=FILMS_RESOURCE)
+        .values_list("film_count", flat=True)
+        .first()
+    )
+    lines += [
+        "# HELP swapi_films Films present after the last SWAPI sync.",
+        "# TYPE swapi_films gauge",
+        f"swapi_films {film_count or 0}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request):
+    """
+    GET /metrics -- Prometheus text format. 404 unless ``METRICS_ENABLED``;
+    with ``METRICS_TOKEN`` set, 403 without ``Authorization: Bearer <token>``.
+    """
+    if not settings.METRICS_ENABLED:
+        raise Http404()
+    if settings.METRICS_TOKEN:
+        sent = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(sent.encode(), f"Bearer {settings.METRICS_TOKEN}".encode()):
+            return HttpResponseForbidden()
+    return HttpResponse(render(), content_type=CONTENT_TYPE)
+
+
+class MetricsMiddleware:
+    """
+    Records request latency and response size per view (URL name, so the
+    label set stays bounded). Removed at startup unless ``METRICS_ENABLED``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self._async = iscoroutinefunction(get_response)
+        if self._async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self._async:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self._record(request, response, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self._record(request, response, time.perf_counter() - started)
+        return response
+
+    @staticmethod
+    def _record(request, response, seconds: float) -> None:
+        match = getattr(request, "resolver_match", None)
+        view = (match.view_name or match._func_path) if match else "unmatched"
+        REQUEST_LATENCY.observe(
+            seconds, view=view, method=request.method, status=response.status_code
+        )
+        if not response.streaming:
+            # CommonMiddleware (inner) has usually set it; avoids joining the body
+            size = response.get("Content-Length")
+            RESPONSE_SIZE.observe(int(size) if size else len(response.content), view=view)
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('films', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncState',
+            fields=[
+                ('resource', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('last_synced_at', models.DateTimeField(blank=True, null=True)),
+                ('etag', models.CharField(blank=True, default='', max_length=255)),
+                ('last_modified', models.CharField(blank=True, default='', max_length=64)),
+                ('duration_ms', models.PositiveIntegerField(default=0)),
+                ('film_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
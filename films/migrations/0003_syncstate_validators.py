@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('films', '0002_syncstate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='syncstate',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='syncstate',
+            name='page_validators',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:40
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_comment_count(apps, schema_editor):
+    Film = apps.get_model("films", "Film")
+    Comment = apps.get_model("films", "Comment")
+    counts = (
+        Comment.objects.filter(film=OuterRef("pk"))
+        .values("film")
+        .annotate(n=Count("id"))
+        .values("n")
+    )
+    Film.objects.update(comment_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('films', '0003_syncstate_validators'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='film',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_comment_count, migrations.RunPython.noop),
+    ]
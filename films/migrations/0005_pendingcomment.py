@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('films', '0004_film_comment_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingComment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.CharField(max_length=500)),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+                ('queued_at', models.DateTimeField(auto_now_add=True)),
+                ('film', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pending_comments', to='films.film')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
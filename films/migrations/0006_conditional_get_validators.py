@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:49
+
+from django.db import migrations, models
+from django.db.models import F, Max, OuterRef, Subquery
+
+
+def backfill_validators(apps, schema_editor):
+    Film = apps.get_model("films", "Film")
+    Comment = apps.get_model("films", "Comment")
+    SyncState = apps.get_model("films", "SyncState")
+    latest = (
+        Comment.objects.filter(film=OuterRef("pk"))
+        .values("film")
+        .annotate(latest=Max("created_at"))
+        .values("latest")
+    )
+    Film.objects.update(comments_changed_at=Subquery(latest))
+    SyncState.objects.update(changed_at=F("last_synced_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('films', '0005_pendingcomment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='film',
+            name='comments_changed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='syncstate',
+            name='changed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_validators, migrations.RunPython.noop),
+    ]
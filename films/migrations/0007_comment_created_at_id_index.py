@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('films', '0006_conditional_get_validators'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['created_at', 'id'], name='films_comme_created_5924a5_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations
+
+FTS_TABLE = "films_comment_fts"
+FULLTEXT_INDEX = "films_comment_text_ft"
+
+SQLITE_FTS_SQL = [
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    f"text, content='films_comment', content_rowid='id')",
+    f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON films_comment BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END",
+    f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON films_comment BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) VALUES ('delete', old.id, old.text); END",
+    f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF text ON films_comment BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) VALUES ('delete', old.id, old.text); "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END",
+    # Index the comments that already exist
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+SQLITE_FTS_DROP_SQL = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+MYSQL_FULLTEXT_SQL = [f"ALTER TABLE films_comment ADD FULLTEXT INDEX {FULLTEXT_INDEX} (text)"]
+MYSQL_FULLTEXT_DROP_SQL = [f"ALTER TABLE films_comment DROP INDEX {FULLTEXT_INDEX}"]
+
+# Note for later migrations: SQLite's schema editor rebuilds a table for
+# most ALTERs, which drops its triggers. A migration that alters
+# films_comment must re-run SQLITE_FTS_DROP_SQL + SQLITE_FTS_SQL on SQLite
+# (as 0010 does).
+
+
+def _run(schema_editor, statements_by_vendor):
+    for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    _run(schema_editor, {"sqlite": SQLITE_FTS_SQL, "mysql": MYSQL_FULLTEXT_SQL})
+
+
+def drop_search_index(apps, schema_editor):
+    _run(schema_editor, {"sqlite": SQLITE_FTS_DROP_SQL, "mysql": MYSQL_FULLTEXT_DROP_SQL})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('films', '0007_comment_created_at_id_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
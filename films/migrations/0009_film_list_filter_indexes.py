@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:25
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('films', '0008_comment_fulltext_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='film',
+            index=models.Index(fields=['release_date', 'id'], name='films_film_release_5dc441_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='film',
+            index=models.Index(fields=['comment_count', 'id'], name='films_film_comment_d6d67d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='film',
+            index=models.Index(django.db.models.functions.text.Lower('title'), models.F('release_date'), name='films_film_title_lower_idx'),
+        ),
+    ]
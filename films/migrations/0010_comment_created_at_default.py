@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:37
+
+from importlib import import_module
+
+import django.utils.timezone
+from django.db import migrations, models
+
+# SQLite rebuilds films_comment for the AlterField, dropping the full-text
+# triggers from 0008; drop the index around it and build it again
+search = import_module("films.migrations.0008_comment_fulltext_search")
+
+
+def drop_sqlite_search_index(apps, schema_editor):
+    search._run(schema_editor, {"sqlite": search.SQLITE_FTS_DROP_SQL})
+
+
+def create_sqlite_search_index(apps, schema_editor):
+    search._run(schema_editor, {"sqlite": search.SQLITE_FTS_SQL})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('films', '0009_film_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_sqlite_search_index, create_sqlite_search_index),
+        migrations.AlterField(
+            model_name='comment',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.RunPython(create_sqlite_search_index, drop_sqlite_search_index),
+    ]
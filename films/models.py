@@ -1,5 +1,31 @@
 from __future__ import annotations
 from django.db import models
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Lower, Now
+from django.utils import timezone
+
+
+class FilmManager(models.Manager):
+    def adjust_comment_count(self, film_id: int, delta: int) -> None:
+        """
+        Atomically shift a film's stored comment_count by ``delta`` and
+        stamp ``comments_changed_at``.
+        """
+        if delta >= 0:
+            count = F("comment_count") + delta
+        else:
+            # Never compute a negative count: the column is UNSIGNED on
+            # MySQL, where comment_count + delta < 0 errors (1690) before a
+            # clamp like Greatest() could apply
+            count = Case(
+                When(comment_count__gte=-delta, then=F("comment_count") + delta),
+                default=Value(0),
+            )
+        self.filter(pk=film_id).update(comment_count=count, comments_changed_at=Now())
+
+    def touch_comments(self, *film_ids: int) -> None:
+        """Stamp ``comments_changed_at`` after comments were edited in place."""
+        self.filter(pk__in=film_ids).update(comments_changed_at=Now())
 
 
 class Film(models.Model):
@@ -7,9 +33,22 @@ class Film(models.Model):
     id = models.PositiveIntegerField(primary_key=True)  # swapi_id
     title = models.CharField(max_length=255, db_index=True)
     release_date = models.DateField()
-    
+    # Denormalized; maintained on comment writes (see reconcile_comment_counts)
+    comment_count = models.PositiveIntegerField(default=0)
+    # Last comment create/edit/delete; the HTTP validator for comment feeds
+    comments_changed_at = models.DateTimeField(null=True, blank=True)
+
+    objects = FilmManager()
+
     class Meta:
         ordering = ["release_date", "id"]
+        # One per film list ordering/filter (see films.filters)
+        indexes = [
+            models.Index(fields=["release_date", "id"]),
+            models.Index(fields=["comment_count", "id"]),
+            # Case-insensitive title prefix, then release date
+            models.Index(Lower("title"), "release_date", name="films_film_title_lower_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.title} ({self.release_date})"
@@ -21,13 +60,59 @@ class Comment(models.Model):
     )
     text = models.CharField(max_length=500)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # A default rather than auto_now_add, so drained comments keep the time
+    # they were posted (PendingComment.queued_at)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ["created_at", "id"]
         indexes = [
             models.Index(fields=["film", "created_at"]),
+            # Global feed (/api/comments/) seeks on the full ordering
+            models.Index(fields=["created_at", "id"]),
         ]
 
     def __str__(self) -> str:
         return f"Comment({self.film_id}): {self.text[:20]}"
+
+
+class SyncState(models.Model):
+    """
+    Bookkeeping for a SWAPI sync (one row per upstream resource), used to
+    decide whether the local copy is fresh enough to serve without syncing.
+    """
+    resource = models.CharField(max_length=50, primary_key=True)
+    last_synced_at = models.DateTimeField(null=True, blank=True)
+    # Last sync that actually changed film rows (last_synced_at moves on
+    # every verification, this only when the data did)
+    changed_at = models.DateTimeField(null=True, blank=True)
+    etag = models.CharField(max_length=255, blank=True, default="")
+    last_modified = models.CharField(max_length=64, blank=True, default="")
+    duration_ms = models.PositiveIntegerField(default=0)
+    film_count = models.PositiveIntegerField(default=0)
+    # sha256 of the normalized upstream records, and per-page-URL validators
+    # ({url: {"etag", "last_modified"}}) for conditional requests
+    content_hash = models.CharField(max_length=64, blank=True, default="")
+    page_validators = models.JSONField(default=dict, blank=True)
+
+    def __str__(self) -> str:
+        return f"SyncState({self.resource}): {self.last_synced_at}"
+
+
+class PendingComment(models.Model):
+    """
+    Write-behind staging row for a validated comment awaiting insertion
+    into ``Comment`` (see films.ingest).
+    """
+    film = models.ForeignKey(
+        Film, on_delete=models.CASCADE, related_name="pending_comments"
+    )
+    text = models.CharField(max_length=500)
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    queued_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self) -> str:
+        return f"PendingComment({self.film_id}): {self.text[:20]}"
@@ -0,0 +1,127 @@
+from __future__ import annotations
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from typing import Any, Optional
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CommentCursorPagination(CursorPagination):
+    """
+    Keyset (seek) pagination over ``(created_at, id)`` -- the same order as
+    ``Comment.Meta.ordering`` and the ``(film, created_at)`` index.
+
+    Each page is fetched with ``WHERE (created_at, id) > cursor LIMIT n``
+    instead of an OFFSET, so page N costs the same as page 1. Cursors are
+    opaque base64 tokens carrying the boundary row's key and direction.
+    Unlike DRF's stock cursor pagination, ties on ``created_at`` are broken
+    by ``id`` rather than by an offset. Works on model querysets and on
+    ``.values()`` querysets (rows as dicts).
+    """
+    ordering = ("created_at", "id")
+    page_size_query_param = "limit"
+    max_page_size = 100
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None):
+        page_query = self._page_query(queryset, request)
+        if page_query is None:
+            return None
+        return self._set_page(list(page_query))
+
+    async def apaginate_queryset(self, queryset: QuerySet, request):
+        """``paginate_queryset`` using the async ORM (``request`` is a DRF Request)."""
+        page_query = self._page_query(queryset, request)
+        if page_query is None:
+            return None
+        return self._set_page([row async for row in page_query])
+
+    def _page_query(self, queryset: QuerySet, request) -> Optional[QuerySet]:
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.request = request
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor["reverse"])
+
+        if self.cursor is not None:
+            queryset = queryset.filter(self._seek(self.cursor, reverse))
+        order = ("-created_at", "-id") if reverse else ("created_at", "id")
+        return queryset.order_by(*order)[: self.page_size + 1]
+
+    def _set_page(self, rows: list) -> list:
+        has_more = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        if self.cursor and self.cursor["reverse"]:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    @staticmethod
+    def _seek(cursor: dict[str, Any], reverse: bool) -> Q:
+        # created_at >= c narrows to an index range; the OR breaks ties on id
+        created_at, pk = cursor["created_at"], cursor["id"]
+        if reverse:
+            return Q(created_at__lte=created_at) & (
+                Q(created_at__lt=created_at) | Q(id__lt=pk)
+            )
+        return Q(created_at__gte=created_at) & (
+            Q(created_at__gt=created_at) | Q(id__gt=pk)
+        )
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous:
+            return None
+        if not self.page:
+            # Walked past the end: step back from the start of the feed
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self._link(self.page[0], reverse=True)
+
+    def _link(self, row, reverse: bool) -> str:
+        if isinstance(row, dict):
+            created_at, pk = row["created_at"], row["id"]
+        else:
+            created_at, pk = row.created_at, row.pk
+        token = json.dumps(
+            {"c": created_at.isoformat(), "i": pk, "r": int(reverse)},
+            separators=(",", ":"),
+        )
+        encoded = urlsafe_b64encode(token.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request) -> Optional[dict[str, Any]]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            token = json.loads(urlsafe_b64decode(encoded.encode()).decode())
+            created_at = parse_datetime(token["c"])
+            if created_at is None:
+                raise ValueError(token["c"])
+            return {
+                "created_at": created_at,
+                "id": int(token["i"]),
+                "reverse": bool(token["r"]),
+            }
+        except (TypeError, ValueError, KeyError, AttributeError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class CommentSearchPagination(LimitOffsetPagination):
+    """
+    ``?search=`` results are ordered by relevance, which has no keyset to
+    seek on, so they are paged with limit/offset (capped like the feeds).
+    """
+    max_limit = 100
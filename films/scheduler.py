@@ -0,0 +1,171 @@
+from __future__ import annotations
+import logging
+import threading
+from typing import Callable, Optional
+from django.conf import settings
+from django.db import close_old_connections
+from .services import (
+    EXPIRED,
+    FRESH,
+    STALE,
+    afilm_cache_freshness,
+    async_sync_films,
+    film_cache_freshness,
+    sync_films,
+    sync_in_progress,
+)
+
+logger = logging.getLogger(__name__)
+
+_worker: Optional["PeriodicWorker"] = None
+_worker_lock = threading.Lock()
+
+
+def run_sync(blocking: bool = False) -> bool:
+    """
+    Run a single-flight SWAPI sync (see ``services.sync_films``).
+
+    With ``blocking=False`` (the scheduler default) a caller that finds a
+    sync already in flight in this process returns immediately; with
+    ``blocking=True`` it waits for that sync to finish. Returns True when a
+    sync completed on behalf of this call, False when it was skipped (e.g.
+    another worker holds the sync lock).
+    """
+    return sync_films(wait=blocking) is not None
+
+
+def refresh_if_stale() -> bool:
+    """Sync unless the film cache is still within its TTL."""
+    if film_cache_freshness() == FRESH:
+        return False
+    return run_sync()
+
+
+def _revalidate() -> None:
+    try:
+        run_sync()
+    except Exception:
+        logger.exception("Background SWAPI revalidation failed")
+    finally:
+        close_old_connections()
+
+
+def revalidate_async() -> None:
+    """Kick off a background sync unless one is already in flight."""
+    if sync_in_progress():
+        return
+    threading.Thread(target=_revalidate, name="swapi-revalidate", daemon=True).start()
+
+
+def ensure_films_fresh() -> str:
+    """
+    Apply the stale-while-revalidate policy before serving films.
+
+    Returns immediately when the cache is fresh, schedules an asynchronous
+    revalidation when it is stale-but-usable, and only blocks on a sync
+    once it is past the hard expiry. Returns the freshness observed.
+    """
+    freshness = film_cache_freshness()
+    if freshness == STALE:
+        revalidate_async()
+    elif freshness == EXPIRED:
+        run_sync(blocking=True)
+    return freshness
+
+
+async def aensure_films_fresh() -> str:
+    """
+    ``ensure_films_fresh`` for async views: an expired cache is synced with
+    the async SWAPI client instead of blocking a thread.
+    """
+    freshness = await afilm_cache_freshness()
+    if freshness == STALE:
+        revalidate_async()
+    elif freshness == EXPIRED:
+        await async_sync_films()
+    return freshness
+
+
+class PeriodicWorker:
+    """
+    Daemon thread that calls ``func`` immediately and then every
+    ``interval`` seconds until stopped; ``wake()`` triggers the next run
+    early. Exceptions are logged, never raised, so a flaky upstream can't
+    kill the loop.
+    """
+
+    def __init__(self, name: str, func: Callable[[], object], interval: float):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        self._stop.clear()
+        self._wakeup.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=self.name, daemon=True
+        )
+        self._thread.start()
+
+    def wake(self) -> None:
+        """Run the task now instead of waiting out the interval."""
+        self._wakeup.set()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_once(self) -> None:
+        try:
+            self.func()
+        except Exception:
+            logger.exception("%s: periodic task failed", self.name)
+        finally:
+            # Worker threads own their DB connections; don't leak them.
+            close_old_connections()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.run_once()
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+
+
+def start_background_sync() -> Optional[PeriodicWorker]:
+    """
+    Start the in-process SWAPI refresh worker (idempotent).
+
+    Controlled by ``settings.SWAPI_SYNC_INTERVAL`` (seconds); a value of 0
+    or less disables the worker, e.g. when syncing from cron via
+    ``manage.py sync_films`` instead.
+    """
+    global _worker
+    interval = settings.SWAPI_SYNC_INTERVAL
+    if interval <= 0:
+        return None
+    with _worker_lock:
+        if _worker is None:
+            _worker = PeriodicWorker("swapi-sync", refresh_if_stale, interval)
+        _worker.start()
+    logger.info("SWAPI background sync every %ss", interval)
+    return _worker
+
+
+def stop_background_sync(timeout: Optional[float] = None) -> None:
+    global _worker
+    with _worker_lock:
+        if _worker is not None:
+            _worker.stop(timeout)
+            _worker = None
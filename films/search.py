@@ -0,0 +1,52 @@
+from __future__ import annotations
+import re
+from django.db import connections
+from django.db.models import FloatField, QuerySet, Value
+from django.db.models.expressions import RawSQL
+from rest_framework.exceptions import ValidationError
+
+SEARCH_PARAM = "search"
+
+# Created by migration 0008: on SQLite an external-content FTS5 table over
+# films_comment(text), kept in step by triggers; on MySQL a FULLTEXT index
+FTS_TABLE = "films_comment_fts"
+
+_WORD = re.compile(r"\w+")
+
+
+def search_comments(qs: QuerySet, term: str) -> QuerySet:
+    """
+    Comments in ``qs`` containing every word of ``term``, most relevant
+    first (annotated ``relevance``, higher is better), through the
+    full-text index of the database ``qs`` reads from.
+
+    Only words count: operators and punctuation in ``term`` are ignored,
+    so user input can't produce an index syntax error. Raises
+    ``ValidationError`` when ``term`` has no words at all.
+    """
+    words = _WORD.findall(term or "")
+    if not words:
+        raise ValidationError({SEARCH_PARAM: ["Enter at least one word to search for."]})
+
+    table = qs.model._meta.db_table
+    vendor = connections[qs.db].vendor
+    if vendor == "sqlite":
+        # bm25 "rank" is lower-is-better
+        return qs.extra(
+            tables=[FTS_TABLE],
+            where=[f"{FTS_TABLE}.rowid = {table}.id", f"{FTS_TABLE} MATCH %s"],
+            params=[" ".join(f'"{w}"' for w in words)],
+            select={"relevance": f"-{FTS_TABLE}.rank"},
+        ).order_by("-relevance", "id")
+    if vendor == "mysql":
+        match = RawSQL(
+            f"MATCH ({table}.text) AGAINST (%s IN BOOLEAN MODE)",
+            (" ".join(f"+{w}" for w in words),),
+            output_field=FloatField(),
+        )
+        return qs.annotate(relevance=match).filter(relevance__gt=0).order_by("-relevance", "id")
+
+    # No full-text index on other backends: substring scan
+    for word in words:
+        qs = qs.filter(text__icontains=word)
+    return qs.annotate(relevance=Value(0.0)).order_by("id")
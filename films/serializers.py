@@ -1,4 +1,11 @@
-from rest_framework import serializers
+from datetime import date
+from typing import Any, Callable, Iterable
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from rest_framework.reverse import reverse
+from .instrumentation import SERIALIZE, timed
 from .models import Comment, Film
 
 
@@ -30,8 +37,108 @@ class CommentSerializer(serializers.ModelSerializer):
             )
         return value
     
+class BulkCommentItemSerializer(CommentSerializer):
+    """
+    One item of a bulk comment upload: CommentSerializer validation, but the
+    film is looked up in ``context["films"]`` (id -> Film, resolved for the
+    whole batch in one query) instead of one query per item.
+    """
+    film = serializers.IntegerField()
+
+    def validate_film(self, value: int) -> Film:
+        film = self.context["films"].get(value)
+        if film is None:
+            raise serializers.ValidationError(
+                f'Invalid pk "{value}" - object does not exist.'
+            )
+        return film
+
+
 class FilmDetailSerializer(FilmSerializer):
-    comments = CommentSerializer(many=True, read_only=True)
+    """
+    Film with a bounded preview of its latest comments (newest first, at
+    most FILM_DETAIL_COMMENT_PREVIEW) and a link to the full comments feed.
+    """
+    comments = serializers.SerializerMethodField()
+    comments_url = serializers.SerializerMethodField()
 
     class Meta(FilmSerializer.Meta):
-        fields = FilmSerializer.Meta.fields + ["comments"]
+        fields = FilmSerializer.Meta.fields + ["comments", "comments_url"]
+
+    def get_comments(self, film: Film) -> list:
+        # One query, walking the (film, created_at) index backwards
+        latest = film.comments.order_by("-created_at", "-id")[
+            : settings.FILM_DETAIL_COMMENT_PREVIEW
+        ]
+        return CommentSerializer(latest, many=True).data
+
+    def get_comments_url(self, film: Film) -> str:
+        return reverse(
+            "film-comments", kwargs={"pk": film.pk}, request=self.context.get("request")
+        )
+
+
+# ---------------------------------------------------------
+# Read fast path
+# ---------------------------------------------------------
+# List endpoints query .values() and build the output dicts directly instead
+# of running DRF's field-by-field serialization. The JSON shape must stay
+# identical to FilmSerializer / CommentSerializer (see the contract tests);
+# the ModelSerializers remain the write/validation path.
+
+FILM_ROW_FIELDS = ("id", "title", "release_date", "comment_count")
+COMMENT_ROW_FIELDS = ("id", "film_id", "text", "created_at")
+
+# Reuse DRF's own formatting (DATE_FORMAT / DATETIME_FORMAT, timezone)
+_date_field = serializers.DateField()
+_datetime_field = serializers.DateTimeField()
+
+
+@timed(SERIALIZE)
+def film_rows(rows: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    """``FilmSerializer(many=True).data`` for ``.values(*FILM_ROW_FIELDS)`` rows."""
+    to_date = (
+        date.isoformat
+        if api_settings.DATE_FORMAT == ISO_8601
+        else _date_field.to_representation
+    )
+    return [
+        {
+            "id": row["id"],
+            "title": row["title"],
+            "release_date": to_date(row["release_date"]),
+            "comment_count": row["comment_count"],
+        }
+        for row in rows
+    ]
+
+
+def _datetime_formatter() -> Callable[[Any], str]:
+    """
+    DateTimeField.to_representation without the per-value overhead: resolve
+    the output timezone once, then convert + isoformat (``Z`` for UTC).
+    """
+    if api_settings.DATETIME_FORMAT != ISO_8601 or not settings.USE_TZ:
+        return _datetime_field.to_representation
+    tz = timezone.get_current_timezone()
+
+    def to_datetime(value) -> str:
+        text = value.astimezone(tz).isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+    return to_datetime
+
+
+@timed(SERIALIZE)
+def comment_rows(rows: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    """``CommentSerializer(many=True).data`` for ``.values(*COMMENT_ROW_FIELDS)`` rows."""
+    to_datetime = _datetime_formatter()
+    return [
+        {
+            "id": row["id"],
+            "film": row["film_id"],
+            "text": row["text"],
+            "created_at": to_datetime(row["created_at"]),
+        }
+        for row in rows
+    ]
@@ -1,14 +1,46 @@
 from __future__ import annotations
+import hashlib
+import json
 import logging
-from typing import Optional
-import requests
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Iterator, Mapping, Optional
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.db import transaction
-from .models import Film
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from movies_api.db.router import pin_to_primary
+from .cache import invalidate_films
+from .metrics import record_sync
+from .models import Film, SyncState
+from .swapi import (
+    AsyncSwapiClient,
+    SwapiClient,
+    get_async_client,
+    get_client,
+    page_validators,
+)
 
 logger = logging.getLogger(__name__)
 
 SWAPI_FILMS_URL = f"{settings.SWAPI_BASE_URL}/films/"
+FILMS_RESOURCE = "films"
+
+SYNC_LOCK_NAME = "films:swapi-sync"
+
+# Film columns mirrored from SWAPI (everything except the id)
+SYNCED_FIELDS = ["title", "release_date"]
+
+# Freshness of the local film cache (see film_cache_freshness)
+FRESH = "fresh"
+STALE = "stale"
+EXPIRED = "expired"
 
 
 def _extract_id(url: str) -> int:
@@ -19,38 +51,413 @@ def _extract_id(url: str) -> int:
     return int(str(url).rstrip("/").split("/")[-1])
 
 
-def fetch_and_sync_films() -> None:
+@dataclass
+class SyncResult:
+    """Summary of one ``fetch_and_sync_films`` run."""
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    # True when SWAPI answered 304 or sent byte-identical content, so the
+    # apply phase was skipped entirely
+    not_modified: bool = False
+
+    @property
+    def film_count(self) -> int:
+        """Films present upstream (and therefore locally) after the sync."""
+        return self.inserted + self.updated + self.unchanged
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _film_fields(f: dict[str, Any]) -> dict[str, Any]:
+    """Map a SWAPI film record onto ``SYNCED_FIELDS`` with model-typed values."""
+    raw_date = f.get("release_date")
+    return {
+        "title": f.get("title", ""),
+        "release_date": parse_date(raw_date) if raw_date else None,
+    }
+
+
+def _upsert_films(films: dict[int, dict[str, Any]]) -> SyncResult:
+    """
+    Diff ``films`` (id -> fields) against the stored rows and write only
+    what changed: one SELECT for the existing rows, then at most one bulk
+    INSERT and one bulk UPDATE, however many films there are.
+    """
+    existing = Film.objects.in_bulk(list(films))
+    to_insert: list[Film] = []
+    to_update: list[Film] = []
+    for film_id, fields in films.items():
+        current = existing.get(film_id)
+        if current is None:
+            to_insert.append(Film(id=film_id, **fields))
+        elif any(getattr(current, k) != v for k, v in fields.items()):
+            for k, v in fields.items():
+                setattr(current, k, v)
+            to_update.append(current)
+
+    if to_insert:
+        # Upsert rather than plain insert in case another writer got there first.
+        # MySQL infers the conflict target, other backends need it spelled out.
+        unique_fields = (
+            ["id"] if connection.features.supports_update_conflicts_with_target else None
+        )
+        Film.objects.bulk_create(
+            to_insert,
+            update_conflicts=True,
+            update_fields=SYNCED_FIELDS,
+            unique_fields=unique_fields,
+        )
+    if to_update:
+        Film.objects.bulk_update(to_update, SYNCED_FIELDS)
+
+    return SyncResult(
+        inserted=len(to_insert),
+        updated=len(to_update),
+        unchanged=len(films) - len(to_insert) - len(to_update),
+    )
+
+
+def get_sync_state() -> SyncState:
+    """Return the persisted sync-state record for SWAPI films."""
+    state, _ = SyncState.objects.get_or_create(resource=FILMS_RESOURCE)
+    return state
+
+
+def film_cache_freshness(now: Optional[datetime] = None) -> str:
+    """
+    Classify the local film cache against the TTL policy:
+
+      * FRESH   -- synced within SWAPI_SYNC_TTL; serve as-is
+      * STALE   -- older, but within SWAPI_SYNC_MAX_AGE; serve and
+                   revalidate in the background
+      * EXPIRED -- past SWAPI_SYNC_MAX_AGE (or never synced with nothing
+                   stored); sync before serving
+    """
+    state = SyncState.objects.filter(resource=FILMS_RESOURCE).first()
+    if state is None or state.last_synced_at is None:
+        # Films from before sync tracking existed are still usable
+        return STALE if Film.objects.exists() else EXPIRED
+    return _freshness(state.last_synced_at, now)
+
+
+async def afilm_cache_freshness(now: Optional[datetime] = None) -> str:
+    """``film_cache_freshness`` using the async ORM."""
+    state = await SyncState.objects.filter(resource=FILMS_RESOURCE).afirst()
+    if state is None or state.last_synced_at is None:
+        return STALE if await Film.objects.aexists() else EXPIRED
+    return _freshness(state.last_synced_at, now)
+
+
+def _freshness(last_synced_at: datetime, now: Optional[datetime]) -> str:
+    age = ((now or timezone.now()) - last_synced_at).total_seconds()
+    if age <= settings.SWAPI_SYNC_TTL:
+        return FRESH
+    if age <= settings.SWAPI_SYNC_MAX_AGE:
+        return STALE
+    return EXPIRED
+
+
+def _content_hash(films: dict[int, dict[str, Any]]) -> str:
+    """Order-independent fingerprint of the normalized film records."""
+    blob = json.dumps(sorted(films.items()), default=str, separators=(",", ":"))
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def _fetch_swapi_films(
+    client: SwapiClient, previous: Optional[SyncState]
+) -> tuple[Optional[dict[int, dict[str, Any]]], dict[str, dict[str, str]]]:
+    """
+    Fetch phase: read every SWAPI page and return ``(films, validators)``
+    where ``films`` maps id -> model fields and ``validators`` maps page URL
+    -> ETag/Last-Modified. ``films`` is None when every page came back 304
+    against the validators stored in ``previous``.
+
+    Touches no database state, so slow upstream responses never hold a
+    transaction or row locks open.
+    """
+    known = previous.page_validators if previous else {}
+    return _parse_pages(client.fetch_collection(SWAPI_FILMS_URL, known), known)
+
+
+async def _afetch_swapi_films(
+    client: AsyncSwapiClient, previous: Optional[SyncState]
+) -> tuple[Optional[dict[int, dict[str, Any]]], dict[str, dict[str, str]]]:
+    """``_fetch_swapi_films`` over the async client."""
+    known = previous.page_validators if previous else {}
+    return _parse_pages(await client.fetch_collection(SWAPI_FILMS_URL, known), known)
+
+
+def _parse_pages(
+    pages: list, known: Mapping[str, Mapping[str, str]]
+) -> tuple[Optional[dict[int, dict[str, Any]]], dict[str, dict[str, str]]]:
+    # requests and httpx responses alike
+    if all(resp.status_code == 304 for resp in pages):
+        return None, dict(known)
+
+    films: dict[int, dict[str, Any]] = {}
+    for resp in pages:
+        for f in resp.json().get("results", []):
+            films[_extract_id(f["url"])] = _film_fields(f)
+    return films, {str(resp.url): page_validators(resp) for resp in pages}
+
+
+def _apply_films(films: dict[int, dict[str, Any]]) -> SyncResult:
+    """
+    Apply phase: upsert ``films`` and prune everything else. Callers wrap
+    this in a (short) transaction.
+    """
+    result = _upsert_films(films)
+    # Remove stale films that no longer exist upstream
+    _, deleted = Film.objects.exclude(id__in=films).delete()
+    result.deleted = deleted.get(Film._meta.label, 0)
+    return result
+
+
+@pin_to_primary()
+def fetch_and_sync_films(client: Optional[SwapiClient] = None) -> SyncResult:
     """
     Fetch films from SWAPI and upsert into the local DB in an idempotent way.
     Keeps a local cache in sync while treating SWAPI as the source of truth.
 
     This function:
-      * Paginates through SWAPI
-      * Upserts (by id) every film
+      * Paginates through SWAPI into memory (no transaction open), using
+        conditional requests against the last sync's validators
+      * Skips the apply phase when SWAPI answers 304 or the content hash
+        matches the last sync
+      * Bulk-upserts (by id) the films that are new or changed
       * Prunes local films not present upstream
+      * Records the outcome in the films SyncState
+
+    Only the apply phase runs inside ``transaction.atomic()``, so the write
+    transaction lasts as long as the DB writes, not the HTTP round-trips.
+    ``client`` defaults to the shared pooled ``SwapiClient``.
+    Returns a ``SyncResult`` with inserted/updated/deleted/unchanged counts.
+    All reads go to the primary, even when called from a replica-routed
+    request.
+    """
+    started = time.monotonic()
+    try:
+        previous = SyncState.objects.filter(resource=FILMS_RESOURCE).first()
+        films, validators = _fetch_swapi_films(client or get_client(), previous)
+        result = _store_films(previous, films, validators, started)
+    except Exception:
+        record_sync(time.monotonic() - started)
+        raise
+    record_sync(time.monotonic() - started, result)
+    return result
+
+
+async def afetch_and_sync_films(client: Optional[AsyncSwapiClient] = None) -> SyncResult:
+    """
+    ``fetch_and_sync_films`` for async callers: pages are fetched on the
+    event loop with the async client, then the (short, transactional)
+    apply phase runs in a worker thread.
     """
-    next_url: Optional[str] = SWAPI_FILMS_URL
-    seen_ids: set[int] = set()
+    with pin_to_primary():
+        started = time.monotonic()
+        try:
+            previous = await SyncState.objects.filter(resource=FILMS_RESOURCE).afirst()
+            films, validators = await _afetch_swapi_films(
+                client or get_async_client(), previous
+            )
+            result = await sync_to_async(_store_films)(previous, films, validators, started)
+        except Exception:
+            record_sync(time.monotonic() - started)
+            raise
+        record_sync(time.monotonic() - started, result)
+        return result
+
+
+def _store_films(
+    previous: Optional[SyncState],
+    films: Optional[dict[int, dict[str, Any]]],
+    validators: dict[str, dict[str, str]],
+    started: float,
+) -> SyncResult:
+    """Apply fetched films (unless unchanged) and record the sync."""
+    content_hash = _content_hash(films) if films is not None else None
 
+    if (
+        previous is not None
+        and (films is None or content_hash == previous.content_hash)
+        # Guard against local edits (e.g. films deleted in the admin)
+        and Film.objects.count() == previous.film_count
+    ):
+        # Steady state: no film writes, just record that the data was verified
+        result = SyncResult(unchanged=previous.film_count, not_modified=True)
+        SyncState.objects.filter(resource=FILMS_RESOURCE).update(
+            last_synced_at=timezone.now(),
+            duration_ms=int((time.monotonic() - started) * 1000),
+            page_validators=validators,
+        )
+        logger.info("SWAPI sync: films not modified upstream")
+        return result
+
+    first_page = validators.get(SWAPI_FILMS_URL, {})
     with transaction.atomic():
-        while next_url:
-            resp = requests.get(next_url, timeout=15)
-            resp.raise_for_status()
-            payload = resp.json()
-
-            for f in payload.get("results", []):
-                swapi_id = _extract_id(f["url"])
-                seen_ids.add(swapi_id)
-                Film.objects.update_or_create(
-                    id=swapi_id,
-                    defaults={
-                        "title": f.get("title", ""),
-                        "release_date": f.get("release_date"),
-                    },
-                )
-
-            next_url = payload.get("next")
-
-        # Remove stale films that no longer exist upstream
-        Film.objects.exclude(id__in=seen_ids).delete()
-        logger.info("SWAPI sync complete: %d films present", len(seen_ids))
+        result = _apply_films(films or {})
+        now = timezone.now()
+        changed = bool(result.inserted or result.updated or result.deleted)
+        SyncState.objects.update_or_create(
+            resource=FILMS_RESOURCE,
+            defaults={
+                "etag": first_page.get("etag", ""),
+                "last_modified": first_page.get("last_modified", ""),
+                "last_synced_at": now,
+                "changed_at": (
+                    now if changed or previous is None else previous.changed_at
+                ),
+                "duration_ms": int((time.monotonic() - started) * 1000),
+                "film_count": result.film_count,
+                "content_hash": content_hash or "",
+                "page_validators": validators,
+            },
+        )
+
+    if changed:
+        invalidate_films()
+    logger.info(
+        "SWAPI sync complete: %d films present (%s)",
+        result.film_count, result.as_dict(),
+    )
+    return result
+
+
+class _Flight:
+    """One in-progress sync that concurrent callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[SyncResult] = None
+        self.error: Optional[BaseException] = None
+
+
+_flight_lock = threading.Lock()
+_flight: Optional[_Flight] = None
+
+
+def sync_in_progress() -> bool:
+    """True while this process has a sync in flight."""
+    return _flight is not None
+
+
+@contextmanager
+def _cross_process_lock(timeout: int) -> Iterator[bool]:
+    """
+    Non-blocking lock shared by every worker process; yields whether it was
+    acquired. Uses MySQL ``GET_LOCK`` when available, otherwise an atomic
+    ``cache.add`` (which needs a shared cache backend, e.g. Redis or
+    Memcached, to span processes). ``timeout`` bounds how long a crashed
+    holder can keep the cache lock.
+    """
+    if connection.vendor == "mysql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT GET_LOCK(%s, 0)", [SYNC_LOCK_NAME])
+            acquired = cursor.fetchone()[0] == 1
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT RELEASE_LOCK(%s)", [SYNC_LOCK_NAME])
+        return
+
+    token = uuid.uuid4().hex
+    acquired = cache.add(SYNC_LOCK_NAME, token, timeout)
+    try:
+        yield acquired
+    finally:
+        if acquired and cache.get(SYNC_LOCK_NAME) == token:
+            cache.delete(SYNC_LOCK_NAME)
+
+
+def sync_films(
+    client: Optional[SwapiClient] = None, wait: bool = True
+) -> Optional[SyncResult]:
+    """
+    Single-flight wrapper around ``fetch_and_sync_films``.
+
+    Concurrent callers in this process coalesce onto one run: with
+    ``wait=True`` they block and share its result (or exception), with
+    ``wait=False`` they return None straight away. Across processes only the
+    holder of the sync lock runs; everyone else returns None and keeps
+    serving the existing data.
+    """
+    global _flight
+    with _flight_lock:
+        flight = _flight
+        leader = flight is None
+        if leader:
+            flight = _flight = _Flight()
+
+    if not leader:
+        if not wait:
+            return None
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        with _cross_process_lock(settings.SWAPI_SYNC_LOCK_TIMEOUT) as acquired:
+            if acquired:
+                flight.result = fetch_and_sync_films(client)
+            else:
+                logger.info("SWAPI sync running in another worker; skipping")
+    except BaseException as exc:
+        flight.error = exc
+        raise
+    finally:
+        with _flight_lock:
+            _flight = None
+        flight.done.set()
+    return flight.result
+
+
+async def async_sync_films(
+    client: Optional[AsyncSwapiClient] = None, wait: bool = True
+) -> Optional[SyncResult]:
+    """
+    ``sync_films`` for async callers, running ``afetch_and_sync_films``.
+
+    Shares ``sync_films``' flight, so sync and async callers in one process
+    coalesce onto a single run; waiting never blocks the event loop.
+    """
+    global _flight
+    with _flight_lock:
+        flight = _flight
+        leader = flight is None
+        if leader:
+            flight = _flight = _Flight()
+
+    if not leader:
+        if not wait:
+            return None
+        await sync_to_async(flight.done.wait, thread_sensitive=False)()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    # Enter/exit on the same (thread-sensitive) thread: GET_LOCK is held
+    # by the DB connection
+    lock = _cross_process_lock(settings.SWAPI_SYNC_LOCK_TIMEOUT)
+    try:
+        acquired = await sync_to_async(lock.__enter__)()
+        try:
+            if acquired:
+                flight.result = await afetch_and_sync_films(client)
+            else:
+                logger.info("SWAPI sync running in another worker; skipping")
+        finally:
+            await sync_to_async(lock.__exit__)(None, None, None)
+    except BaseException as exc:
+        flight.error = exc
+        raise
+    finally:
+        with _flight_lock:
+            _flight = None
+        flight.done.set()
+    return flight.result
@@ -0,0 +1,54 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import invalidate_film_comments, invalidate_films
+from .metrics import COMMENTS_CREATED
+from .models import Comment, Film
+
+
+@receiver(pre_save, sender=Comment)
+def remember_previous_film(sender, instance, **kwargs):
+    """On updates, note the film a comment is moving away from (if any)."""
+    if instance.pk and not instance._state.adding:
+        instance._previous_film_id = (
+            Comment.objects.filter(pk=instance.pk)
+            .values_list("film_id", flat=True)
+            .first()
+        )
+
+
+# No delete receivers on Comment: any would stop Django from fast-deleting
+# a film's comments on cascade (one SELECT + a DELETE per 100 rows instead of
+# a single DELETE). Comment delete paths invalidate explicitly instead.
+@receiver(post_save, sender=Comment)
+def invalidate_comment_caches(sender, instance, **kwargs):
+    invalidate_film_comments(instance.film_id)
+    previous = getattr(instance, "_previous_film_id", None)
+    if previous is not None and previous != instance.film_id:
+        invalidate_film_comments(previous)
+
+
+@receiver(post_save, sender=Comment)
+def touch_edited_comment_film(sender, instance, created, **kwargs):
+    """
+    Creates and deletes stamp ``Film.comments_changed_at`` together with
+    the comment_count update; in-place edits are stamped here.
+    """
+    if created:
+        return
+    previous = getattr(instance, "_previous_film_id", None)
+    film_ids = {instance.film_id} | ({previous} if previous else set())
+    Film.objects.touch_comments(*film_ids)
+
+
+@receiver(post_save, sender=Comment)
+def count_created_comment(sender, instance, created, **kwargs):
+    # bulk_create paths (bulk endpoint, queue drainer) count their own
+    if created:
+        COMMENTS_CREATED.inc(source="single")
+
+
+@receiver(post_delete, sender=Film)
+def invalidate_deleted_film(sender, instance, **kwargs):
+    # Covers its comments too (deleted with it, without signals)
+    invalidate_films()
@@ -0,0 +1,318 @@
+from __future__ import annotations
+import asyncio
+import contextvars
+import logging
+import math
+import random
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Mapping, Optional, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .instrumentation import SWAPI, timed
+
+logger = logging.getLogger(__name__)
+
+# Transient upstream failures worth retrying
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Per-page cache validators: url -> {"etag": ..., "last_modified": ...}
+Validators = Mapping[str, Mapping[str, str]]
+
+_client: Optional["SwapiClient"] = None
+_client_lock = threading.Lock()
+# httpx pools are bound to the event loop that opened them
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncSwapiClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _conditional_headers(validator: Optional[Mapping[str, str]]) -> dict[str, str]:
+    if not validator:
+        return {}
+    headers = {}
+    if validator.get("etag"):
+        headers["If-None-Match"] = validator["etag"]
+    if validator.get("last_modified"):
+        headers["If-Modified-Since"] = validator["last_modified"]
+    return headers
+
+
+def page_validators(resp: Union[requests.Response, httpx.Response]) -> dict[str, str]:
+    """The cache validators SWAPI sent for a page (empty strings if none)."""
+    return {
+        "etag": resp.headers.get("ETag", ""),
+        "last_modified": resp.headers.get("Last-Modified", ""),
+    }
+
+
+def _page_url(next_url: str, page: int) -> str:
+    """Rewrite the ``page`` query param of a SWAPI ``next`` link."""
+    parts = urlsplit(next_url)
+    query = dict(parse_qsl(parts.query))
+    query["page"] = str(page)
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class SwapiClient:
+    """
+    HTTP client for SWAPI collections.
+
+    Uses one pooled keep-alive ``requests.Session`` (so syncs don't pay a
+    TCP+TLS handshake per page), retries transient failures with
+    exponential backoff plus jitter, and fetches the remaining pages of a
+    collection concurrently once the first page reveals ``count``.
+
+    Given the validators from a previous fetch it sends conditional
+    requests (If-None-Match / If-Modified-Since), so an unchanged collection
+    costs one 304 per page and no bodies.
+
+    Pass ``session`` to swap the transport, e.g. a session with a stub
+    adapter mounted in tests.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        backoff: Optional[float] = None,
+        max_workers: Optional[int] = None,
+        session: Optional[requests.Session] = None,
+    ):
+        self.timeout = settings.SWAPI_TIMEOUT if timeout is None else timeout
+        self.max_workers = max_workers or settings.SWAPI_MAX_WORKERS
+        self.session = session or self._build_session(
+            settings.SWAPI_MAX_RETRIES if max_retries is None else max_retries,
+            settings.SWAPI_BACKOFF if backoff is None else backoff,
+        )
+
+    def _build_session(self, max_retries: int, backoff: float) -> requests.Session:
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff,
+            backoff_jitter=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            respect_retry_after_header=True,
+            # Hand the last response back so raise_for_status() reports it
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.max_workers, max_retries=retry
+        )
+        session = requests.Session()
+        session.headers["Accept"] = "application/json"
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def get(
+        self, url: str, validator: Optional[Mapping[str, str]] = None
+    ) -> requests.Response:
+        """GET ``url``; with a ``validator`` the response may be a 304."""
+        with timed(SWAPI):
+            resp = self.session.get(
+                url, headers=_conditional_headers(validator), timeout=self.timeout
+            )
+        resp.raise_for_status()
+        return resp
+
+    def fetch_collection(
+        self, url: str, validators: Optional[Validators] = None
+    ) -> list[requests.Response]:
+        """
+        Return the responses for every page of the collection at ``url``, in
+        page order. Pages 2..N are fetched concurrently when the first page
+        carries ``count``; otherwise ``next`` links are followed one by one.
+
+        With ``validators`` from a previous fetch, every page is requested
+        conditionally. Either all returned responses are 304 (nothing changed
+        upstream) or all are full 200 pages: if only some pages changed the
+        collection is re-fetched unconditionally so callers get every body.
+        """
+        if validators:
+            first = self.get(url, validators.get(url))
+            if first.status_code == 304:
+                others = [u for u in validators if u != url]
+                rest = self._map(
+                    lambda u: self.get(u, validators.get(u)), others
+                )
+                if all(r.status_code == 304 for r in rest):
+                    return [first, *rest]
+                return self.fetch_collection(url)
+        else:
+            first = self.get(url)
+
+        payload = first.json()
+        next_url = payload.get("next")
+        if not next_url:
+            return [first]
+
+        count = payload.get("count")
+        per_page = len(payload.get("results", []))
+        if not count or not per_page:
+            return [first, *self._follow(next_url)]
+
+        urls = [
+            _page_url(next_url, page)
+            for page in range(2, math.ceil(count / per_page) + 1)
+        ]
+        return [first, *self._map(self.get, urls)]
+
+    def _map(self, fetch, urls: list[str]) -> list[requests.Response]:
+        """Run ``fetch`` over ``urls`` on the thread pool, preserving order."""
+        if not urls:
+            return []
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(urls)),
+            thread_name_prefix="swapi-fetch",
+        ) as pool:
+            # Each fetch runs in a copy of the caller's context, so per-request
+            # instrumentation (films.instrumentation) still sees it
+            contexts = [contextvars.copy_context() for _ in urls]
+            return list(pool.map(lambda ctx, url: ctx.run(fetch, url), contexts, urls))
+
+    def _follow(self, next_url: Optional[str]) -> list[requests.Response]:
+        pages = []
+        while next_url:
+            resp = self.get(next_url)
+            pages.append(resp)
+            next_url = resp.json().get("next")
+        return pages
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class AsyncSwapiClient:
+    """
+    asyncio counterpart of ``SwapiClient`` on ``httpx.AsyncClient``: the
+    same pooled keep-alive connections, retry policy (exponential backoff
+    plus jitter, honouring Retry-After), conditional requests and
+    concurrent page fetches, without holding a thread per request.
+
+    Pass ``transport`` to swap the transport, e.g. ``httpx.MockTransport``
+    in tests.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        backoff: Optional[float] = None,
+        max_workers: Optional[int] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.timeout = settings.SWAPI_TIMEOUT if timeout is None else timeout
+        self.max_retries = settings.SWAPI_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff = settings.SWAPI_BACKOFF if backoff is None else backoff
+        self.max_workers = max_workers or settings.SWAPI_MAX_WORKERS
+        self.client = httpx.AsyncClient(
+            timeout=self.timeout,
+            headers={"Accept": "application/json"},
+            limits=httpx.Limits(
+                max_connections=self.max_workers,
+                max_keepalive_connections=self.max_workers,
+            ),
+            # Connection errors are retried by the transport, statuses below
+            transport=transport or httpx.AsyncHTTPTransport(retries=self.max_retries),
+            follow_redirects=True,
+        )
+
+    async def get(
+        self, url: str, validator: Optional[Mapping[str, str]] = None
+    ) -> httpx.Response:
+        """GET ``url``; with a ``validator`` the response may be a 304."""
+        headers = _conditional_headers(validator)
+        for attempt in range(self.max_retries + 1):
+            with timed(SWAPI):
+                resp = await self.client.get(url, headers=headers)
+            if resp.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                break
+            await asyncio.sleep(self._retry_delay(attempt, resp))
+        resp.raise_for_status()
+        return resp
+
+    def _retry_delay(self, attempt: int, resp: httpx.Response) -> float:
+        retry_after = resp.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff * 2 ** attempt + random.uniform(0, self.backoff)
+
+    async def fetch_collection(
+        self, url: str, validators: Optional[Validators] = None
+    ) -> list[httpx.Response]:
+        """Same contract as ``SwapiClient.fetch_collection``."""
+        if validators:
+            first = await self.get(url, validators.get(url))
+            if first.status_code == 304:
+                others = [u for u in validators if u != url]
+                rest = await self._map(
+                    lambda u: self.get(u, validators.get(u)), others
+                )
+                if all(r.status_code == 304 for r in rest):
+                    return [first, *rest]
+                return await self.fetch_collection(url)
+        else:
+            first = await self.get(url)
+
+        payload = first.json()
+        next_url = payload.get("next")
+        if not next_url:
+            return [first]
+
+        count = payload.get("count")
+        per_page = len(payload.get("results", []))
+        if not count or not per_page:
+            return [first, *await self._follow(next_url)]
+
+        urls = [
+            _page_url(next_url, page)
+            for page in range(2, math.ceil(count / per_page) + 1)
+        ]
+        return [first, *await self._map(self.get, urls)]
+
+    async def _map(self, fetch, urls: list[str]) -> list[httpx.Response]:
+        """Run ``fetch`` over ``urls`` concurrently (max_workers at a time), in order."""
+        limit = asyncio.Semaphore(self.max_workers)
+
+        async def bounded(u: str) -> httpx.Response:
+            async with limit:
+                return await fetch(u)
+
+        return list(await asyncio.gather(*(bounded(u) for u in urls)))
+
+    async def _follow(self, next_url: Optional[str]) -> list[httpx.Response]:
+        pages = []
+        while next_url:
+            resp = await self.get(next_url)
+            pages.append(resp)
+            next_url = resp.json().get("next")
+        return pages
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+def get_client() -> SwapiClient:
+    """Process-wide shared client, so the connection pool is reused."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = SwapiClient()
+    return _client
+
+
+def get_async_client() -> AsyncSwapiClient:
+    """Shared async client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = AsyncSwapiClient()
+    return client
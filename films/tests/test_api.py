@@ -1,20 +1,39 @@
+import json
 from datetime import date
 from typing import Any, Dict
 
 import pytest
+import requests
+from requests import Response
+from requests.adapters import BaseAdapter
 from django.urls import reverse
 from django.db.models import Max
 from rest_framework.test import APIClient
 from rest_framework import status
 
-from films.models import Film, Comment
-from films import services
+from films.models import Film, Comment, SyncState
+from films import services, swapi
 
 
 # ----------------------------
 # Fixtures
 # ----------------------------
 
+@pytest.fixture(autouse=True)
+def _isolated_cache():
+    # Cached responses/versions must not leak between tests (the DB doesn't)
+    from django.core.cache import cache
+    from films.cache import reset_cache_stats
+    from films.metrics import reset_metrics
+    from films.throttling import reset_throttles
+
+    cache.clear()
+    reset_cache_stats()
+    reset_throttles()
+    reset_metrics()
+    yield
+
+
 @pytest.fixture()
 def api_client() -> APIClient:
     return APIClient()
@@ -106,6 +125,25 @@ def test_retrieve_film(api_client, film_factory):
     assert payload["id"] == 42 and payload["title"] == "The Answer"
 
 
+@pytest.mark.django_db
+def test_retrieve_film_embeds_bounded_latest_comments(api_client, film_factory, comment_factory, settings):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    settings.FILM_DETAIL_COMMENT_PREVIEW = 3
+    film = film_factory(id=42)
+    for i in range(5):
+        comment_factory(film=film, text=f"c{i}")
+
+    with CaptureQueriesContext(connection) as ctx:
+        resp = api_client.get(reverse("film-detail", kwargs={"pk": film.pk}))
+    payload = resp.json()
+    assert [c["text"] for c in payload["comments"]] == ["c4", "c3", "c2"]
+    assert payload["comments_url"].endswith(reverse("film-comments", kwargs={"pk": film.pk}))
+    comment_queries = [q for q in ctx.captured_queries if "films_comment" in q["sql"]]
+    assert len(comment_queries) == 1
+
+
 @pytest.mark.django_db
 def test_retrieve_film_not_found(api_client):
     url = reverse("film-detail", kwargs={"pk": 9999})
@@ -125,8 +163,216 @@ def test_list_comments(api_client, comment_factory):
     resp = api_client.get(url)
     assert resp.status_code == status.HTTP_200_OK
     payload = resp.json()
-    assert isinstance(payload, list), "Assuming comments list view returns a bare list"
-    assert len(payload) >= 2, "Expected at least 2 comments listed"
+    # Cursor pagination shape
+    for key in ("next", "previous", "results"):
+        assert key in payload, f"Pagination key '{key}' missing from response"
+    assert len(payload["results"]) >= 2, "Expected at least 2 comments listed"
+
+
+def _walk(api_client, url, direction="next"):
+    pages = []
+    while url:
+        payload = api_client.get(url).json()
+        pages.append([c["text"] for c in payload["results"]])
+        url = payload[direction]
+    return pages
+
+
+@pytest.mark.django_db
+def test_comment_feeds_use_keyset_cursor_pagination(api_client, film_factory, comment_factory):
+    from django.utils import timezone
+
+    film = film_factory(id=1)
+    other = film_factory(id=2)
+    comments = [comment_factory(film=film, text=f"c{i}") for i in range(7)]
+    comment_factory(film=other, text="elsewhere")
+    # Identical timestamps must still page deterministically (tie-break on id)
+    Comment.objects.filter(pk__in=[c.pk for c in comments[2:5]]).update(created_at=timezone.now())
+
+    film_url = reverse("film-comments", kwargs={"pk": film.pk})
+    forward = _walk(api_client, f"{film_url}?limit=3")
+    expected = sorted(Comment.objects.filter(film=film), key=lambda c: (c.created_at, c.id))
+    assert sum(forward, []) == [c.text for c in expected]
+    assert [len(p) for p in forward] == [3, 3, 1]
+
+    # Walk back from the last page
+    last = api_client.get(f"{film_url}?limit=3").json()
+    while last["next"]:
+        last = api_client.get(last["next"]).json()
+    backward = _walk(api_client, last["previous"], direction="previous")
+    assert sum(reversed(backward), []) == [c.text for c in expected][:6]
+
+    all_comments = _walk(api_client, reverse("comment-list") + "?limit=4")
+    assert len(sum(all_comments, [])) == 8
+
+
+@pytest.mark.django_db
+def test_comment_feed_rejects_tampered_cursor(api_client, comment_factory):
+    comment_factory()
+    resp = api_client.get(reverse("comment-list"), {"cursor": "not-a-cursor"})
+    assert resp.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_comment_feed_page_queries_seek_instead_of_offset(api_client, comment_factory):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    for i in range(5):
+        comment_factory(text=f"c{i}")
+    second_page = api_client.get(reverse("comment-list"), {"limit": 2}).json()["next"]
+    with CaptureQueriesContext(connection) as ctx:
+        api_client.get(second_page)
+    sql = " ".join(q["sql"] for q in ctx.captured_queries).upper()
+    assert "OFFSET" not in sql and "COUNT(" not in sql
+
+
+@pytest.mark.django_db
+def test_export_comments_streams_ndjson_matching_serializer(api_client, comment_factory, settings):
+    from films.serializers import CommentSerializer
+
+    settings.COMMENT_EXPORT_CHUNK_SIZE = 2  # force several batches
+    comments = [comment_factory(text=f"c{i}") for i in range(5)]
+
+    resp = api_client.get(reverse("comment-export"))
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.streaming and resp["Content-Type"] == "application/x-ndjson"
+    lines = b"".join(resp.streaming_content).decode().splitlines()
+    assert [json.loads(line) for line in lines] == CommentSerializer(comments, many=True).data
+
+
+@pytest.mark.django_db
+def test_export_comments_csv_with_filters(api_client, film_factory, comment_factory):
+    import csv
+    from datetime import timedelta
+    from django.utils import timezone
+
+    film, other = film_factory(id=1), film_factory(id=2)
+    old = comment_factory(film=film, text="old, with comma")
+    Comment.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=30))
+    recent = comment_factory(film=film, text="recent")
+    comment_factory(film=other, text="other film")
+
+    since = (timezone.now() - timedelta(days=1)).isoformat()
+    resp = api_client.get(reverse("comment-export"), {"output": "csv", "film": film.pk, "since": since})
+    rows = list(csv.reader(b"".join(resp.streaming_content).decode().splitlines()))
+    assert rows[0] == ["id", "film", "text", "created_at"]
+    assert [r[:3] for r in rows[1:]] == [[str(recent.pk), "1", "recent"]]
+
+    everything = api_client.get(reverse("comment-export"), {"output": "csv", "film": film.pk})
+    texts = [r[2] for r in csv.reader(b"".join(everything.streaming_content).decode().splitlines())]
+    assert "old, with comma" in texts
+
+
+@pytest.mark.django_db
+def test_export_comments_rejects_bad_params(api_client):
+    url = reverse("comment-export")
+    assert api_client.get(url, {"output": "xml"}).status_code == status.HTTP_400_BAD_REQUEST
+    assert api_client.get(url, {"since": "yesterday"}).status_code == status.HTTP_400_BAD_REQUEST
+    assert api_client.get(url, {"film": "abc"}).status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_bulk_create_comments_mixed_films_in_constant_queries(api_client, film_factory):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    a, b = film_factory(id=1), film_factory(id=2)
+    body = [{"film": a.pk, "text": f"a{i}"} for i in range(50)] + [{"film": b.pk, "text": "b"}]
+
+    with CaptureQueriesContext(connection) as ctx:
+        resp = api_client.post(reverse("comment-bulk"), body, format="json", REMOTE_ADDR="10.0.0.9")
+
+    assert resp.status_code == status.HTTP_201_CREATED, resp.content
+    results = resp.json()
+    assert [r["status"] for r in results] == [201] * 51
+    assert results[50]["comment"]["film"] == b.pk and results[50]["comment"]["text"] == "b"
+    assert Comment.objects.filter(film=a, ip_address="10.0.0.9").count() == 50
+    a.refresh_from_db(), b.refresh_from_db()
+    assert (a.comment_count, b.comment_count) == (50, 1)
+    inserts = [q for q in ctx.captured_queries if q["sql"].startswith("INSERT")]
+    assert len(inserts) == 1
+    assert len(ctx.captured_queries) < 12, "Query count must not grow with the batch"
+
+
+@pytest.mark.django_db
+def test_bulk_create_comments_reports_per_item_errors(api_client, film_factory):
+    film = film_factory(id=1)
+    body = [
+        {"film": film.pk, "text": "ok"},
+        {"film": film.pk, "text": "   "},
+        {"film": 999, "text": "unknown film"},
+        "not an object",
+    ]
+    resp = api_client.post(reverse("comment-bulk"), body, format="json")
+
+    assert resp.status_code == status.HTTP_207_MULTI_STATUS
+    results = resp.json()
+    assert [r["status"] for r in results] == [201, 400, 400, 400]
+    assert "text" in results[1]["errors"] and "film" in results[2]["errors"]
+    assert Comment.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_bulk_create_comments_rejects_non_list_and_oversized(api_client, film_factory, settings):
+    film = film_factory(id=1)
+    url = reverse("comment-bulk")
+    assert api_client.post(url, {"film": film.pk, "text": "x"}, format="json").status_code == 400
+
+    settings.COMMENT_BULK_MAX_ITEMS = 2
+    body = [{"film": film.pk, "text": "x"}] * 3
+    assert api_client.post(url, body, format="json").status_code == 400
+    assert Comment.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_buffered_comment_post_is_queued_then_drained_once(
+    api_client, film_factory, settings, django_capture_on_commit_callbacks
+):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from films.ingest import drain_comment_queue
+    from films.models import PendingComment
+
+    settings.COMMENT_INGEST_MODE = "buffered"
+    film = film_factory(id=1)
+    url = reverse("film-comments", kwargs={"pk": film.pk})
+    for text in ("first", "second", "third"):
+        resp = api_client.post(url, {"text": text}, format="json")
+        assert resp.status_code == status.HTTP_202_ACCEPTED, resp.content
+        assert resp.json()["status"] == "queued" and resp.json()["id"]
+    assert api_client.post(url, {"text": "  "}, format="json").status_code == 400
+    assert Comment.objects.count() == 0 and PendingComment.objects.count() == 3
+    queued_at = {p.text: p.queued_at for p in PendingComment.objects.all()}
+
+    # Staging is a film lookup and an INSERT: no COUNT(*) over the queue
+    with CaptureQueriesContext(connection) as ctx:
+        api_client.post(url, {"text": "fourth"}, format="json")
+    assert len(ctx.captured_queries) == 2 and "COUNT" not in ctx.captured_queries[1]["sql"]
+    PendingComment.objects.filter(text="fourth").delete()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert drain_comment_queue(batch_size=2) == 3
+    assert drain_comment_queue() == 0
+    assert PendingComment.objects.count() == 0
+    assert sorted(Comment.objects.values_list("text", flat=True)) == ["first", "second", "third"]
+    # created_at is when the comment was posted, not when it was drained
+    assert {c.text: c.created_at for c in Comment.objects.all()} == queued_at
+    film.refresh_from_db()
+    assert film.comment_count == 3
+
+
+@pytest.mark.django_db
+def test_buffered_comment_post_applies_backpressure(api_client, film_factory, settings):
+    settings.COMMENT_INGEST_MODE = "buffered"
+    settings.COMMENT_QUEUE_MAX_SIZE = 1
+    film = film_factory(id=1)
+    url = reverse("film-comments", kwargs={"pk": film.pk})
+    assert api_client.post(url, {"text": "a"}, format="json").status_code == 202
+
+    resp = api_client.post(url, {"text": "b"}, format="json")
+    assert resp.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert int(resp["Retry-After"]) >= 1
 
 
 @pytest.mark.django_db
@@ -183,25 +429,160 @@ def test_create_comment_malformed_json_returns_400(api_client, film_factory):
 
 
 # ----------------------------
-# Services: SWAPI sync integration (mocked HTTP)
+# Comment rate limiting (per-IP token bucket)
+# ----------------------------
+
+@pytest.mark.django_db
+def test_comment_posts_throttled_per_ip_with_retry_after(api_client, film_factory, settings):
+    settings.COMMENT_RATE_LIMIT = "3/min"
+    settings.COMMENT_RATE_LEASE = 2
+    film = film_factory(id=1)
+    film_url = reverse("film-comments", kwargs={"pk": film.pk})
+    list_url = reverse("comment-list")
+
+    assert api_client.post(film_url, {"text": "a"}, format="json").status_code == 201
+    assert api_client.post(list_url, {"film": film.pk, "text": "b"}, format="json").status_code == 201
+    assert api_client.post(film_url, {"text": "c"}, format="json").status_code == 201
+
+    # Bucket shared by both endpoints; reads are never throttled
+    for url, body in ((film_url, {"text": "d"}), (list_url, {"film": film.pk, "text": "d"})):
+        resp = api_client.post(url, body, format="json")
+        assert resp.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert 1 <= int(resp["Retry-After"]) <= 60
+    assert api_client.get(film_url).status_code == 200
+
+    # Another client IP has its own bucket
+    other = api_client.post(film_url, {"text": "e"}, format="json", REMOTE_ADDR="10.0.0.2")
+    assert other.status_code == 201
+    film.refresh_from_db()
+    assert film.comment_count == 4
+
+
+@pytest.mark.django_db
+def test_comment_throttle_bucket_is_shared_across_processes(film_factory, settings):
+    from django.test import RequestFactory
+    from films import throttling
+
+    settings.COMMENT_RATE_LIMIT = "4/min"
+    settings.COMMENT_RATE_LEASE = 3
+    request = RequestFactory().post("/", REMOTE_ADDR="10.0.0.9")
+
+    allowed = [throttling.CommentRateThrottle().allow_request(request, None) for _ in range(3)]
+    # A second process starts with no lease: only 1 token is left in the cache
+    throttling.reset_throttles()
+    allowed += [throttling.CommentRateThrottle().allow_request(request, None) for _ in range(2)]
+    assert allowed == [True, True, True, True, False]
+
+
+@pytest.mark.django_db
+def test_comment_throttle_ignores_client_supplied_forwarded_for(api_client, film_factory, settings):
+    settings.COMMENT_RATE_LIMIT = "2/min"
+    film = film_factory(id=1)
+    url = reverse("film-comments", kwargs={"pk": film.pk})
+    codes = [
+        api_client.post(url, {"text": "x"}, format="json", HTTP_X_FORWARDED_FOR=f"10.9.9.{i}").status_code
+        for i in range(4)
+    ]
+    assert codes == [201, 201, 429, 429]
+
+    # Behind one trusted proxy, the entry it appended is the client
+    settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, "NUM_PROXIES": 1}
+    resp = api_client.post(url, {"text": "y"}, format="json", HTTP_X_FORWARDED_FOR="1.2.3.4, 10.0.0.7")
+    assert resp.status_code == 201
+    assert Comment.objects.filter(ip_address="10.0.0.7").exists()
+
+
+@pytest.mark.django_db
+def test_bulk_comment_posts_are_charged_per_item(api_client, film_factory, settings):
+    settings.COMMENT_BULK_RATE_LIMIT = "60/min"
+    film = film_factory(id=1)
+    url = reverse("comment-bulk")
+    batch = [{"film": film.pk, "text": f"c{i}"} for i in range(50)]
+
+    assert api_client.post(url, batch, format="json").status_code == 201
+    resp = api_client.post(url, batch, format="json")
+    assert resp.status_code == 429 and 1 <= int(resp["Retry-After"]) <= 60
+    # The refused batch gave its tokens back: a smaller one still fits
+    assert api_client.post(url, batch[:10], format="json").status_code == 201
+    assert Comment.objects.count() == 60
+
+
+@pytest.mark.django_db
+def test_async_comment_post_is_throttled(film_factory, settings):
+    from asgiref.sync import async_to_sync
+    from django.test import AsyncClient
+
+    settings.COMMENT_RATE_LIMIT = "1/hour"
+    film = film_factory(id=1)
+    url = reverse("async-film-comments", kwargs={"pk": film.pk})
+    post = async_to_sync(AsyncClient().post)
+
+    assert post(url, {"text": "a"}, content_type="application/json").status_code == 201
+    resp = post(url, {"text": "b"}, content_type="application/json")
+    assert resp.status_code == 429 and 1 <= int(resp["Retry-After"]) <= 3600
+
+
+# ----------------------------
+# Services: SWAPI sync integration (stubbed transport, no network)
 # ----------------------------
 
-class _FakeResp:
-    def __init__(self, status_code: int, payload: Dict[str, Any]):
-        self.status_code = status_code
-        self._payload = payload
+FILMS_URL = "https://swapi.dev/api/films/"
+
+
+class _StubTransport(BaseAdapter):
+    """requests transport adapter serving canned SWAPI responses by URL."""
+
+    def __init__(self):
+        super().__init__()
+        self.routes: Dict[str, Any] = {}
+        self.requests: list = []
+
+    def add(self, url, payload=None, status_code=200, headers=None):
+        self.routes[url] = (status_code, payload or {}, headers or {})
 
-    def raise_for_status(self):
-        if self.status_code >= 400:
-            from requests import HTTPError
-            raise HTTPError(f"status {self.status_code}")
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        route = self.routes.get(request.url, (404, {"detail": "Not found"}, {}))
+        if callable(route):
+            route = route(request)
+        status_code, payload, headers = route
+        resp = Response()
+        resp.status_code = status_code
+        resp._content = json.dumps(payload).encode()
+        resp.headers.update(headers)
+        resp.url = request.url
+        resp.request = request
+        return resp
 
-    def json(self):
-        return self._payload
+    def close(self):
+        pass
+
+
+@pytest.fixture()
+def swapi_stub(monkeypatch) -> _StubTransport:
+    stub = _StubTransport()
+    session = requests.Session()
+    session.mount("https://", stub)
+    session.mount("http://", stub)
+    monkeypatch.setattr(swapi, "_client", swapi.SwapiClient(session=session, max_workers=4))
+    return stub
+
+
+def _swapi_page(*films, next_url=None, count=None) -> Dict[str, Any]:
+    payload = {
+        "results": [
+            {"url": f"https://swapi.dev/api/films/{i}/", "title": t, "release_date": d}
+            for i, t, d in films
+        ],
+        "next": next_url,
+    }
+    if count is not None:
+        payload["count"] = count
+    return payload
 
 
 @pytest.mark.django_db
-def test_fetch_and_sync_films_paginates_and_prunes(monkeypatch):
+def test_fetch_and_sync_films_paginates_and_prunes(swapi_stub):
     """
     services.fetch_and_sync_films should:
       - page through results
@@ -210,37 +591,21 @@ def test_fetch_and_sync_films_paginates_and_prunes(monkeypatch):
     """
 
     # Page 1 -> two films, has next
-    page1 = _FakeResp(
-        200,
-        {
-            "results": [
-                {"url": "https://swapi.dev/api/films/1/", "title": "Film 1", "release_date": "1977-05-25"},
-                {"url": "https://swapi.dev/api/films/2/", "title": "Film 2", "release_date": "1980-05-21"},
-            ],
-            "next": "https://swapi.dev/api/films/?page=2",
-        },
+    swapi_stub.add(
+        FILMS_URL,
+        _swapi_page(
+            (1, "Film 1", "1977-05-25"),
+            (2, "Film 2", "1980-05-21"),
+            next_url=f"{FILMS_URL}?page=2",
+        ),
+        headers={"ETag": '"abc"', "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"},
     )
     # Page 2 -> one film, no next
-    page2 = _FakeResp(
-        200,
-        {
-            "results": [
-                {"url": "https://swapi.dev/api/films/3/", "title": "Film 3", "release_date": "1983-05-25"},
-            ],
-            "next": None,
-        },
-    )
-
-    calls = {"n": 0}
-
-    def fake_get(url, timeout=15):
-        calls["n"] += 1
-        return page1 if calls["n"] == 1 else page2
+    swapi_stub.add(f"{FILMS_URL}?page=2", _swapi_page((3, "Film 3", "1983-05-25")))
 
     # Seed a stale film that should be pruned
     Film.objects.create(id=99, title="Stale", release_date=date(1999, 1, 1))
 
-    monkeypatch.setattr("films.services.requests.get", fake_get)
     services.fetch_and_sync_films()
 
     ids = list(Film.objects.order_by("id").values_list("id", flat=True))
@@ -250,24 +615,609 @@ def test_fetch_and_sync_films_paginates_and_prunes(monkeypatch):
     titles = list(Film.objects.order_by("id").values_list("title", flat=True))
     assert titles == ["Film 1", "Film 2", "Film 3"]
 
+    # Sync outcome persisted for the freshness policy
+    state = SyncState.objects.get(resource=services.FILMS_RESOURCE)
+    assert state.last_synced_at is not None
+    assert state.film_count == 3
+    assert state.etag == '"abc"'
+    assert state.last_modified == "Wed, 21 Oct 2015 07:28:00 GMT"
+
+
+@pytest.mark.django_db
+def test_fetch_and_sync_films_returns_bulk_upsert_summary(swapi_stub):
+    Film.objects.create(id=1, title="Film 1", release_date=date(1977, 5, 25))
+    Film.objects.create(id=2, title="Old title", release_date=date(1980, 5, 21))
+    Film.objects.create(id=99, title="Stale", release_date=date(1999, 1, 1))
+    swapi_stub.add(FILMS_URL, _swapi_page(
+        (1, "Film 1", "1977-05-25"),
+        (2, "Film 2", "1980-05-21"),
+        (3, "Film 3", "1983-05-25"),
+    ))
+
+    result = services.fetch_and_sync_films()
+
+    assert result.as_dict() == {
+        "inserted": 1, "updated": 1, "deleted": 1, "unchanged": 1, "not_modified": False,
+    }
+    assert result.film_count == 3
+    assert Film.objects.get(id=2).title == "Film 2"
+
+
+@pytest.mark.django_db
+def test_fetch_and_sync_films_unchanged_rows_cause_no_writes(swapi_stub):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    films = [(i, f"Film {i}", "1977-05-25") for i in range(1, 51)]
+    swapi_stub.add(FILMS_URL, _swapi_page(*films))
+    services.fetch_and_sync_films()
+
+    with CaptureQueriesContext(connection) as ctx:
+        result = services.fetch_and_sync_films()
+
+    assert result.as_dict() == {
+        "inserted": 0, "updated": 0, "deleted": 0, "unchanged": 50, "not_modified": True,
+    }
+    film_writes = [
+        q["sql"] for q in ctx.captured_queries
+        if "films_film" in q["sql"] and not q["sql"].lstrip().upper().startswith("SELECT")
+    ]
+    assert film_writes == [], f"Unchanged films must not be written: {film_writes}"
+    assert len(ctx.captured_queries) < 15, "Sync should cost a constant number of queries"
+
+
+@pytest.mark.django_db
+def test_fetch_and_sync_films_sends_conditional_requests(swapi_stub):
+    page1_url, page2_url = FILMS_URL, f"{FILMS_URL}?page=2"
+    bodies = {
+        page1_url: _swapi_page((1, "Film 1", "1977-05-25"), next_url=page2_url),
+        page2_url: _swapi_page((2, "Film 2", "1980-05-21")),
+    }
+
+    def route(request):
+        etag = f'"v1-{request.url}"'
+        if request.headers.get("If-None-Match") == etag:
+            return 304, {}, {"ETag": etag}
+        return 200, bodies[request.url], {"ETag": etag}
+
+    swapi_stub.routes.update({page1_url: route, page2_url: route})
+    first = services.fetch_and_sync_films()
+    assert first.inserted == 2 and not first.not_modified
+
+    state = SyncState.objects.get(resource=services.FILMS_RESOURCE)
+    assert set(state.page_validators) == {page1_url, page2_url}
+
+    second = services.fetch_and_sync_films()
+    assert second.not_modified and second.unchanged == 2
+    conditional = [r.headers.get("If-None-Match") for r in swapi_stub.requests[2:]]
+    assert conditional == [f'"v1-{page1_url}"', f'"v1-{page2_url}"']
+
+
+@pytest.mark.django_db
+def test_fetch_and_sync_films_refetches_when_one_page_changed(swapi_stub):
+    page1_url, page2_url = FILMS_URL, f"{FILMS_URL}?page=2"
+    version = {page2_url: "v1"}
+
+    def route(request):
+        if request.url == page1_url:
+            etag = '"p1"'
+            body = _swapi_page((1, "Film 1", "1977-05-25"), next_url=page2_url)
+        else:
+            etag = f'"{version[page2_url]}"'
+            body = _swapi_page((2, f"Film 2 {version[page2_url]}", "1980-05-21"))
+        if request.headers.get("If-None-Match") == etag:
+            return 304, {}, {"ETag": etag}
+        return 200, body, {"ETag": etag}
+
+    swapi_stub.routes.update({page1_url: route, page2_url: route})
+    services.fetch_and_sync_films()
+    version[page2_url] = "v2"
+
+    result = services.fetch_and_sync_films()
+
+    assert not result.not_modified and result.updated == 1
+    assert Film.objects.get(id=2).title == "Film 2 v2"
+
 
 @pytest.mark.django_db
-def test_fetch_and_sync_films_http_error_bubbles(monkeypatch):
-    class _Err:
-        def raise_for_status(self):  # always error
-            from requests import HTTPError
-            raise HTTPError("Boom")
-        def json(self):
-            return {}
+def test_fetch_and_sync_films_no_transaction_open_during_http(swapi_stub):
+    from django.db import connection
+
+    baseline = len(connection.atomic_blocks)  # the test's own wrapping transaction
+    pages = {
+        FILMS_URL: _swapi_page((1, "Film 1", "1977-05-25"), next_url=f"{FILMS_URL}?page=2"),
+        f"{FILMS_URL}?page=2": _swapi_page((2, "Film 2", "1980-05-21")),
+    }
 
-    def fake_get(url, timeout=15):
-        return _Err()
+    def route(request):
+        assert len(connection.atomic_blocks) == baseline, "HTTP call made inside a sync transaction"
+        return 200, pages[request.url], {}
+
+    for url in pages:
+        swapi_stub.routes[url] = route
+    result = services.fetch_and_sync_films()
+    assert result.inserted == 2
+
+
+@pytest.mark.django_db
+def test_fetch_and_sync_films_upstream_error_leaves_db_untouched(swapi_stub, film_factory):
+    from requests import HTTPError
 
-    monkeypatch.setattr("films.services.requests.get", fake_get)
+    film_factory(id=1, title="Kept")
+    swapi_stub.add(FILMS_URL, _swapi_page((2, "Film 2", "1980-05-21"), next_url=f"{FILMS_URL}?page=2"))
+    swapi_stub.add(f"{FILMS_URL}?page=2", {"detail": "page 2 failed"}, status_code=500)
+
+    with pytest.raises(HTTPError):
+        services.fetch_and_sync_films()
+    assert list(Film.objects.values_list("id", flat=True)) == [1], "Partial fetch must not be applied"
+
+
+@pytest.mark.django_db
+def test_fetch_and_sync_films_http_error_bubbles(swapi_stub):
+    swapi_stub.add(FILMS_URL, {"detail": "Boom"}, status_code=500)
 
     with pytest.raises(Exception) as exc:
         services.fetch_and_sync_films()
-    assert "Boom" in str(exc.value)
+    assert "500" in str(exc.value)
+
+
+@pytest.mark.django_db
+def test_swapi_client_fetches_known_pages_concurrently(swapi_stub):
+    import threading
+
+    # count=5 with 2 per page -> pages 2 and 3 are known after page 1
+    swapi_stub.add(FILMS_URL, _swapi_page(
+        (1, "Film 1", "1977-05-25"), (2, "Film 2", "1980-05-21"),
+        next_url=f"{FILMS_URL}?page=2", count=5,
+    ))
+    barrier = threading.Barrier(2, timeout=2)
+
+    def concurrent_page(films):
+        def route(request):
+            barrier.wait()  # only passes if both pages are in flight together
+            return 200, _swapi_page(*films, count=5), {}
+        return route
+
+    swapi_stub.routes[f"{FILMS_URL}?page=2"] = concurrent_page(
+        [(3, "Film 3", "1983-05-25"), (4, "Film 4", "1999-05-19")]
+    )
+    swapi_stub.routes[f"{FILMS_URL}?page=3"] = concurrent_page([(5, "Film 5", "2002-05-16")])
+
+    result = services.fetch_and_sync_films()
+
+    assert result.inserted == 5
+    assert len(swapi_stub.requests) == 3
+
+
+def test_swapi_client_reuses_one_pooled_session():
+    assert swapi.get_client() is swapi.get_client()
+    assert swapi.get_client().session.get_adapter("https://swapi.dev").max_retries.total >= 1
+
+
+def test_swapi_client_retries_transient_errors_against_local_server():
+    import threading
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    hits = {"n": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits["n"] += 1
+            body = json.dumps(_swapi_page((1, "Film 1", "1977-05-25"))).encode()
+            self.send_response(503 if hits["n"] == 1 else 200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = swapi.SwapiClient(max_retries=2, backoff=0, timeout=5)
+        pages = client.fetch_collection(f"http://127.0.0.1:{server.server_port}/api/films/")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert hits["n"] == 2, "First 503 should be retried"
+    assert pages[0].json()["results"][0]["title"] == "Film 1"
+
+
+# ----------------------------
+# Background sync scheduler
+# ----------------------------
+
+def _mark_synced(seconds_ago: int = 0) -> None:
+    from datetime import timedelta
+    from django.utils import timezone
+
+    SyncState.objects.update_or_create(
+        resource=services.FILMS_RESOURCE,
+        defaults={"last_synced_at": timezone.now() - timedelta(seconds=seconds_ago)},
+    )
+
+
+@pytest.mark.django_db
+def test_list_films_serves_from_db_without_syncing(api_client, film_factory, monkeypatch):
+    film_factory(id=1)
+    _mark_synced()
+    calls = {"n": 0}
+
+    def fake_sync(client=None):
+        calls["n"] += 1
+        return services.SyncResult()
+
+    monkeypatch.setattr("films.services.fetch_and_sync_films", fake_sync)
+    resp = api_client.get(reverse("film-list"))
+    assert resp.status_code == status.HTTP_200_OK
+    assert calls["n"] == 0, "List must not hit SWAPI when films are already stored"
+
+
+@pytest.mark.django_db
+def test_list_films_syncs_inline_when_table_empty(api_client, monkeypatch):
+    def fake_sync(client=None):
+        Film.objects.create(id=4, title="A New Hope", release_date=date(1977, 5, 25))
+        return services.SyncResult(inserted=1)
+
+    monkeypatch.setattr("films.services.fetch_and_sync_films", fake_sync)
+    resp = api_client.get(reverse("film-list"))
+    assert resp.status_code == status.HTTP_200_OK
+    assert [f["id"] for f in resp.json()["results"]] == [4]
+
+
+@pytest.mark.django_db
+def test_film_cache_freshness_policy(settings, film_factory):
+    settings.SWAPI_SYNC_TTL = 60
+    settings.SWAPI_SYNC_MAX_AGE = 3600
+
+    assert services.film_cache_freshness() == services.EXPIRED, "Never synced, nothing stored"
+    film_factory(id=1)
+    assert services.film_cache_freshness() == services.STALE, "Untracked films are usable"
+
+    _mark_synced(seconds_ago=10)
+    assert services.film_cache_freshness() == services.FRESH
+    _mark_synced(seconds_ago=600)
+    assert services.film_cache_freshness() == services.STALE
+    _mark_synced(seconds_ago=7200)
+    assert services.film_cache_freshness() == services.EXPIRED
+
+
+@pytest.mark.django_db
+def test_ensure_films_fresh_revalidates_stale_in_background(monkeypatch, film_factory):
+    from films import scheduler
+
+    film_factory(id=1)
+    _mark_synced(seconds_ago=3600)  # past TTL, within max age
+    calls = {"async": 0, "sync": 0}
+    monkeypatch.setattr(scheduler, "revalidate_async", lambda: calls.__setitem__("async", calls["async"] + 1))
+    monkeypatch.setattr(scheduler, "run_sync", lambda blocking=False: calls.__setitem__("sync", calls["sync"] + 1))
+
+    assert scheduler.ensure_films_fresh() == services.STALE
+    assert calls == {"async": 1, "sync": 0}, "Stale data is served while revalidating asynchronously"
+
+
+@pytest.mark.django_db
+def test_ensure_films_fresh_blocks_when_expired(monkeypatch, film_factory):
+    from films import scheduler
+
+    film_factory(id=1)
+    _mark_synced(seconds_ago=10 * 86400)
+    calls = {"async": 0, "sync": 0}
+    monkeypatch.setattr(scheduler, "revalidate_async", lambda: calls.__setitem__("async", calls["async"] + 1))
+    monkeypatch.setattr(scheduler, "run_sync", lambda blocking=False: calls.__setitem__("sync", calls["sync"] + 1))
+
+    assert scheduler.ensure_films_fresh() == services.EXPIRED
+    assert calls == {"async": 0, "sync": 1}
+
+
+def test_sync_films_coalesces_concurrent_callers(monkeypatch):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    calls = {"n": 0}
+    release = threading.Event()
+
+    def slow_sync(client=None):
+        calls["n"] += 1
+        release.wait(2)
+        return services.SyncResult(unchanged=6)
+
+    monkeypatch.setattr(services, "fetch_and_sync_films", slow_sync)
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(services.sync_films) for _ in range(5)]
+        while not services.sync_in_progress():
+            pass
+        assert services.sync_films(wait=False) is None, "Non-waiting callers skip"
+        release.set()
+        results = [f.result(timeout=5) for f in futures]
+
+    assert calls["n"] == 1, "Only one upstream sync should run"
+    assert all(r is results[0] for r in results), "Waiters share the leader's result"
+    assert not services.sync_in_progress()
+
+
+def test_sync_films_shares_leader_exception(monkeypatch):
+    def failing_sync(client=None):
+        raise RuntimeError("SWAPI down")
+
+    monkeypatch.setattr(services, "fetch_and_sync_films", failing_sync)
+    with pytest.raises(RuntimeError):
+        services.sync_films()
+    assert not services.sync_in_progress(), "Failed flights must not wedge later syncs"
+
+
+def test_sync_films_skips_when_another_worker_holds_lock(monkeypatch):
+    from django.core.cache import cache
+
+    calls = {"n": 0}
+    monkeypatch.setattr(services, "fetch_and_sync_films", lambda client=None: calls.__setitem__("n", 1))
+
+    cache.add(services.SYNC_LOCK_NAME, "other-worker", 30)
+    try:
+        assert services.sync_films() is None
+    finally:
+        cache.delete(services.SYNC_LOCK_NAME)
+    assert calls["n"] == 0
+
+    services.sync_films()
+    assert calls["n"] == 1
+    assert cache.get(services.SYNC_LOCK_NAME) is None, "Lock released after the sync"
+
+
+def test_periodic_worker_runs_and_survives_errors():
+    import threading
+    from films.scheduler import PeriodicWorker
+
+    ran = threading.Event()
+    calls = {"n": 0}
+
+    def task():
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise RuntimeError("upstream down")
+        ran.set()
+
+    worker = PeriodicWorker("test-worker", task, interval=0.01)
+    worker.start()
+    try:
+        assert ran.wait(2), "Worker should keep running after a failed tick"
+    finally:
+        worker.stop(timeout=2)
+    assert not worker.is_running
+
+
+def test_start_background_sync_disabled_by_interval(settings):
+    from films.scheduler import start_background_sync
+
+    settings.SWAPI_SYNC_INTERVAL = 0
+    assert start_background_sync() is None
+
+
+@pytest.mark.django_db
+def test_sync_films_command(monkeypatch):
+    from io import StringIO
+    from django.core.management import call_command
+
+    calls = {"n": 0}
+    monkeypatch.setattr(
+        "films.services.fetch_and_sync_films",
+        lambda client=None: calls.__setitem__("n", 1) or services.SyncResult(),
+    )
+    out = StringIO()
+    call_command("sync_films", stdout=out)
+    assert calls["n"] == 1
+    assert "complete" in out.getvalue()
+
+
+# ----------------------------
+# Response cache
+# ----------------------------
+
+@pytest.mark.django_db
+def test_film_list_served_from_cache_until_comment_changes(
+    api_client, film_factory, django_capture_on_commit_callbacks
+):
+    from films.cache import cache_stats
+
+    film = film_factory(id=1)
+    _mark_synced()
+    url = reverse("film-list")
+
+    first = api_client.get(url)
+    second = api_client.get(url)
+    assert (first["X-Cache"], second["X-Cache"]) == ("MISS", "HIT")
+    assert first.json() == second.json()
+    assert api_client.get(url, {"limit": 1})["X-Cache"] == "MISS", "Query params are part of the key"
+    # ...but only the ones the list reads, normalized like the paginator does
+    for params in ({"x": 1}, {"x": 2, "limit": "junk"}, {"limit": 6, "offset": 0}):
+        assert api_client.get(url, params)["X-Cache"] == "HIT", params
+
+    with django_capture_on_commit_callbacks(execute=True):
+        api_client.post(reverse("film-comments", kwargs={"pk": film.pk}), {"text": "hi"}, format="json")
+    third = api_client.get(url)
+    assert third["X-Cache"] == "MISS"
+    assert third.json()["results"][0]["comment_count"] == 1
+    assert cache_stats()["hits"] == 4
+
+
+@pytest.mark.django_db
+def test_film_detail_invalidated_only_for_that_film(
+    api_client, film_factory, django_capture_on_commit_callbacks
+):
+    a, b = film_factory(id=1), film_factory(id=2)
+    url_a = reverse("film-detail", kwargs={"pk": a.pk})
+    url_b = reverse("film-detail", kwargs={"pk": b.pk})
+    api_client.get(url_a), api_client.get(url_b)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        comment = Comment.objects.create(film=a, text="first!")
+    assert api_client.get(url_a)["X-Cache"] == "MISS"
+    assert api_client.get(url_b)["X-Cache"] == "HIT"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        api_client.delete(reverse("comment-detail", kwargs={"pk": comment.pk}))
+    resp = api_client.get(url_a)
+    assert resp["X-Cache"] == "MISS" and resp.json()["comments"] == []
+    assert api_client.get(url_b)["X-Cache"] == "HIT"
+
+
+@pytest.mark.django_db
+def test_pruned_film_cascades_its_comments_in_one_delete(
+    film_factory, comment_factory, django_capture_on_commit_callbacks
+):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    film = film_factory(id=1)
+    for _ in range(150):
+        comment_factory(film=film)
+
+    with CaptureQueriesContext(connection) as ctx, django_capture_on_commit_callbacks(execute=True):
+        services._apply_films({})
+    comment_sql = [q["sql"] for q in ctx.captured_queries if '"films_comment"' in q["sql"]]
+    # A fast delete: no SELECT of the comment rows, no batched DELETE ... IN (...)
+    assert len(comment_sql) == 1 and comment_sql[0].startswith("DELETE"), comment_sql
+    assert not Comment.objects.exists()
+
+
+@pytest.mark.django_db
+def test_film_caches_invalidated_by_sync(
+    api_client, film_factory, swapi_stub, django_capture_on_commit_callbacks
+):
+    film_factory(id=1, title="Old")
+    _mark_synced()
+    url = reverse("film-detail", kwargs={"pk": 1})
+    api_client.get(url)
+
+    swapi_stub.add(FILMS_URL, _swapi_page((1, "New", "1977-05-25")))
+    with django_capture_on_commit_callbacks(execute=True):
+        services.fetch_and_sync_films()
+
+    resp = api_client.get(url)
+    assert resp["X-Cache"] == "MISS" and resp.json()["title"] == "New"
+
+
+@pytest.mark.django_db
+def test_cache_stats_requires_admin(api_client, admin_user):
+    url = reverse("cache-stats")
+    assert api_client.get(url).status_code in {status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN}
+    api_client.force_authenticate(admin_user)
+    assert set(api_client.get(url).json()) == {"hits", "misses", "hit_ratio"}
+
+
+# ----------------------------
+# Denormalized comment_count
+# ----------------------------
+
+@pytest.mark.django_db
+def test_comment_count_maintained_on_comment_writes(api_client, film_factory):
+    a, b = film_factory(id=1), film_factory(id=2)
+
+    api_client.post(reverse("film-comments", kwargs={"pk": a.pk}), {"text": "one"}, format="json")
+    resp = api_client.post(reverse("comment-list"), {"film": a.pk, "text": "two"}, format="json")
+    a.refresh_from_db()
+    assert a.comment_count == 2
+
+    detail = reverse("comment-detail", kwargs={"pk": resp.json()["id"]})
+    api_client.patch(detail, {"film": b.pk}, format="json")
+    a.refresh_from_db(), b.refresh_from_db()
+    assert (a.comment_count, b.comment_count) == (1, 1)
+
+    api_client.delete(detail)
+    b.refresh_from_db()
+    assert b.comment_count == 0
+
+
+@pytest.mark.django_db
+def test_deleting_comment_when_count_already_zero(api_client, film_factory, comment_factory):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    film = film_factory(id=1)
+    comment = comment_factory(film=film)  # outside the API: count never incremented
+    with CaptureQueriesContext(connection) as ctx:
+        resp = api_client.delete(reverse("comment-detail", kwargs={"pk": comment.pk}))
+    assert resp.status_code == status.HTTP_204_NO_CONTENT
+    film.refresh_from_db()
+    assert film.comment_count == 0
+    # The decrement is guarded, never comment_count - 1 on a 0 (UNSIGNED on MySQL)
+    update = next(q["sql"] for q in ctx.captured_queries if q["sql"].startswith('UPDATE "films_film"'))
+    assert "CASE WHEN" in update
+
+@pytest.mark.django_db
+def test_film_list_reads_stored_comment_count_without_join(api_client, film_factory):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    film_factory(id=1, comment_count=3)
+    _mark_synced()
+    with CaptureQueriesContext(connection) as ctx:
+        resp = api_client.get(reverse("film-list"))
+    assert resp.json()["results"][0]["comment_count"] == 3
+    assert not any("films_comment" in q["sql"] for q in ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_reconcile_comment_counts_command(film_factory, comment_factory):
+    from io import StringIO
+    from django.core.management import call_command
+
+    film = film_factory(id=1, comment_count=7)
+    comment_factory(film=film)
+
+    out = StringIO()
+    call_command("reconcile_comment_counts", "--dry-run", stdout=out)
+    film.refresh_from_db()
+    assert film.comment_count == 7 and "Found 1" in out.getvalue()
+
+    call_command("reconcile_comment_counts", stdout=StringIO())
+    film.refresh_from_db()
+    assert film.comment_count == 1
+
+
+# ----------------------------
+# Read fast path: contract with the ModelSerializers
+# ----------------------------
+
+@pytest.mark.django_db
+def test_film_rows_match_film_serializer(film_factory):
+    from films.serializers import FILM_ROW_FIELDS, FilmSerializer, film_rows
+
+    film_factory(id=1, title="Ünïcode “quotes”", comment_count=3)
+    film_factory(id=2, title="", release_date=date(2005, 5, 19))
+    qs = Film.objects.order_by("id")
+    assert film_rows(qs.values(*FILM_ROW_FIELDS)) == FilmSerializer(qs, many=True).data
+
+
+@pytest.mark.django_db
+def test_comment_rows_match_comment_serializer(comment_factory):
+    from datetime import datetime, timezone as dt_timezone
+    from films.serializers import COMMENT_ROW_FIELDS, CommentSerializer, comment_rows
+
+    comment_factory(text="plain")
+    c = comment_factory(text="emoji 🚀 and \"quotes\"")
+    # Cover whole-second timestamps too (isoformat() omits the fraction)
+    Comment.objects.filter(pk=c.pk).update(created_at=datetime(2020, 1, 1, tzinfo=dt_timezone.utc))
+    qs = Comment.objects.order_by("id")
+    assert comment_rows(qs.values(*COMMENT_ROW_FIELDS)) == CommentSerializer(qs, many=True).data
+
+
+@pytest.mark.django_db
+def test_list_endpoints_json_matches_serializers(api_client, film_factory, comment_factory):
+    from films.serializers import CommentSerializer, FilmSerializer
+
+    film = film_factory(id=1, comment_count=2)
+    comments = [comment_factory(film=film, text=f"c{i}") for i in range(2)]
+    _mark_synced()
+
+    films = api_client.get(reverse("film-list")).json()["results"]
+    assert films == FilmSerializer(Film.objects.all(), many=True).data
+    expected = CommentSerializer(comments, many=True).data
+    assert api_client.get(reverse("comment-list")).json()["results"] == expected
+    assert api_client.get(reverse("film-comments", kwargs={"pk": 1})).json()["results"] == expected
 
 
 # ----------------------------
@@ -286,3 +1236,595 @@ def test_disallowed_methods(api_client, film_factory):
         resp = getattr(api_client, method)(list_url if method == "post" else detail_url, data={})
         assert resp.status_code in {status.HTTP_403_FORBIDDEN, status.HTTP_405_METHOD_NOT_ALLOWED}, \
             f"{method.upper()} should be blocked (got {resp.status_code})"
+
+
+# ----------------------------
+# Conditional GET (ETag / Last-Modified)
+# ----------------------------
+
+@pytest.mark.django_db
+def test_film_list_and_detail_answer_304_until_comments_change(api_client, film_factory):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    film = film_factory(id=1)
+    _mark_synced()
+    for url in (reverse("film-list"), reverse("film-detail", kwargs={"pk": film.pk})):
+        first = api_client.get(url)
+        assert first.status_code == 200 and first["ETag"]
+        assert "no-cache" in first["Cache-Control"]
+
+        with CaptureQueriesContext(connection) as ctx:
+            again = api_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        assert again.status_code == status.HTTP_304_NOT_MODIFIED
+        assert again["ETag"] == first["ETag"] and not again.content
+        sql = " ".join(q["sql"] for q in ctx.captured_queries)
+        assert '"films_comment"' not in sql, "304 must not touch the comments table"
+
+    etags = {
+        url: api_client.get(url)["ETag"]
+        for url in (reverse("film-list"), reverse("film-detail", kwargs={"pk": film.pk}))
+    }
+    api_client.post(reverse("film-comments", kwargs={"pk": film.pk}), {"text": "new"}, format="json")
+    for url, etag in etags.items():
+        resp = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert resp.status_code == 200 and resp["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_comment_feed_etag_respects_pagination_params(api_client, film_factory, comment_factory):
+    film = film_factory(id=1)
+    url = reverse("film-comments", kwargs={"pk": film.pk})
+    api_client.post(url, {"text": "first"}, format="json")
+
+    page = api_client.get(url, {"limit": 1})
+    other = api_client.get(url, {"limit": 2})
+    assert page["ETag"] != other["ETag"]
+    assert api_client.get(url, {"limit": 1}, HTTP_IF_NONE_MATCH=page["ETag"]).status_code == 304
+    assert api_client.get(url, {"limit": 1}, HTTP_IF_MODIFIED_SINCE=page["Last-Modified"]).status_code == 304
+
+    # Edits in place change the validator too
+    comment = Comment.objects.get()
+    api_client.patch(reverse("comment-detail", kwargs={"pk": comment.pk}), {"text": "edited"}, format="json")
+    assert api_client.get(url, {"limit": 1}, HTTP_IF_NONE_MATCH=page["ETag"]).status_code == 200
+
+    listed = api_client.get(reverse("comment-list"))
+    assert api_client.get(reverse("comment-list"), HTTP_IF_NONE_MATCH=listed["ETag"]).status_code == 304
+
+
+@pytest.mark.django_db
+def test_film_routes_with_non_numeric_pk_are_404(api_client):
+    assert api_client.get("/api/films/abc/").status_code == 404
+    assert api_client.get("/api/films/abc/comments/").status_code == 404
+    assert api_client.post("/api/films/abc/comments/", {"text": "hi"}, format="json").status_code == 404
+
+
+# ----------------------------
+# Database connection pooling (SQLite stand-in for MySQL)
+# ----------------------------
+
+def _pooled_sqlite(tmp_path, alias, **overrides):
+    from django.db.backends.sqlite3 import base
+    from django.db.utils import ConnectionHandler
+    from movies_api.db.pool import PooledDatabaseWrapperMixin
+
+    class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+        pass
+
+    config = {"ENGINE": "django.db.backends.sqlite3", "NAME": str(tmp_path / "pool.sqlite3")}
+    settings_dict = ConnectionHandler({"default": {**config, **overrides}}).settings["default"]
+    return DatabaseWrapper(settings_dict, alias=alias)
+
+
+@pytest.mark.django_db
+def test_pooled_backend_parks_and_reuses_connections(tmp_path):
+    from movies_api.db.pool import close_pools
+
+    conn = _pooled_sqlite(tmp_path, "pool-test", POOL={"size": 1})
+    other = _pooled_sqlite(tmp_path, "pool-test", POOL={"size": 1})
+    try:
+        conn.ensure_connection()
+        raw = conn.connection
+        conn.close()
+        assert conn.connection is None and len(conn.pool) == 1
+
+        conn.ensure_connection()
+        assert conn.connection is raw and len(conn.pool) == 0
+
+        # Over capacity: the second connection is closed, not parked
+        other.ensure_connection()
+        conn.close()
+        other.close()
+        assert len(conn.pool) == 1
+
+        # Never park a connection with an open transaction
+        conn.ensure_connection()
+        conn.set_autocommit(False)
+        conn.close()
+        assert len(conn.pool) == 0
+    finally:
+        close_pools()
+
+
+# ----------------------------
+# Read-replica routing (a second SQLite database as the replica)
+# ----------------------------
+
+@pytest.fixture()
+def replica_db(tmp_path, settings):
+    from django.db import connections
+    from django.db.utils import load_backend
+
+    # Registered as a dynamic connection (not in DATABASES), which Django's
+    # test isolation lets through
+    alias = "replica1"
+    config = {**connections.settings["default"], "NAME": str(tmp_path / "replica.sqlite3")}
+    replica = load_backend(config["ENGINE"]).DatabaseWrapper(config, alias)
+    connections[alias] = replica
+    settings.DATABASE_REPLICAS = [alias]
+    with replica.schema_editor() as editor:
+        for model in (Film, Comment, SyncState):
+            editor.create_model(model)
+    yield alias
+    replica.close()
+    del connections[alias]
+
+
+@pytest.mark.django_db
+def test_reads_go_to_replica_until_client_writes(
+    api_client, film_factory, replica_db, django_capture_on_commit_callbacks
+):
+    film_factory(id=1, title="On the primary")
+    Film.objects.using(replica_db).create(id=1, title="On the replica", release_date=date(1977, 5, 25))
+    _mark_synced()
+    SyncState.objects.using(replica_db).create(**SyncState.objects.values().get())
+
+    detail = reverse("film-detail", kwargs={"pk": 1})
+    comments = reverse("film-comments", kwargs={"pk": 1})
+    Comment.objects.using(replica_db).create(film_id=1, text="replicated")
+    assert len(api_client.get(comments).json()["results"]) == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = api_client.post(comments, {"text": "hi"}, format="json")
+    assert resp.status_code == 201 and "db_primary" in resp.cookies
+    assert Comment.objects.using(replica_db).count() == 1
+
+    # The cookie pins this client's reads to the primary (replica still lags)
+    assert [c["text"] for c in api_client.get(comments).json()["results"]] == ["hi"]
+    assert [c["text"] for c in APIClient().get(comments).json()["results"]] == ["replicated"]
+
+    # Cached film responses are built from the primary even for replica
+    # readers: the lagging replica must not be cached under the new version
+    payload = APIClient().get(detail).json()
+    assert payload["title"] == "On the primary" and payload["comment_count"] == 1
+    assert api_client.get(detail).json() == payload
+
+
+def test_router_keeps_writes_and_sync_on_primary(settings):
+    from movies_api.db.router import ReplicaRouter, pin_to_primary, read_from_replica
+
+    settings.DATABASE_REPLICAS = ["replica1", "replica2"]
+    router = ReplicaRouter()
+    assert router.db_for_read(Film) == "default"
+    with read_from_replica() as alias:
+        assert alias in settings.DATABASE_REPLICAS
+        assert router.db_for_read(Film) == alias
+        assert router.db_for_write(Film) == "default"
+        with pin_to_primary():
+            assert router.db_for_read(Film) == "default"
+        assert router.db_for_read(Film) == alias
+    assert router.allow_migrate("replica1", "films") is False
+
+
+# ----------------------------
+# Async (ASGI) views and SWAPI client
+# ----------------------------
+
+@pytest.fixture()
+def async_swapi(swapi_stub, monkeypatch) -> _StubTransport:
+    """Serve ``swapi_stub``'s routes to the async client too."""
+    import httpx
+
+    def handle(request):
+        route = swapi_stub.routes.get(str(request.url), (404, {"detail": "Not found"}, {}))
+        status_code, payload, headers = route
+        swapi_stub.requests.append(request)
+        return httpx.Response(status_code, json=payload, headers=headers)
+
+    monkeypatch.setattr(
+        services,
+        "get_async_client",
+        lambda: swapi.AsyncSwapiClient(transport=httpx.MockTransport(handle), max_workers=4),
+    )
+    return swapi_stub
+
+
+def _aget(url, **kwargs):
+    from asgiref.sync import async_to_sync
+    from django.test import AsyncClient
+
+    return async_to_sync(AsyncClient().get)(url, **kwargs)
+
+
+@pytest.mark.django_db
+def test_async_endpoints_match_sync_payloads(api_client, film_factory):
+    film = film_factory(id=1, title="A New Hope")
+    film_factory(id=2, title="The Empire Strikes Back", release_date=date(1980, 5, 17))
+    _mark_synced()
+    for text in ("first", "second"):
+        api_client.post(reverse("film-comments", kwargs={"pk": film.pk}), {"text": text}, format="json")
+
+    pairs = [
+        ("film-list", "async-film-list", {}),
+        ("comment-list", "async-comment-list", {}),
+        ("film-comments", "async-film-comments", {"pk": film.pk}),
+    ]
+    for sync_name, async_name, kwargs in pairs:
+        expected = api_client.get(reverse(sync_name, kwargs=kwargs), {"limit": 1}).json()
+        resp = _aget(reverse(async_name, kwargs=kwargs), data={"limit": 1})
+        assert resp.status_code == 200 and resp["ETag"]
+        payload = resp.json()
+        assert payload["results"] == expected["results"]
+        assert bool(payload["next"]) == bool(expected["next"])
+
+    detail = _aget(reverse("async-film-detail", kwargs={"pk": film.pk})).json()
+    expected = api_client.get(reverse("film-detail", kwargs={"pk": film.pk})).json()
+    assert {**detail, "comments_url": None} == {**expected, "comments_url": None}
+    assert detail["comments_url"].endswith(reverse("async-film-comments", kwargs={"pk": film.pk}))
+    assert _aget(reverse("async-film-detail", kwargs={"pk": 99})).status_code == 404
+
+
+@pytest.mark.django_db
+def test_async_comment_post_creates_and_validates(film_factory):
+    from asgiref.sync import async_to_sync
+    from django.test import AsyncClient
+
+    film = film_factory(id=1)
+    url = reverse("async-film-comments", kwargs={"pk": film.pk})
+    post = async_to_sync(AsyncClient().post)
+
+    resp = post(url, {"text": "async hello"}, content_type="application/json")
+    assert resp.status_code == 201 and resp.json()["text"] == "async hello"
+    assert post(url, {"text": "   "}, content_type="application/json").status_code == 400
+    missing = reverse("async-film-comments", kwargs={"pk": 99})
+    assert post(missing, {"text": "x"}, content_type="application/json").status_code == 404
+    film.refresh_from_db()
+    assert film.comment_count == 1
+
+
+@pytest.mark.django_db
+def test_async_sync_fetches_with_async_client(async_swapi):
+    from asgiref.sync import async_to_sync
+
+    async_swapi.add(
+        FILMS_URL,
+        _swapi_page((1, "A New Hope", "1977-05-25"), next_url=f"{FILMS_URL}?page=2", count=2),
+        headers={"ETag": '"p1"'},
+    )
+    async_swapi.add(f"{FILMS_URL}?page=2", _swapi_page((2, "Empire", "1980-05-17")))
+
+    result = async_to_sync(services.async_sync_films)()
+    assert result.inserted == 2
+    assert set(Film.objects.values_list("title", flat=True)) == {"A New Hope", "Empire"}
+    state = SyncState.objects.get()
+    assert state.page_validators[FILMS_URL]["etag"] == '"p1"'
+
+    # Expired cache: the async list view syncs through the async client
+    Film.objects.all().delete()
+    SyncState.objects.all().delete()
+    resp = _aget(reverse("async-film-list"))
+    assert resp.status_code == 200 and resp.json()["count"] == 2
+
+
+# ----------------------------
+# Request instrumentation (Server-Timing / log lines)
+# ----------------------------
+
+def _server_timing(resp) -> Dict[str, Dict[str, str]]:
+    metrics = {}
+    for entry in resp["Server-Timing"].split(", "):
+        name, *params = entry.split(";")
+        metrics[name] = dict(p.split("=", 1) for p in params)
+    return metrics
+
+
+@pytest.mark.django_db
+def test_instrumentation_is_off_by_default(api_client, film_factory):
+    film_factory(id=1)
+    _mark_synced()
+    assert not api_client.get(reverse("film-list")).has_header("Server-Timing")
+
+
+@pytest.mark.django_db
+def test_instrumentation_reports_db_swapi_and_serialization(swapi_stub, film_factory, settings, caplog):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    settings.REQUEST_INSTRUMENTATION = True
+    film_factory(id=1)
+    _mark_synced()
+    client = APIClient()
+
+    with CaptureQueriesContext(connection) as queries, caplog.at_level("INFO", "films.instrumentation"):
+        resp = client.get(reverse("film-list"))
+        query_count = len(queries)
+    timing = _server_timing(resp)
+    assert set(timing) == {"total", "db", "swapi", "serialize"}
+    assert timing["db"]["desc"] == f'"{query_count} queries"'
+    assert timing["swapi"]["desc"] == '"0 calls"'
+    assert float(timing["total"]["dur"]) >= float(timing["db"]["dur"])
+    line = json.loads(caplog.records[-1].getMessage())
+    assert line["path"] == reverse("film-list") and line["status"] == 200
+    assert line["db_queries"] == query_count and line["swapi_calls"] == 0
+
+    # Past hard expiry the request syncs inline: its SWAPI call is counted
+    swapi_stub.add(FILMS_URL, _swapi_page((1, "A New Hope", "1977-05-25")))
+    _mark_synced(seconds_ago=10 * 86400)
+    timing = _server_timing(client.get(reverse("film-list")))
+    assert timing["swapi"]["desc"] == '"1 calls"'
+
+
+@pytest.mark.django_db
+def test_instrumentation_logs_streaming_responses_after_the_body(comment_factory, settings, caplog):
+    settings.REQUEST_INSTRUMENTATION = True
+    settings.COMMENT_EXPORT_CHUNK_SIZE = 2
+    film = Film.objects.get(pk=comment_factory().film_id)
+    for _ in range(4):
+        comment_factory(film=film)
+
+    with caplog.at_level("INFO", "films.instrumentation"):
+        resp = APIClient().get(reverse("comment-export"))
+        assert not resp.has_header("Server-Timing") and not caplog.records
+        rows = b"".join(resp.streaming_content).splitlines()
+    assert len(rows) == 5
+    line = json.loads(caplog.records[-1].getMessage())
+    # Counts the chunked reads done while streaming, not just the view call
+    assert line["path"] == reverse("comment-export") and line["db_queries"] >= 3
+
+@pytest.mark.django_db
+def test_instrumentation_sampling_and_async_views(film_factory, settings):
+    settings.REQUEST_INSTRUMENTATION = True
+    settings.REQUEST_INSTRUMENTATION_SAMPLE_RATE = 0.0
+    film_factory(id=1)
+    _mark_synced()
+    assert not APIClient().get(reverse("film-list")).has_header("Server-Timing")
+
+    settings.REQUEST_INSTRUMENTATION_SAMPLE_RATE = 1.0
+    timing = _server_timing(_aget(reverse("async-film-list")))
+    assert int(timing["db"]["desc"].strip('"').split()[0]) > 0
+
+
+# ----------------------------
+# Metrics endpoint (/metrics)
+# ----------------------------
+
+@pytest.fixture()
+def metrics_enabled(settings):
+    settings.METRICS_ENABLED = True
+
+
+def _scrape(client=None, **headers) -> Dict[str, float]:
+    resp = (client or APIClient()).get("/metrics", **headers)
+    assert resp.status_code == 200
+    assert resp["Content-Type"].startswith("text/plain; version=0.0.4")
+    samples = {}
+    for line in resp.content.decode().splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+@pytest.mark.django_db
+def test_metrics_export_requests_cache_and_comment_inserts(film_factory, metrics_enabled):
+    film = film_factory(id=1)
+    _mark_synced()
+    client = APIClient()
+    for _ in range(2):
+        assert client.get(reverse("film-list")).status_code == 200  # miss, then hit
+    client.post(reverse("film-comments", kwargs={"pk": film.pk}), {"text": "a"}, format="json")
+    client.post(
+        reverse("comment-bulk"),
+        [{"film": film.pk, "text": "b"}, {"film": film.pk, "text": "c"}],
+        format="json",
+    )
+
+    samples = _scrape(client)
+    labels = 'view="film-list",method="GET",status="200"'
+    assert samples[f"http_request_duration_seconds_count{{{labels}}}"] == 2
+    assert samples[f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}}'] == 2
+    assert samples[f"http_request_duration_seconds_sum{{{labels}}}"] > 0
+    assert samples['http_response_size_bytes_count{view="film-list"}'] == 2
+    assert samples['films_cache_requests_total{result="hit"}'] == 1
+    assert samples["films_cache_hit_ratio"] == 0.5
+    assert samples['comments_created_total{source="single"}'] == 1
+    assert samples['comments_created_total{source="bulk"}'] == 2
+
+
+@pytest.mark.django_db
+def test_metrics_export_swapi_sync_outcomes(swapi_stub, metrics_enabled):
+    swapi_stub.add(FILMS_URL, _swapi_page((1, "A", "1977-05-25"), (2, "B", "1980-05-17")))
+    services.fetch_and_sync_films()
+    services.fetch_and_sync_films()
+    swapi_stub.routes.clear()  # 404 from SWAPI
+    with pytest.raises(requests.HTTPError):
+        services.fetch_and_sync_films()
+
+    samples = _scrape()
+    for outcome in ("changed", "not_modified", "error"):
+        assert samples[f'swapi_sync_duration_seconds_count{{outcome="{outcome}"}}'] == 1
+    assert samples['swapi_sync_films_total{change="inserted"}'] == 2
+    assert samples["swapi_films"] == 2
+
+
+@pytest.mark.django_db
+def test_metrics_aggregate_across_worker_processes(tmp_path, settings, metrics_enabled):
+    import multiprocessing
+    from films import metrics
+
+    settings.METRICS_MULTIPROC_DIR = str(tmp_path)
+    metrics.reset_metrics()
+
+    def worker():
+        # A forked worker gets its own store file
+        metrics.COMMENTS_CREATED.inc(3, source="single")
+        metrics.REQUEST_LATENCY.observe(0.2, view="film-list", method="GET", status=200)
+
+    child = multiprocessing.get_context("fork").Process(target=worker)
+    child.start()
+    child.join()
+    assert child.exitcode == 0
+    metrics.COMMENTS_CREATED.inc(2, source="single")
+
+    assert len(list(tmp_path.glob("*.db"))) == 2
+    samples = _scrape()
+    assert samples['comments_created_total{source="single"}'] == 5
+    labels = 'view="film-list",method="GET",status="200"'
+    assert samples[f'http_request_duration_seconds_bucket{{{labels},le="0.25"}}'] == 1
+    assert samples[f'http_request_duration_seconds_bucket{{{labels},le="0.1"}}'] == 0
+
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_is_off_by_default_and_can_require_a_token(settings):
+    assert APIClient().get("/metrics").status_code == 404
+
+    settings.METRICS_ENABLED = True
+    settings.METRICS_TOKEN = "s3cret"
+    assert APIClient().get("/metrics").status_code == 403
+    assert APIClient().get("/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code == 403
+    samples = _scrape(HTTP_AUTHORIZATION="Bearer s3cret")
+    assert samples['http_request_duration_seconds_count{view="metrics",method="GET",status="403"}'] == 2
+
+# ----------------------------
+# Full-text comment search (?search=)
+# ----------------------------
+
+@pytest.mark.django_db
+def test_comment_search_matches_all_words_by_relevance(api_client, film_factory, comment_factory):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    film = film_factory(id=1)
+    other = film_factory(id=2, title="Empire")
+    weak = comment_factory(film=film, text="The wookiee roared at the very long scene with many words")
+    strong = comment_factory(film=film, text="Wookiee wookiee wookiee!")
+    comment_factory(film=film, text="No furry co-pilots here")
+    elsewhere = comment_factory(film=other, text="A wookiee on Hoth")
+
+    url = reverse("comment-list")
+    with CaptureQueriesContext(connection) as queries:
+        payload = api_client.get(url, {"search": "Wookiee"}).json()
+    assert [c["id"] for c in payload["results"]] == [strong.id, elsewhere.id, weak.id]
+    assert payload["count"] == 3
+    sql = " ".join(q["sql"] for q in queries)
+    assert "films_comment_fts MATCH" in sql and "LIKE" not in sql
+
+    # Every word must match; operators/quotes in the input are just ignored
+    payload = api_client.get(url, {"search": 'wookiee" (hoth*'}).json()
+    assert [c["id"] for c in payload["results"]] == [elsewhere.id]
+    page = api_client.get(url, {"search": "wookiee", "limit": 1, "offset": 1}).json()
+    assert [c["id"] for c in page["results"]] == [elsewhere.id] and page["next"]
+
+    scoped = api_client.get(reverse("film-comments", kwargs={"pk": film.pk}), {"search": "wookiee"})
+    assert [c["id"] for c in scoped.json()["results"]] == [strong.id, weak.id]
+    assert api_client.get(url, {"search": "?!"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_comment_search_index_follows_edits_and_deletes(api_client, film_factory):
+    film = film_factory(id=1)
+    url = reverse("comment-list")
+    created = api_client.post(url, {"film": film.pk, "text": "Ewoks everywhere"}, format="json").json()
+    assert api_client.get(url, {"search": "ewoks"}).json()["count"] == 1
+
+    api_client.patch(reverse("comment-detail", kwargs={"pk": created["id"]}), {"text": "Porgs everywhere"}, format="json")
+    assert api_client.get(url, {"search": "ewoks"}).json()["count"] == 0
+    assert api_client.get(url, {"search": "porgs"}).json()["count"] == 1
+
+    api_client.delete(reverse("comment-detail", kwargs={"pk": created["id"]}))
+    assert api_client.get(url, {"search": "porgs"}).json()["count"] == 0
+
+
+@pytest.mark.django_db
+def test_async_comment_search_matches_sync(api_client, film_factory, comment_factory):
+    film = film_factory(id=1)
+    for text in ("A droid story", "Droid droid", "No match"):
+        comment_factory(film=film, text=text)
+
+    for sync_name, async_name, kwargs in (
+        ("comment-list", "async-comment-list", {}),
+        ("film-comments", "async-film-comments", {"pk": film.pk}),
+    ):
+        expected = api_client.get(reverse(sync_name, kwargs=kwargs), {"search": "droid"}).json()
+        resp = _aget(reverse(async_name, kwargs=kwargs), data={"search": "droid"})
+        assert resp.status_code == 200 and resp.json()["results"] == expected["results"]
+    assert _aget(reverse("async-comment-list"), data={"search": "--"}).status_code == 400
+
+
+# ----------------------------
+# Film list filtering
+# ----------------------------
+
+@pytest.mark.django_db
+def test_film_list_filters_by_title_prefix_dates_and_ordering(api_client, film_factory):
+    hope = film_factory(id=1, title="A New Hope", release_date=date(1977, 5, 25), comment_count=2)
+    empire = film_factory(id=2, title="The Empire Strikes Back", release_date=date(1980, 5, 17), comment_count=9)
+    jedi = film_factory(id=3, title="Return of the Jedi", release_date=date(1983, 5, 25), comment_count=0)
+    menace = film_factory(id=4, title="The Phantom Menace", release_date=date(1999, 5, 19), comment_count=5)
+    _mark_synced()
+
+    def ids(**params):
+        resp = api_client.get(reverse("film-list"), params)
+        assert resp.status_code == 200, resp.json()
+        return [f["id"] for f in resp.json()["results"]]
+
+    assert ids(title="the") == [empire.id, menace.id]
+    assert ids(title="THE EMPIRE") == [empire.id]
+    assert ids(title="Empire") == []
+    assert ids(released_from="1980-05-17", released_to="1983-05-25") == [empire.id, jedi.id]
+    assert ids(title="the", released_from="1981-01-01") == [menace.id]
+    assert ids(ordering="-comment_count") == [empire.id, menace.id, hope.id, jedi.id]
+    assert ids(ordering="-release_date", limit=2) == [menace.id, jedi.id]
+    ebauche = film_factory(id=5, title="Ébauche", release_date=date(2001, 1, 1))
+    assert ids(title="ÉBAU") == [ebauche.id]
+
+    for params in ({"released_from": "1980-13-01"}, {"released_to": "soon"}, {"ordering": "title"}):
+        assert api_client.get(reverse("film-list"), params).status_code == 400
+        assert _aget(reverse("async-film-list"), data=params).status_code == 400
+
+    params = {"title": "the", "ordering": "-comment_count"}
+    expected = api_client.get(reverse("film-list"), params).json()
+    assert _aget(reverse("async-film-list"), data=params).json() == expected
+
+
+@pytest.mark.django_db
+def test_film_list_filters_compile_to_index_seeks(film_factory):
+    from django.db import connection
+    from films.filters import filter_films
+    from films.serializers import FILM_ROW_FIELDS
+
+    if connection.vendor != "sqlite":
+        pytest.skip("asserts on SQLite's EXPLAIN QUERY PLAN output")
+
+    for i in range(1, 21):
+        film_factory(id=i, title=f"Film {i}", release_date=date(1977 + i, 1, 1), comment_count=i % 4)
+    qs = Film.objects.values(*FILM_ROW_FIELDS)
+
+    def plan(**params):
+        return filter_films(qs, params)[:6].explain()
+
+    # Filters seek into an index instead of scanning the table
+    for params in (
+        {"title": "film 1"},
+        {"title": "FILM", "released_from": "1990-01-01"},
+        {"released_from": "1980-01-01", "released_to": "1985-01-01"},
+        {"released_from": "1980-01-01", "ordering": "-comment_count"},
+    ):
+        steps = plan(**params)
+        assert "SEARCH films_film USING INDEX" in steps and "SCAN films_film" not in steps, (params, steps)
+
+    # Unfiltered orderings read an index in order and stop at the page size
+    for ordering in ("release_date", "-release_date", "comment_count", "-comment_count"):
+        steps = plan(ordering=ordering)
+        assert "USING INDEX" in steps and "TEMP B-TREE" not in steps, (ordering, steps)
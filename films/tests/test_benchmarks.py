@@ -0,0 +1,275 @@
+"""
+Opt-in performance benchmarks; excluded from the default run.
+
+    pytest -m benchmark -s
+"""
+import time
+from datetime import date
+
+import pytest
+
+from films.models import Comment, Film
+from films.serializers import (
+    COMMENT_ROW_FIELDS,
+    FILM_ROW_FIELDS,
+    CommentSerializer,
+    FilmSerializer,
+    comment_rows,
+    film_rows,
+)
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+
+def _best_of(fn, repeat=3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _seed_comments(n: int) -> None:
+    film = Film.objects.create(id=1, title="A New Hope", release_date=date(1977, 5, 25))
+    Comment.objects.bulk_create(
+        (Comment(film=film, text=f"comment {i}") for i in range(n)), batch_size=5000
+    )
+
+
+@pytest.mark.parametrize("rows", [1_000, 10_000, 100_000])
+def test_bench_comment_fast_path_vs_model_serializer(rows):
+    _seed_comments(rows)
+    qs = Comment.objects.order_by("created_at", "id")
+
+    slow = _best_of(lambda: CommentSerializer(list(qs), many=True).data)
+    fast = _best_of(lambda: comment_rows(qs.values(*COMMENT_ROW_FIELDS)))
+
+    print(f"\ncomments x{rows}: serializer {slow*1000:.1f} ms, fast path {fast*1000:.1f} ms, "
+          f"speedup {slow/fast:.1f}x")
+    assert fast < slow
+
+
+@pytest.mark.parametrize("rows", [1_000, 10_000, 100_000])
+def test_bench_film_fast_path_vs_model_serializer(rows):
+    Film.objects.bulk_create(
+        (Film(id=i, title=f"Film {i}", release_date=date(1977, 5, 25)) for i in range(1, rows + 1)),
+        batch_size=5000,
+    )
+    qs = Film.objects.order_by("release_date", "id")
+
+    slow = _best_of(lambda: FilmSerializer(list(qs), many=True).data)
+    fast = _best_of(lambda: film_rows(qs.values(*FILM_ROW_FIELDS)))
+
+    print(f"\nfilms x{rows}: serializer {slow*1000:.1f} ms, fast path {fast*1000:.1f} ms, "
+          f"speedup {slow/fast:.1f}x")
+    assert fast < slow
+
+
+def _sqlite_wrapper(tmp_path, pooled: bool, **overrides):
+    from django.db.backends.sqlite3 import base
+    from django.db.utils import ConnectionHandler
+    from movies_api.db.pool import PooledDatabaseWrapperMixin
+
+    class PooledWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+        pass
+
+    config = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": str(tmp_path / "bench.sqlite3"),
+        # Stand-in for the MySQL init_command that runs on every connect
+        "OPTIONS": {"init_command": "PRAGMA temp_store=MEMORY; PRAGMA cache_size=-8000"},
+        **overrides,
+    }
+    settings_dict = ConnectionHandler({"default": config}).settings["default"]
+    cls = PooledWrapper if pooled else base.DatabaseWrapper
+    return cls(settings_dict, alias=f"bench-{pooled}-{overrides.get('CONN_MAX_AGE')}")
+
+
+def _requests_per_second(conn, n: int = 5_000) -> float:
+    # What Django does around each request: request_started/finished call
+    # close_if_unusable_or_obsolete(), the view runs a query in between
+    started = time.perf_counter()
+    for _ in range(n):
+        conn.close_if_unusable_or_obsolete()
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        conn.close_if_unusable_or_obsolete()
+    return n / (time.perf_counter() - started)
+
+
+def test_bench_connection_reuse_requests_per_second(tmp_path):
+    from movies_api.db.pool import close_pools
+
+    modes = {
+        "new connection per request (CONN_MAX_AGE=0)": _sqlite_wrapper(tmp_path, False, CONN_MAX_AGE=0),
+        "persistent (CONN_MAX_AGE=60, health checks)": _sqlite_wrapper(
+            tmp_path, False, CONN_MAX_AGE=60, CONN_HEALTH_CHECKS=True
+        ),
+        "pooled (POOL size=4)": _sqlite_wrapper(tmp_path, True, CONN_MAX_AGE=0, POOL={"size": 4}),
+    }
+    try:
+        rates = {name: _requests_per_second(conn) for name, conn in modes.items()}
+    finally:
+        for conn in modes.values():
+            conn.close()
+        close_pools()
+
+    print()
+    for name, rate in rates.items():
+        print(f"{name}: {rate:,.0f} req/s")
+    baseline, persistent, pooled = rates.values()
+    assert persistent > baseline and pooled > baseline
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bench_wsgi_vs_asgi_throughput_with_slow_db(monkeypatch):
+    """
+    Load test: the same film-comments feed served through Django's WSGI
+    handler by a fixed pool of worker threads (gthread-style) and through
+    the ASGI handler with the async views on one event loop, with every
+    DB query slowed down to stand in for a loaded database or upstream.
+
+    ASGI wins once requests spend most of their time waiting; for fast,
+    CPU-bound requests its extra per-request overhead makes WSGI faster.
+    """
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    import httpx
+    from django.core.handlers.asgi import ASGIHandler
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db.backends import utils
+    from django.urls import reverse
+
+    requests_total, concurrency, wsgi_threads, db_latency = 200, 100, 8, 0.1
+    _seed_comments(50)
+    sync_url = reverse("film-comments", kwargs={"pk": 1})
+    async_url = reverse("async-film-comments", kwargs={"pk": 1})
+
+    execute = utils.CursorWrapper.execute
+
+    def slow_execute(self, *args, **kwargs):
+        time.sleep(db_latency)
+        return execute(self, *args, **kwargs)
+
+    monkeypatch.setattr(utils.CursorWrapper, "execute", slow_execute)
+
+    wsgi_app = WSGIHandler()
+
+    def wsgi_get(_):
+        with httpx.Client(transport=httpx.WSGITransport(app=wsgi_app), base_url="http://localhost") as client:
+            return client.get(sync_url).status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=wsgi_threads) as pool:
+        statuses = list(pool.map(wsgi_get, range(requests_total)))
+    wsgi_rps = requests_total / (time.perf_counter() - started)
+    assert set(statuses) == {200}
+
+    async def asgi_run():
+        limit = asyncio.Semaphore(concurrency)
+        transport = httpx.ASGITransport(app=ASGIHandler())
+        async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+            async def one(_):
+                async with limit:
+                    return (await client.get(async_url)).status_code
+            return await asyncio.gather(*(one(i) for i in range(requests_total)))
+
+    started = time.perf_counter()
+    statuses = asyncio.run(asgi_run())
+    asgi_rps = requests_total / (time.perf_counter() - started)
+    assert set(statuses) == {200}
+
+    print(f"\n{requests_total} requests, {db_latency*1000:.0f} ms per query: "
+          f"WSGI ({wsgi_threads} threads) {wsgi_rps:,.0f} req/s, "
+          f"ASGI (async views, {concurrency} in flight) {asgi_rps:,.0f} req/s")
+    assert asgi_rps > wsgi_rps
+
+
+def test_bench_comment_throttle_allow_path(settings):
+    from django.test import RequestFactory
+    from films.throttling import CommentRateThrottle, reset_throttles
+
+    # A budget that never runs out, with the default lease size: mostly
+    # local takes plus one cache claim per lease
+    settings.COMMENT_RATE_LIMIT = "100000000/day"
+    reset_throttles()
+    request = RequestFactory().post("/", REMOTE_ADDR="10.0.0.1")
+    n = 100_000
+
+    def run():
+        for _ in range(n):
+            assert CommentRateThrottle().allow_request(request, None)
+
+    per_call = _best_of(run) / n
+    print(f"\nthrottle allow path: {per_call*1e6:.2f} us/request "
+          f"(lease of {settings.COMMENT_RATE_LEASE})")
+    assert per_call < 0.0001  # 0.1 ms
+
+
+@pytest.mark.parametrize("multiproc", [False, True], ids=["in-process", "file-backed"])
+def test_bench_metrics_middleware_overhead(settings, tmp_path, multiproc):
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+    from django.urls import resolve
+    from films import metrics
+
+    settings.METRICS_ENABLED = True
+    settings.METRICS_MULTIPROC_DIR = str(tmp_path) if multiproc else ""
+    metrics.reset_metrics()
+    request = RequestFactory().get("/api/films/")
+    request.resolver_match = resolve("/api/films/")
+    response = HttpResponse(b"x" * 2048)
+
+    def view(_):
+        return response
+
+    middleware = metrics.MetricsMiddleware(view)
+    n = 50_000
+    bare = _best_of(lambda: [view(request) for _ in range(n)]) / n
+    wrapped = _best_of(lambda: [middleware(request) for _ in range(n)]) / n
+    metrics.reset_metrics()
+
+    overhead = wrapped - bare
+    print(f"\nmetrics middleware ({'file-backed' if multiproc else 'in-process'}): "
+          f"{overhead*1e6:.2f} us/request overhead")
+    assert overhead < 0.00005  # 50 us
+
+
+def test_bench_comment_search_stays_flat_as_table_grows():
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    # 50 matching comments in a table growing 10k -> 100k -> 1M rows
+    film = Film.objects.create(id=1, title="A New Hope", release_date=date(1977, 5, 25))
+    Comment.objects.bulk_create(
+        Comment(film=film, text=f"that wookiee again {i}") for i in range(50)
+    )
+    client = APIClient()
+    url = reverse("comment-list")
+    timings = {}
+    seeded = 50
+    for rows in (10_000, 100_000, 1_000_000):
+        Comment.objects.bulk_create(
+            (Comment(film=film, text=f"comment number {i} about the trench run")
+             for i in range(seeded, rows)),
+            batch_size=5000,
+        )
+        seeded = rows
+
+        def fts():
+            payload = client.get(url, {"search": "wookiee"}).json()
+            assert payload["count"] == 50
+
+        def like():
+            qs = Comment.objects.filter(text__icontains="wookiee").order_by("id")
+            assert qs.count() == 50
+            list(qs.values(*COMMENT_ROW_FIELDS)[:6])
+
+        timings[rows] = (_best_of(fts), _best_of(like))
+        print(f"\n{rows:>9,} comments: ?search= {timings[rows][0]*1000:.1f} ms, "
+              f"LIKE scan {timings[rows][1]*1000:.1f} ms")
+
+    small, large = timings[10_000][0], timings[1_000_000][0]
+    assert large < small * 3 + 0.005
+    assert large < timings[1_000_000][1]
@@ -0,0 +1,351 @@
+"""
+Opt-in endpoint benchmark suite; excluded from the default run.
+
+    pytest -m benchmark -s films/tests/test_endpoint_benchmarks.py
+    BENCH_COMMENTS=1000000 pytest -m benchmark films/tests/test_endpoint_benchmarks.py
+
+Seeds the test database once with synthetic films and ``BENCH_COMMENTS``
+comments, stubs SWAPI in-process, then measures every endpoint in
+films/urls.py (plus ``fetch_and_sync_films``):
+
+* latency -- p50/p95/max over ``BENCH_ROUNDS`` warm requests
+* queries -- SQL statements issued by one cold request (empty cache)
+* peak memory -- tracemalloc peak for one cold request
+* SWAPI requests made while serving the request
+
+Results are written as JSON to ``BENCH_RESULTS``. A test fails when a
+measurement exceeds its entry in ``BUDGETS`` -- e.g. a list endpoint that
+stops paginating blows its memory budget, an N+1 its query budget, a
+request that syncs SWAPI inline its SWAPI budget.
+"""
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from datetime import date, timedelta
+from typing import Any, Callable, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+import requests
+from requests import Response
+from requests.adapters import BaseAdapter
+from django.conf import settings as django_settings
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from films import services, swapi
+from films.models import Comment, Film, SyncState
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+BENCH_FILMS = int(os.environ.get("BENCH_FILMS", 60))
+BENCH_COMMENTS = int(os.environ.get("BENCH_COMMENTS", 10_000))
+BENCH_ROUNDS = int(os.environ.get("BENCH_ROUNDS", 20))
+BENCH_RESULTS = os.environ.get("BENCH_RESULTS", "bench_results.json")
+
+# Per-endpoint ceilings; a missing key means "not budgeted". Latency and
+# memory budgets are independent of BENCH_COMMENTS: every endpoint except
+# the export stream must cost the same with 10k or 1M comments.
+BUDGETS: dict[str, dict[str, float]] = {
+    "api-root": {"max_queries": 0, "p95_ms": 100, "peak_kib": 256},
+    "film-list": {"max_queries": 5, "p95_ms": 100, "peak_kib": 512, "swapi_requests": 0},
+    "film-detail": {"max_queries": 4, "p95_ms": 100, "peak_kib": 512},
+    "film-comments": {"max_queries": 2, "p95_ms": 100, "peak_kib": 512},
+    "film-comments-post": {"max_queries": 6, "p95_ms": 100, "peak_kib": 512},
+    "comment-list": {"max_queries": 4, "p95_ms": 100, "peak_kib": 512},
+    "comment-detail": {"max_queries": 1, "p95_ms": 100, "peak_kib": 256},
+    "comment-create": {"max_queries": 5, "p95_ms": 100, "peak_kib": 512},
+    # 500 items over every film: one count update per distinct film
+    "comment-bulk": {"max_queries": BENCH_FILMS + 8, "p95_ms": 500, "peak_kib": 4096},
+    "comment-export": {"peak_kib": 4096},
+    "cache-stats": {"max_queries": 2, "p95_ms": 100, "peak_kib": 256},
+    "async-film-list": {"max_queries": 5, "p95_ms": 100, "peak_kib": 512, "swapi_requests": 0},
+    "async-film-detail": {"max_queries": 4, "p95_ms": 100, "peak_kib": 512},
+    "async-film-comments": {"max_queries": 2, "p95_ms": 100, "peak_kib": 512},
+    "async-comment-list": {"max_queries": 4, "p95_ms": 100, "peak_kib": 512},
+    "schema-swagger-ui": {"max_queries": 0, "peak_kib": 16384},
+    "fetch_and_sync_films": {"max_queries": 12, "p95_ms": 500, "peak_kib": 4096},
+    "fetch_and_sync_films-unchanged": {"max_queries": 4, "p95_ms": 250, "peak_kib": 2048},
+}
+
+_results: dict[str, dict[str, Any]] = {}
+
+
+# ----------------------------
+# SWAPI stub and seeding
+# ----------------------------
+
+class _SwapiPages(BaseAdapter):
+    """Serves ``BENCH_FILMS`` synthetic films as SWAPI pages of 10."""
+
+    page_size = 10
+
+    def __init__(self, films: int):
+        super().__init__()
+        self.films = films
+        self.requests = 0
+
+    def send(self, request, **kwargs):
+        self.requests += 1
+        page = int(parse_qs(urlsplit(request.url).query).get("page", ["1"])[0])
+        first = (page - 1) * self.page_size + 1
+        ids = range(first, min(first + self.page_size, self.films + 1))
+        more = ids and ids[-1] < self.films
+        payload = {
+            "count": self.films,
+            "next": f"{services.SWAPI_FILMS_URL}?page={page + 1}" if more else None,
+            "results": [
+                {
+                    "url": f"{services.SWAPI_FILMS_URL}{i}/",
+                    "title": f"Film {i}",
+                    "release_date": (date(1977, 5, 25) + timedelta(days=i)).isoformat(),
+                }
+                for i in ids
+            ],
+        }
+        resp = Response()
+        resp.status_code = 200
+        resp._content = json.dumps(payload).encode()
+        resp.url = request.url
+        resp.request = request
+        return resp
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(scope="module")
+def bench_data(django_db_setup, django_db_blocker):
+    """Seed once per module (committed), and remove it all afterwards."""
+    with django_db_blocker.unblock():
+        now = timezone.now()
+        Film.objects.bulk_create(
+            Film(
+                id=i,
+                title=f"Film {i}",
+                release_date=date(1977, 5, 25) + timedelta(days=i),
+                comments_changed_at=now,
+            )
+            for i in range(1, BENCH_FILMS + 1)
+        )
+        batch = 10_000
+        for start in range(0, BENCH_COMMENTS, batch):
+            Comment.objects.bulk_create(
+                Comment(film_id=i % BENCH_FILMS + 1, text=f"comment {i}", ip_address="10.0.0.1")
+                for i in range(start, min(start + batch, BENCH_COMMENTS))
+            )
+        for film_id in range(1, BENCH_FILMS + 1):
+            Film.objects.filter(pk=film_id).update(
+                comment_count=Comment.objects.filter(film_id=film_id).count()
+            )
+        SyncState.objects.create(resource=services.FILMS_RESOURCE, last_synced_at=now)
+        yield
+        Comment.objects.all().delete()
+        Film.objects.all().delete()
+        SyncState.objects.all().delete()
+
+    with open(BENCH_RESULTS, "w") as fh:
+        json.dump(
+            {"comments": BENCH_COMMENTS, "films": BENCH_FILMS, "rounds": BENCH_ROUNDS,
+             "results": _results},
+            fh,
+            indent=2,
+            sort_keys=True,
+        )
+
+
+@pytest.fixture()
+def swapi_pages(monkeypatch) -> _SwapiPages:
+    stub = _SwapiPages(BENCH_FILMS)
+    session = requests.Session()
+    session.mount("https://", stub)
+    session.mount("http://", stub)
+    monkeypatch.setattr(swapi, "_client", swapi.SwapiClient(session=session, max_workers=4))
+    return stub
+
+
+@pytest.fixture()
+def bench_env(bench_data, swapi_pages, settings):
+    # Measure the endpoints, not the throttles
+    settings.COMMENT_RATE_LIMIT = ""
+    settings.COMMENT_BULK_RATE_LIMIT = ""
+    # Fresh films: reads must not touch SWAPI however long seeding took
+    SyncState.objects.filter(resource=services.FILMS_RESOURCE).update(last_synced_at=timezone.now())
+    return swapi_pages
+
+
+# ----------------------------
+# Measurement
+# ----------------------------
+
+def _clear_caches() -> None:
+    for alias in ("default", django_settings.FILMS_CACHE_ALIAS):
+        caches[alias].clear()
+
+
+def _measure(
+    name: str,
+    call: Callable[[], Any],
+    stub: _SwapiPages,
+    cold: Optional[Callable[[], None]] = None,
+    cold_rounds: bool = False,
+):
+    """
+    Time ``call`` (one warm-up, then ``BENCH_ROUNDS`` samples), count the
+    queries and SWAPI requests of a cold call and trace its peak memory,
+    record the result and check it against ``BUDGETS[name]``.
+
+    ``cold`` resets state before the cold call (default: clear caches);
+    with ``cold_rounds`` it also runs, untimed, before every sample.
+    """
+    cold = cold or _clear_caches
+    cold()
+    before = stub.requests
+    with CaptureQueriesContext(connection) as queries:
+        call()
+    swapi_requests = stub.requests - before
+    # Count now: later requests reset the connection's query log
+    query_count = len(queries)
+
+    cold()
+    tracemalloc.start()
+    try:
+        call()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    call()
+    samples = []
+    for _ in range(BENCH_ROUNDS):
+        if cold_rounds:
+            cold()
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+
+    result = {
+        "queries": query_count,
+        "swapi_requests": swapi_requests,
+        "peak_kib": round(peak / 1024, 1),
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "max_ms": round(samples[-1], 3),
+    }
+    _results[name] = result
+    print(f"\n{name}: {json.dumps(result)}")
+
+    budget = BUDGETS.get(name, {})
+    over = {
+        metric: (result[key], limit)
+        for metric, key in (("max_queries", "queries"), ("p95_ms", "p95_ms"),
+                            ("peak_kib", "peak_kib"), ("swapi_requests", "swapi_requests"))
+        if (limit := budget.get(metric)) is not None and result[key] > limit
+    }
+    assert not over, f"{name} over budget (measured, limit): {over}"
+    return result
+
+
+def _get(client: APIClient, url: str, status: int = 200, **params) -> Callable[[], Any]:
+    def call():
+        resp = client.get(url, params)
+        assert resp.status_code == status, resp.content[:200]
+        if resp.streaming:
+            for _ in resp.streaming_content:
+                pass
+        return resp
+    return call
+
+
+def _post(client: APIClient, url: str, body, status: int) -> Callable[[], Any]:
+    def call():
+        resp = client.post(url, body, format="json")
+        assert resp.status_code == status, resp.content[:200]
+        return resp
+    return call
+
+
+# ----------------------------
+# Endpoints
+# ----------------------------
+
+def _some_comment_id() -> int:
+    return Comment.objects.order_by("id").values_list("id", flat=True)[BENCH_COMMENTS // 2]
+
+
+READS = {
+    "api-root": lambda: reverse("api-root"),
+    "film-list": lambda: reverse("film-list"),
+    "film-detail": lambda: reverse("film-detail", kwargs={"pk": 1}),
+    "film-comments": lambda: reverse("film-comments", kwargs={"pk": 1}),
+    "comment-list": lambda: reverse("comment-list"),
+    "comment-detail": lambda: reverse("comment-detail", kwargs={"pk": _some_comment_id()}),
+    "async-film-list": lambda: reverse("async-film-list"),
+    "async-film-detail": lambda: reverse("async-film-detail", kwargs={"pk": 1}),
+    "async-film-comments": lambda: reverse("async-film-comments", kwargs={"pk": 1}),
+    "async-comment-list": lambda: reverse("async-comment-list"),
+}
+
+
+@pytest.mark.parametrize("name", list(READS))
+def test_bench_read_endpoint(bench_env, name):
+    _measure(name, _get(APIClient(), READS[name]()), bench_env)
+
+
+def test_bench_comment_export(bench_env):
+    # Streams every comment: latency grows with BENCH_COMMENTS, memory must not
+    _measure("comment-export", _get(APIClient(), reverse("comment-export")), bench_env)
+
+
+def test_bench_cache_stats(bench_env, django_user_model):
+    client = APIClient()
+    client.force_authenticate(django_user_model.objects.create(username="bench", is_staff=True))
+    _measure("cache-stats", _get(client, reverse("cache-stats")), bench_env)
+
+
+def test_bench_schema(bench_env):
+    # The OpenAPI document itself, as served to the Swagger UI
+    url = reverse("schema-swagger-ui")
+    _measure("schema-swagger-ui", _get(APIClient(), url, format="openapi"), bench_env)
+
+
+def test_bench_comment_writes(bench_env):
+    client = APIClient()
+    _measure(
+        "film-comments-post",
+        _post(client, reverse("film-comments", kwargs={"pk": 1}), {"text": "bench"}, 201),
+        bench_env,
+    )
+    _measure(
+        "comment-create",
+        _post(client, reverse("comment-list"), {"film": 2, "text": "bench"}, 201),
+        bench_env,
+    )
+    items = [{"film": i % BENCH_FILMS + 1, "text": f"bulk {i}"} for i in range(500)]
+    _measure("comment-bulk", _post(client, reverse("comment-bulk"), items, 201), bench_env)
+
+
+def test_bench_fetch_and_sync_films(bench_env):
+    def changed():
+        # Every film differs from upstream, so each run upserts them all
+        _clear_caches()
+        Film.objects.update(title="stale")
+        SyncState.objects.filter(resource=services.FILMS_RESOURCE).update(
+            content_hash="", page_validators={}
+        )
+
+    result = _measure(
+        "fetch_and_sync_films", services.fetch_and_sync_films, bench_env,
+        cold=changed, cold_rounds=True,
+    )
+    assert result["swapi_requests"] == -(-BENCH_FILMS // _SwapiPages.page_size)
+    assert Film.objects.exclude(title="stale").count() == BENCH_FILMS
+
+    _measure("fetch_and_sync_films-unchanged", services.fetch_and_sync_films, bench_env)
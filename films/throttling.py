@@ -0,0 +1,164 @@
+from __future__ import annotations
+import itertools
+import math
+import time
+from typing import Optional
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+# Cap on IPs with a local lease; past it the table is simply dropped
+MAX_TRACKED_IPS = 10_000
+
+_PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def get_client_ip(request) -> str | None:
+    """
+    The client's IP: ``REMOTE_ADDR``, or behind ``NUM_PROXIES`` trusted
+    proxies (DRF setting) the ``X-Forwarded-For`` entry that many from the
+    right. Entries further left are whatever the client sent, so they are
+    never trusted.
+    """
+    num_proxies = api_settings.NUM_PROXIES
+    forwarded = request.META.get("HTTP_X_FORWARDED_FOR")
+    if num_proxies and forwarded:
+        addrs = [a.strip() for a in forwarded.split(",")]
+        return addrs[-min(num_proxies, len(addrs))]
+    return request.META.get("REMOTE_ADDR")
+
+
+def parse_rate(rate: Optional[str]) -> tuple[int, int]:
+    """``"30/min"`` -> ``(30, 60)``; empty/None -> ``(0, 0)`` (no limit)."""
+    if not rate:
+        return 0, 0
+    num, period = rate.split("/")
+    return int(num), _PERIODS[period.strip()[0]]
+
+
+class _Lease:
+    """
+    Tokens this process has claimed from an IP's shared bucket for one
+    refill period. ``take()`` is a single ``next()`` on an
+    ``itertools.count``, which is atomic under the GIL, so the allow path
+    needs no lock.
+    """
+    __slots__ = ("epoch", "size", "taken", "drained")
+
+    def __init__(self, epoch: int, size: int, drained: bool = False):
+        self.epoch = epoch
+        self.size = size
+        self.taken = itertools.count(1)
+        self.drained = drained  # the shared bucket is empty until next epoch
+
+    def take(self) -> bool:
+        return next(self.taken) <= self.size
+
+
+# (scope, ip) -> lease
+_leases: dict[tuple[str, str], _Lease] = {}
+
+
+def reset_throttles() -> None:
+    """Forget every local lease (tests)."""
+    _leases.clear()
+
+
+class CommentRateThrottle(BaseThrottle):
+    """
+    Per-IP token bucket for comment writes (``COMMENT_RATE_LIMIT``, e.g.
+    ``"30/min"``: 30 tokens, refilled every minute).
+
+    The bucket lives in the default cache as a per-period counter that
+    processes advance with an atomic ``incr``. Each process claims tokens in
+    leases of ``COMMENT_RATE_LEASE`` and spends them locally, so most
+    requests never touch the cache. Once the shared bucket is empty, the
+    rejection is also cached locally until the next refill. Denied
+    requests get 429 with Retry-After (the time to the next refill).
+
+    ``allow_request(..., cost=n)`` takes ``n`` tokens at once, straight
+    from the shared bucket (all or nothing).
+    """
+    scope = "comments"
+    rate_setting = "COMMENT_RATE_LIMIT"
+
+    def __init__(self):
+        self.capacity, self.period = parse_rate(getattr(settings, self.rate_setting))
+        self._wait: Optional[float] = None
+
+    def allow_request(self, request, view, cost: int = 1) -> bool:
+        if not self.capacity:
+            return True
+        ip = get_client_ip(request) or ""
+        now = time.time()
+        epoch = int(now // self.period)
+        if cost != 1:
+            return self._charge(ip, epoch, now, cost)
+
+        lease = _leases.get((self.scope, ip))
+        if lease is not None and lease.epoch == epoch:
+            if lease.take():
+                return True
+            if lease.drained:
+                return self._deny(epoch, now)
+        return self._claim(ip, epoch, now)
+
+    def _key(self, ip: str, epoch: int) -> str:
+        return f"throttle:{self.scope}:{ip}:{epoch}"
+
+    def _incr(self, key: str, n: int) -> int:
+        """Advance the shared counter by ``n``; returns the new total."""
+        cache.add(key, 0, self.period + 1)
+        try:
+            return cache.incr(key, n)
+        except ValueError:  # expired between add() and incr()
+            cache.set(key, n, self.period + 1)
+            return n
+
+    def _claim(self, ip: str, epoch: int, now: float) -> bool:
+        size = min(settings.COMMENT_RATE_LEASE, self.capacity)
+        claimed = self._incr(self._key(ip, epoch), size)
+
+        granted = min(size, self.capacity - (claimed - size))
+        if len(_leases) >= MAX_TRACKED_IPS:
+            _leases.clear()
+        if granted <= 0:
+            _leases[(self.scope, ip)] = _Lease(epoch, 0, drained=True)
+            return self._deny(epoch, now)
+        lease = _leases[(self.scope, ip)] = _Lease(epoch, granted)
+        return lease.take()
+
+    def _charge(self, ip: str, epoch: int, now: float, cost: int) -> bool:
+        key = self._key(ip, epoch)
+        if self._incr(key, cost) <= self.capacity:
+            return True
+        try:
+            cache.decr(key, cost)  # hand back what we couldn't use
+        except ValueError:
+            pass
+        return self._deny(epoch, now)
+
+    def _deny(self, epoch: int, now: float) -> bool:
+        self._wait = (epoch + 1) * self.period - now
+        return False
+
+    def wait(self) -> Optional[int]:
+        return math.ceil(self._wait) if self._wait is not None else None
+
+
+class BulkCommentRateThrottle(CommentRateThrottle):
+    """
+    Per-IP bucket of comments (not requests) for ``POST /api/comments/bulk/``
+    (``COMMENT_BULK_RATE_LIMIT``): each item costs one token, so a bulk
+    request can't insert more than the limit allows. A batch larger than
+    the whole bucket is always refused.
+    """
+    scope = "comments-bulk"
+    rate_setting = "COMMENT_BULK_RATE_LIMIT"
+
+    def allow_request(self, request, view, cost: Optional[int] = None) -> bool:
+        if cost is None:
+            items = request.data
+            cost = len(items) if isinstance(items, list) and items else 1
+        return super().allow_request(request, view, cost)
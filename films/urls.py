@@ -4,7 +4,8 @@ from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 from rest_framework.routers import DefaultRouter
 
-from .views import CommentViewSet, FilmViewSet
+from . import async_views
+from .views import CommentViewSet, FilmViewSet, cache_stats_view
 
 # --- Swagger Schema View ---
 schema_view = get_schema_view(
@@ -27,6 +28,13 @@ router.register(r"comments", CommentViewSet, basename="comment")
 
 urlpatterns = [
     path("", include(router.urls)),
+    path("cache-stats/", cache_stats_view, name="cache-stats"),
+
+    # Native async versions of the read/comment endpoints (for ASGI servers)
+    path("async/films/", async_views.film_list, name="async-film-list"),
+    path("async/films/<int:pk>/", async_views.film_detail, name="async-film-detail"),
+    path("async/films/<int:pk>/comments/", async_views.film_comments, name="async-film-comments"),
+    path("async/comments/", async_views.comment_list, name="async-comment-list"),
 
      # Swagger endpoints
     re_path(r"^docs(?P<format>\.json|\.yaml)$", schema_view.without_ui(cache_timeout=0), name="schema-json"),
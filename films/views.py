@@ -1,26 +1,124 @@
 from __future__ import annotations
-from django.db.models import Count
+import logging
+from collections import Counter
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
 from rest_framework import status, viewsets
-from rest_framework.decorators import action
-from rest_framework.exceptions import NotFound, MethodNotAllowed
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import NotFound, MethodNotAllowed, ValidationError
+from rest_framework.permissions import SAFE_METHODS, IsAdminUser
 from rest_framework.response import Response
+from movies_api.db.router import read_from_replica, replicas
+from .cache import (
+    cache_stats,
+    cached_response,
+    film_detail_key,
+    film_list_key,
+    invalidate_film_comments,
+)
+from .conditional import (
+    comments_validator,
+    conditional_response,
+    film_validator,
+    films_validator,
+)
+from .export import EXPORT_FORMATS
+from .filters import filter_films
+from .ingest import buffered_ingest, enqueue_comment
+from .instrumentation import SERIALIZE, timed
+from .metrics import COMMENTS_CREATED
 from .models import Comment, Film
-from .serializers import CommentSerializer, FilmSerializer, FilmDetailSerializer
-from .services import fetch_and_sync_films
+from .pagination import CommentCursorPagination, CommentSearchPagination
+from .search import SEARCH_PARAM, search_comments
+from .serializers import (
+    COMMENT_ROW_FIELDS,
+    FILM_ROW_FIELDS,
+    BulkCommentItemSerializer,
+    CommentSerializer,
+    FilmDetailSerializer,
+    FilmSerializer,
+    comment_rows,
+    film_rows,
+)
+from .scheduler import ensure_films_fresh
+from .throttling import BulkCommentRateThrottle, CommentRateThrottle, get_client_ip
 
+logger = logging.getLogger(__name__)
 
-def _get_client_ip(request) -> str | None:
-    """Best-effort real client IP extraction."""
-    ip = request.META.get("HTTP_X_FORWARDED_FOR")
-    if ip:
-        return ip.split(",")[0].strip()
-    return request.META.get("REMOTE_ADDR")
+
+def create_film_comment(film_id: int, data, ip_address: str | None) -> tuple[dict, int]:
+    """
+    Validate and store (or, in buffered mode, enqueue) a comment on
+    ``film_id``; returns ``(payload, status)``. Raises DRF's
+    ``ValidationError`` / ``QueueFull``. Shared by the sync and async views.
+    """
+    if buffered_ingest():
+        # Callers have already checked the film exists; don't look it up again
+        serializer = BulkCommentItemSerializer(
+            data={**data, "film": film_id}, context={"films": {film_id: Film(pk=film_id)}}
+        )
+        serializer.is_valid(raise_exception=True)
+        pending = enqueue_comment(film_id, serializer.validated_data["text"], ip_address)
+        return (
+            {"id": pending.id, "film": film_id, "status": "queued"},
+            status.HTTP_202_ACCEPTED,
+        )
+
+    serializer = CommentSerializer(data={**data, "film": film_id})
+    serializer.is_valid(raise_exception=True)
+    with transaction.atomic():
+        obj = serializer.save(ip_address=ip_address)
+        Film.objects.adjust_comment_count(film_id, +1)
+    return CommentSerializer(obj).data, status.HTTP_201_CREATED
+
+
+def comment_search_data(qs, request, view=None) -> dict:
+    """
+    One page of ``?search=`` matches within ``qs``, most relevant first
+    (limit/offset paginated). Shared by the sync and async views.
+    """
+    paginator = CommentSearchPagination()
+    matches = search_comments(qs, request.query_params[SEARCH_PARAM])
+    page = paginator.paginate_queryset(matches.values(*COMMENT_ROW_FIELDS), request, view=view)
+    return paginator.get_paginated_response(comment_rows(page)).data
+
+
+# Set after a write so the client's next reads see it (read-your-writes)
+PRIMARY_COOKIE = "db_primary"
 
 
-class FilmViewSet(viewsets.ModelViewSet):
+class ReplicaReadsMixin:
+    """
+    Serve safe requests from a read replica (see movies_api.db.router),
+    except for clients that wrote within ``DB_REPLICA_STICKY_SECONDS``:
+    successful writes set a short-lived cookie that pins their reads to
+    the primary until replication has caught up.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in SAFE_METHODS and PRIMARY_COOKIE not in request.COOKIES:
+            with read_from_replica():
+                return super().dispatch(request, *args, **kwargs)
+
+        response = super().dispatch(request, *args, **kwargs)
+        if request.method not in SAFE_METHODS and response.status_code < 400 and replicas():
+            response.set_cookie(
+                PRIMARY_COOKIE,
+                "1",
+                max_age=settings.DB_REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+class FilmViewSet(ReplicaReadsMixin, viewsets.ModelViewSet):
     """
     films endpoint.
-    List/Retrieve and add comment will sync from SWAPI first, then serve from DB.
+    Serves straight from the DB; films are kept in sync with SWAPI by the
+    background scheduler (see films.scheduler) or ``manage.py sync_films``.
     """
     queryset = Film.objects.all().order_by("release_date")
     serializer_class = FilmSerializer
@@ -29,24 +127,36 @@ class FilmViewSet(viewsets.ModelViewSet):
     def create(self, request, *args, **kwargs):
             raise MethodNotAllowed("POST")
 
+    def get_throttles(self):
+        # Only comment writes are rate limited; reads stay unthrottled
+        if self.action == "comments" and self.request.method == "POST":
+            return [CommentRateThrottle()]
+        return super().get_throttles()
+
     def list(self, request, *args, **kwargs):
-        # Try to sync before serving
+        """
+        GET /api/films/[?title=<prefix>&released_from=<date>&released_to=<date>
+                        &ordering=release_date|-release_date|comment_count|-comment_count]
+        """
+        qs = filter_films(Film.objects.values(*FILM_ROW_FIELDS), request.query_params)
+        # Serve from DB; only blocks on SWAPI when the cache is past hard expiry
         try:
-            fetch_and_sync_films()
+            ensure_films_fresh()
         except Exception:
             # Don’t break the endpoint if SWAPI is down; just log
-            import logging
-            logging.getLogger(__name__).exception("SWAPI sync failed")
-        qs = (
-            Film.objects.annotate(comment_count=Count("comments"))
-            .order_by("release_date", "id")
+            logger.exception("SWAPI sync failed")
+        return conditional_response(
+            request,
+            films_validator(),
+            lambda: cached_response(film_list_key(request), lambda: self._list_data(qs)),
         )
+
+    def _list_data(self, qs):
+        # comment_count is a stored column, so no JOIN/GROUP BY on comments
         page = self.paginate_queryset(qs)
         if page is not None:
-            ser = self.get_serializer(page, many=True)
-            return self.get_paginated_response(ser.data)
-        ser = self.get_serializer(qs, many=True)
-        return Response(ser.data)
+            return self.get_paginated_response(film_rows(page)).data
+        return film_rows(list(qs))
 
     def get_serializer_class(self):
         # Use nested serializer for single-film retrieve
@@ -55,50 +165,201 @@ class FilmViewSet(viewsets.ModelViewSet):
         return super().get_serializer_class()
 
     def retrieve(self, request, *args, **kwargs):
-        
-      
+        pk = self.kwargs["pk"]
+        return conditional_response(
+            request,
+            film_validator(pk),
+            lambda: cached_response(film_detail_key(request, pk), self._retrieve_data),
+        )
+
+    def _retrieve_data(self):
         film = self.get_object()
-        # Add computed field for single retrieve (serializer has it read-only)
-        film.comment_count = film.comments.count()  # type: ignore[attr-defined]
         ser = self.get_serializer(film)
-        return Response(ser.data)
+        with timed(SERIALIZE):
+            return ser.data
 
     @action(detail=True, methods=["get", "post"], url_path="comments")
     def comments(self, request, pk=None):
         """
         Nested comments endpoint under films using default router.
 
-        GET  /api/films/{id}/comments/
+        GET  /api/films/{id}/comments/[?search=<words>]
         POST /api/films/{id}/comments/
+
+        With ``COMMENT_INGEST_MODE = "buffered"`` a valid POST is staged
+        and answered with 202 (the comment appears once drained; see
+        films.ingest) instead of being inserted on the request thread.
         """
         try:
             film = Film.objects.get(pk=pk)
-        except Film.DoesNotExist:
+        except (Film.DoesNotExist, ValueError):
             raise NotFound("Film not found.")
 
         if request.method.lower() == "get":
-            qs = film.comments.order_by("created_at", "id")
-            serializer = CommentSerializer(qs, many=True)
-            return Response(serializer.data)
+            return conditional_response(
+                request,
+                comments_validator(film.comment_count, film.comments_changed_at),
+                lambda: self._film_comments_page(film, request),
+            )
 
         # POST
-        data = {**request.data, "film": film.id}
-        serializer = CommentSerializer(data=data)
-        serializer.is_valid(raise_exception=True)
+        data, code = create_film_comment(film.id, request.data, get_client_ip(request))
+        return Response(data, status=code)
 
-        obj = serializer.save(ip_address=_get_client_ip(request))
-        return Response(
-            CommentSerializer(obj).data, status=status.HTTP_201_CREATED
+    def _film_comments_page(self, film, request):
+        if SEARCH_PARAM in request.query_params:
+            return Response(comment_search_data(film.comments.all(), request, view=self))
+        paginator = CommentCursorPagination()
+        page = paginator.paginate_queryset(
+            film.comments.values(*COMMENT_ROW_FIELDS), request, view=self
         )
+        return paginator.get_paginated_response(comment_rows(page))
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ReplicaReadsMixin, viewsets.ModelViewSet):
     """Comments endpoint; supports list/create/delete."""
     queryset = Comment.objects.all().order_by("created_at", "id")
     serializer_class = CommentSerializer
+    pagination_class = CommentCursorPagination
     http_method_names = ["get", "post", "put", "patch", "delete"]
 
+    def get_throttles(self):
+        if self.action == "create":
+            return [CommentRateThrottle()]
+        if self.action == "bulk":
+            return [CommentRateThrottle(), BulkCommentRateThrottle()]
+        return super().get_throttles()
+
     def list(self, request, *args, **kwargs):
-        qs = self.get_queryset()
-        data = CommentSerializer(qs, many=True).data
-        return Response(data, status=status.HTTP_200_OK)
+        return conditional_response(request, films_validator(), self._list_page)
+
+    def _list_page(self):
+        if SEARCH_PARAM in self.request.query_params:
+            return Response(comment_search_data(self.get_queryset(), self.request, view=self))
+        page = self.paginate_queryset(self.get_queryset().values(*COMMENT_ROW_FIELDS))
+        return self.get_paginated_response(comment_rows(page))
+
+    # Keep Film.comment_count in step with every comment write
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            obj = serializer.save()
+            Film.objects.adjust_comment_count(obj.film_id, +1)
+
+    def perform_update(self, serializer):
+        previous_film_id = serializer.instance.film_id
+        with transaction.atomic():
+            obj = serializer.save()
+            if obj.film_id != previous_film_id:
+                Film.objects.adjust_comment_count(previous_film_id, -1)
+                Film.objects.adjust_comment_count(obj.film_id, +1)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            Film.objects.adjust_comment_count(instance.film_id, -1)
+            invalidate_film_comments(instance.film_id)
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        """
+        Create many comments (for one or several films) in one request.
+
+        POST /api/comments/bulk/  [{"film": 1, "text": "..."}, ...]
+
+        Every item is validated like a single POST; films are resolved in
+        one query and valid items are written with one ``bulk_create`` in a
+        single transaction. Responds with per-item results in input order:
+        201 when all items were created, 207 when some failed, 400 when none
+        were valid. (On MySQL, created items carry ``id: null`` since the
+        backend doesn't return bulk-inserted keys.)
+        """
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({"non_field_errors": ["Expected a non-empty list of comments."]})
+        if len(items) > settings.COMMENT_BULK_MAX_ITEMS:
+            raise ValidationError({
+                "non_field_errors": [
+                    f"At most {settings.COMMENT_BULK_MAX_ITEMS} comments per request."
+                ]
+            })
+
+        film_ids = set()
+        for item in items:
+            try:
+                film_ids.add(int(item["film"]))
+            except (TypeError, KeyError, ValueError):
+                pass
+        films = Film.objects.in_bulk(list(film_ids))
+
+        ip_address = get_client_ip(request)
+        results: list = [None] * len(items)
+        pending: list[tuple[int, Comment]] = []
+        for index, item in enumerate(items):
+            serializer = BulkCommentItemSerializer(data=item, context={"films": films})
+            if serializer.is_valid():
+                pending.append((index, Comment(ip_address=ip_address, **serializer.validated_data)))
+            else:
+                results[index] = {"index": index, "status": 400, "errors": serializer.errors}
+
+        if pending:
+            with transaction.atomic():
+                created = Comment.objects.bulk_create(
+                    [comment for _, comment in pending], batch_size=1000
+                )
+                # bulk_create skips signals, so maintain counts/caches here
+                for film_id, n in Counter(c.film_id for c in created).items():
+                    Film.objects.adjust_comment_count(film_id, n)
+                    invalidate_film_comments(film_id)
+            COMMENTS_CREATED.inc(len(created), source="bulk")
+            for (index, _), data in zip(pending, CommentSerializer(created, many=True).data):
+                results[index] = {"index": index, "status": 201, "comment": data}
+
+        if len(pending) == len(items):
+            code = status.HTTP_201_CREATED
+        elif pending:
+            code = status.HTTP_207_MULTI_STATUS
+        else:
+            code = status.HTTP_400_BAD_REQUEST
+        return Response(results, status=code)
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """
+        Stream every comment as NDJSON (default) or CSV.
+
+        GET /api/comments/export/?output=ndjson|csv&film=<id>&since=<iso>&until=<iso>
+
+        ``since``/``until`` bound created_at (inclusive/exclusive). Rows are
+        streamed in id order as they are read, so memory stays flat and the
+        first byte goes out immediately.
+        """
+        output = request.query_params.get("output", "ndjson")
+        if output not in EXPORT_FORMATS:
+            raise ValidationError({"output": f"Choose one of {sorted(EXPORT_FORMATS)}."})
+
+        qs = Comment.objects.all()
+        film = request.query_params.get("film")
+        if film is not None:
+            if not film.isdigit():
+                raise ValidationError({"film": "Must be a film id."})
+            qs = qs.filter(film_id=int(film))
+        for param, lookup in (("since", "created_at__gte"), ("until", "created_at__lt")):
+            raw = request.query_params.get(param)
+            if raw is None:
+                continue
+            value = parse_datetime(raw)
+            if value is None:
+                raise ValidationError({param: "Must be an ISO 8601 datetime."})
+            qs = qs.filter(**{lookup: value})
+
+        content_type, render = EXPORT_FORMATS[output]
+        response = StreamingHttpResponse(render(qs), content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="comments.{output}"'
+        return response
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def cache_stats_view(request):
+    """Film response cache hit/miss counters for this worker process."""
+    return Response(cache_stats())
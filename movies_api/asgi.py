@@ -14,3 +14,11 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'movies_api.settings')
 
 application = get_asgi_application()
+
+# Keep the SWAPI film cache fresh and drain buffered comments off the
+# request path
+from films.ingest import start_comment_drainer  # noqa: E402
+from films.scheduler import start_background_sync  # noqa: E402
+
+start_background_sync()
+start_comment_drainer()
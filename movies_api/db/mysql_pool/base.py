@@ -0,0 +1,15 @@
+"""
+MySQL backend with in-process connection pooling.
+
+    "ENGINE": "movies_api.db.mysql_pool",
+    "POOL": {"size": 10, "max_idle": 240},
+
+See ``movies_api.db.pool``.
+"""
+from django.db.backends.mysql import base
+
+from ..pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    pass
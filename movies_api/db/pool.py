@@ -0,0 +1,137 @@
+"""
+In-process connection pooling for Django database backends.
+
+Django only pools natively on PostgreSQL. ``PooledDatabaseWrapperMixin``
+keeps a small per-process stack of open DB-API connections per alias:
+``close()`` at the end of a request parks the connection instead of
+closing it, and the next ``connect()`` takes it back. That skips the TCP
+handshake, authentication and ``init_command`` on every checkout. Configure
+it through a ``POOL`` entry in the database settings::
+
+    "POOL": {"size": 10, "max_idle": 240}
+
+``size`` caps the parked connections (extra ones are closed), and
+``max_idle`` (seconds) drops connections idle long enough for the server
+to have timed them out (MySQL ``wait_timeout``).
+"""
+from __future__ import annotations
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+_pools: dict[str, "ConnectionPool"] = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """Thread-safe LIFO stack of idle DB-API connections."""
+
+    def __init__(self, size: int, max_idle: Optional[float] = None):
+        self.size = size
+        self.max_idle = max_idle
+        self._idle: deque[tuple[Any, float]] = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self, connect: Callable[[], Any], check: Callable[[Any], bool]) -> Any:
+        """Reuse the most recently parked usable connection, else ``connect()``."""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn, parked_at = self._idle.pop()
+            if self.max_idle is not None and time.monotonic() - parked_at > self.max_idle:
+                _close_quietly(conn)
+                continue
+            if check(conn):
+                return conn
+            _close_quietly(conn)
+        return connect()
+
+    def release(self, conn: Any) -> None:
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append((conn, time.monotonic()))
+                return
+        _close_quietly(conn)
+
+    def clear(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, deque()
+        for conn, _ in idle:
+            _close_quietly(conn)
+
+    def __len__(self) -> int:
+        return len(self._idle)
+
+
+def _close_quietly(conn: Any) -> None:
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def get_pool(alias: str, options: dict[str, Any]) -> ConnectionPool:
+    pool = _pools.get(alias)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(alias)
+            if pool is None:
+                pool = _pools[alias] = ConnectionPool(
+                    size=options.get("size", 10), max_idle=options.get("max_idle")
+                )
+    return pool
+
+
+def close_pools() -> None:
+    """Close every parked connection (e.g. after forking or in tests)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.clear()
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Mix into a backend's ``DatabaseWrapper`` (before it in the MRO) to pool
+    its connections. Use with ``CONN_MAX_AGE = 0`` so Django hands the
+    connection back to the pool at the end of each request.
+    """
+
+    @property
+    def pool(self) -> ConnectionPool:
+        return get_pool(self.alias, self.settings_dict.get("POOL") or {})
+
+    def get_new_connection(self, conn_params):
+        return self.pool.acquire(
+            lambda: super(PooledDatabaseWrapperMixin, self).get_new_connection(conn_params),
+            self._pooled_connection_usable,
+        )
+
+    def _pooled_connection_usable(self, conn: Any) -> bool:
+        # Same opt-in as Django's persistent connection health checks
+        if not self.settings_dict["CONN_HEALTH_CHECKS"]:
+            return True
+        ping = getattr(conn, "ping", None)  # MySQLdb/PyMySQL
+        if ping is None:
+            return True
+        try:
+            ping()
+        except Exception:
+            return False
+        return True
+
+    def _close(self):
+        if self.connection is None:
+            return
+        reusable = (
+            not self.in_atomic_block
+            and self.get_autocommit() == self.settings_dict["AUTOCOMMIT"]
+            and (not self.errors_occurred or self.is_usable())
+        )
+        if reusable:
+            self.pool.release(self.connection)
+        else:
+            super()._close()
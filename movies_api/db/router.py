@@ -0,0 +1,69 @@
+"""
+Primary/replica routing.
+
+Writes always go to ``default`` (the primary). Reads go to the primary too,
+unless the code doing them runs inside ``read_from_replica()`` -- which the
+film/comment read endpoints do -- and ``settings.DATABASE_REPLICAS`` names
+at least one replica. Anything that must see its own writes (e.g. the
+SWAPI sync apply phase) can force the primary with ``pin_to_primary()``.
+"""
+from __future__ import annotations
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Alias reads are routed to for the current request/task (None = primary)
+_read_alias: ContextVar[Optional[str]] = ContextVar("db_read_alias", default=None)
+
+
+def replicas() -> list[str]:
+    return list(getattr(settings, "DATABASE_REPLICAS", ()))
+
+
+def current_read_alias() -> str:
+    """The alias reads are routed to right now."""
+    return _read_alias.get() or DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def read_from_replica() -> Iterator[Optional[str]]:
+    """
+    Route reads in this block to one replica, picked once so every query
+    sees the same snapshot. Yields the alias (None without replicas).
+    """
+    aliases = replicas()
+    token = _read_alias.set(random.choice(aliases) if aliases else None)
+    try:
+        yield _read_alias.get()
+    finally:
+        _read_alias.reset(token)
+
+
+@contextmanager
+def pin_to_primary() -> Iterator[None]:
+    """Route reads in this block to the primary, even inside ``read_from_replica``."""
+    token = _read_alias.set(None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints) -> str:
+        return current_read_alias()
+
+    def db_for_write(self, model, **hints) -> str:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool:
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> Optional[bool]:
+        if db in replicas():
+            return False  # schema arrives through replication
+        return None
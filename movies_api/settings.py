@@ -108,6 +108,9 @@ INSTALLED_APPS = [
 # Middleware
 # ---------------------------------------------------------
 MIDDLEWARE = [
+    # First, so its timings cover the whole stack; a no-op unless enabled below
+    "films.instrumentation.InstrumentationMiddleware",
+    "films.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -119,6 +122,20 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Per-request Server-Timing headers + JSON log lines (films.instrumentation)
+REQUEST_INSTRUMENTATION = env.bool("REQUEST_INSTRUMENTATION", default=False)
+# Fraction of requests instrumented (0.0-1.0)
+REQUEST_INSTRUMENTATION_SAMPLE_RATE = env.float("REQUEST_INSTRUMENTATION_SAMPLE_RATE", default=1.0)
+
+# Prometheus-style metrics at /metrics (films.metrics); off by default since
+# it exposes traffic and internals
+METRICS_ENABLED = env.bool("METRICS_ENABLED", default=False)
+# If set, scrapes must send "Authorization: Bearer <token>"
+METRICS_TOKEN = env.str("METRICS_TOKEN", default="")
+# Shared directory for multi-process servers (e.g. gunicorn workers): each
+# worker writes its own file, /metrics sums them. Wipe it on (re)start.
+METRICS_MULTIPROC_DIR = env.str("METRICS_MULTIPROC_DIR", default="")
+
 ROOT_URLCONF = "movies_api.urls"
 
 TEMPLATES = [
@@ -161,8 +178,42 @@ else:
             "OPTIONS": {
                 "init_command": "SET sql_mode='STRICT_TRANS_TABLES'",
             },
+            # Keep connections open across requests (seconds; 0 closes after
+            # each request) and ping a reused one before the request uses it
+            "CONN_MAX_AGE": env.int("DB_CONN_MAX_AGE", default=60),
+            "CONN_HEALTH_CHECKS": env.bool("DB_CONN_HEALTH_CHECKS", default=True),
         }
     }
+    # Optional in-process pool (movies_api.db.pool): connections go back to
+    # the pool after each request instead of staying pinned to one thread
+    DB_POOL_SIZE = env.int("DB_POOL_SIZE", default=0)
+    if DB_POOL_SIZE > 0:
+        DATABASES["default"].update(
+            ENGINE="movies_api.db.mysql_pool",
+            CONN_MAX_AGE=0,
+            POOL={
+                "size": DB_POOL_SIZE,
+                # Stay under the server's wait_timeout (300s on PythonAnywhere)
+                "max_idle": env.int("DB_POOL_MAX_IDLE", default=240),
+            },
+        )
+
+# Read replicas (same credentials as the primary): film/comment GETs are
+# routed to one of them, writes and the SWAPI sync stay on the primary
+DATABASE_REPLICAS = []
+if not DEBUG:
+    for i, host in enumerate(env.list("DB_REPLICA_HOSTS", default=[]), start=1):
+        name, _, port = host.partition(":")
+        DATABASES[f"replica{i}"] = {
+            **DATABASES["default"],
+            "HOST": name,
+            "PORT": port or DATABASES["default"]["PORT"],
+            "TEST": {"MIRROR": "default"},
+        }
+        DATABASE_REPLICAS.append(f"replica{i}")
+DATABASE_ROUTERS = ["movies_api.db.router.ReplicaRouter"]
+# Seconds a client's reads stay on the primary after it writes
+DB_REPLICA_STICKY_SECONDS = env.int("DB_REPLICA_STICKY_SECONDS", default=5)
 
 # ---------------------------------------------------------
 # Password validation
@@ -202,8 +253,38 @@ MEDIA_ROOT = os.path.join(BASE_DIR, "mediafiles")
 REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 6,
+    # Reverse proxies in front of the app; client IPs (rate limits, stored
+    # comment IPs) are read from X-Forwarded-For only this far from the right
+    "NUM_PROXIES": env.int("NUM_PROXIES", default=0),
 }
 
+# How many of the latest comments GET /api/films/{id}/ embeds
+FILM_DETAIL_COMMENT_PREVIEW = env.int("FILM_DETAIL_COMMENT_PREVIEW", default=10)
+
+# Max items per POST /api/comments/bulk/
+COMMENT_BULK_MAX_ITEMS = env.int("COMMENT_BULK_MAX_ITEMS", default=5000)
+
+# Rows fetched per batch by GET /api/comments/export/
+COMMENT_EXPORT_CHUNK_SIZE = env.int("COMMENT_EXPORT_CHUNK_SIZE", default=2000)
+
+# POST /api/films/{id}/comments/: "sync" inserts on the request thread,
+# "buffered" stages the comment, answers 202 and lets a drainer bulk-insert
+COMMENT_INGEST_MODE = env.str("COMMENT_INGEST_MODE", default="sync")
+# Staged comments beyond which POSTs get 503 + Retry-After
+COMMENT_QUEUE_MAX_SIZE = env.int("COMMENT_QUEUE_MAX_SIZE", default=10000)
+# Comments per drain batch; a queue this deep also wakes the drainer early
+COMMENT_QUEUE_FLUSH_SIZE = env.int("COMMENT_QUEUE_FLUSH_SIZE", default=500)
+# Seconds between drains
+COMMENT_QUEUE_FLUSH_INTERVAL = env.float("COMMENT_QUEUE_FLUSH_INTERVAL", default=1.0)
+
+# Per-IP token bucket for comment writes ("<n>/<s|min|hour|day>"; empty disables)
+COMMENT_RATE_LIMIT = env.str("COMMENT_RATE_LIMIT", default="30/min")
+# Tokens a process claims from the shared (cache) bucket at a time
+COMMENT_RATE_LEASE = env.int("COMMENT_RATE_LEASE", default=5)
+# Per-IP limit on comments created through /api/comments/bulk/ (items, not
+# requests); keep it >= COMMENT_BULK_MAX_ITEMS or larger batches always fail
+COMMENT_BULK_RATE_LIMIT = env.str("COMMENT_BULK_RATE_LIMIT", default="5000/hour")
+
 SWAGGER_SETTINGS = {
     "USE_SESSION_AUTH": False,
     "DEFAULT_INFO": "movies_api.urls.api_info",
@@ -225,6 +306,22 @@ X_FRAME_OPTIONS = "DENY"
 SWAGGER_USE_COMPAT_RENDERERS = False
 
 SWAPI_BASE_URL = env("SWAPI_BASE_URL", default="https://swapi.dev/api")
+# SWAPI client: per-request timeout (s), retries with backoff+jitter for
+# transient errors, and how many pages to fetch concurrently
+SWAPI_TIMEOUT = env.float("SWAPI_TIMEOUT", default=15)
+SWAPI_MAX_RETRIES = env.int("SWAPI_MAX_RETRIES", default=3)
+SWAPI_BACKOFF = env.float("SWAPI_BACKOFF", default=0.5)
+SWAPI_MAX_WORKERS = env.int("SWAPI_MAX_WORKERS", default=4)
+# Seconds between background SWAPI syncs; 0 disables the in-process worker
+# (e.g. when running `manage.py sync_films` from cron instead)
+SWAPI_SYNC_INTERVAL = env.int("SWAPI_SYNC_INTERVAL", default=900)
+# Film cache TTL policy (seconds): younger than SWAPI_SYNC_TTL is served as-is,
+# up to SWAPI_SYNC_MAX_AGE is served while revalidating in the background,
+# anything older blocks on a sync
+SWAPI_SYNC_TTL = env.int("SWAPI_SYNC_TTL", default=900)
+SWAPI_SYNC_MAX_AGE = env.int("SWAPI_SYNC_MAX_AGE", default=86400)
+# Upper bound (s) on how long a crashed worker can hold the cross-process sync lock
+SWAPI_SYNC_LOCK_TIMEOUT = env.int("SWAPI_SYNC_LOCK_TIMEOUT", default=300)
 
 # ---------------------------------------------------------
 # Logging (simple console)
@@ -243,11 +340,13 @@ LOGGING = {
 # --------------------------
 # CACHES
 # --------------------------
+# CACHE_URL picks the backend, e.g. rediscache://127.0.0.1:6379/1 or
+# pymemcache://127.0.0.1:11211 in production; LocMem by default (and in tests)
 CACHES = {
-    "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-        "LOCATION": "movies-cache",
-    }
+    "default": env.cache("CACHE_URL", default="locmemcache://movies-cache"),
 }
+# Cache alias and TTL (s) for film list/detail responses
+FILMS_CACHE_ALIAS = env("FILMS_CACHE_ALIAS", default="default")
+FILMS_CACHE_TIMEOUT = env.int("FILMS_CACHE_TIMEOUT", default=300)
 
 SWAGGER_USE_COMPAT_RENDERERS = False
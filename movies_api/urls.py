@@ -5,10 +5,12 @@ from django.conf.urls.static import static
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework import permissions
+from films.metrics import metrics_view
 
 
 urlpatterns = [
     path("admin/", admin.site.urls),
    
     path("api/", include("films.urls")),
+    path("metrics", metrics_view, name="metrics"),
 ]
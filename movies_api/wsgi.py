@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'movies_api.settings')
 
 application = get_wsgi_application()
+
+# Keep the SWAPI film cache fresh and drain buffered comments off the
+# request path
+from films.ingest import start_comment_drainer  # noqa: E402
+from films.scheduler import start_background_sync  # noqa: E402
+
+start_background_sync()
+start_comment_drainer()